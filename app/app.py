@@ -3,17 +3,33 @@ import sys
 from pathlib import Path
 import pickle
 import os
+import numpy as np
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.data_preprocessing import load_data, preprocess_data
-from src.model_training import train_model
+from src.instrumentation import INSTRUMENTS, request, timed
+from src.startup_timing import StartupTimer
+
+@st.cache_resource
+def get_startup_timer():
+    """One timer per server process, so only the cold first run is reported"""
+    return StartupTimer()
+
+STARTUP = get_startup_timer()
+
+# sklearn (model_training) and plotly (pages) are imported lazily where they are used
+with STARTUP.phase("src (data, inference, bundle, service)", kind='import'):
+    from src.data_preprocessing import load_data
+    from src.inference import CompiledForest, compile_pipeline
+    from src.model_bundle import load_bundle
+    from src.lookup_table import load_lookup_table
+    from src.prediction_service import PredictionService, QueuedPredictionService
+    from src.prediction_cache import CachedPredictionService, PredictionCache
+    from src.evaluation import (build_evaluation, dataset_fingerprint, dataset_stamp, evaluate_model, holdout_rows,
+                                load_evaluation)
+    from src.dataset_summary import build_summary, load_summary
 from styles.custom_styles import get_custom_css
-from pages.home import show_home_page
-from pages.prediction import show_prediction_page
-from pages.analysis import show_analysis_page
-from pages.model_performance import show_model_performance
 
 # Page configuration
 st.set_page_config(
@@ -34,59 +50,231 @@ st.markdown("""
 # Apply custom CSS
 st.markdown(get_custom_css(), unsafe_allow_html=True)
 
+# Inference engine: "bundle" (memory-mapped models/best_model.rfb, no pickle/sklearn at load),
+# "compiled" (flat-array forest compiled from the pickle) or "sklearn" (raw Pipeline).
+# The three engines give the same probabilities; with the lookup table below in front,
+# form inputs get the same labels but probabilities rounded to float32 (off by a few 1e-8)
+INFERENCE_ENGINE = os.environ.get("INFERENCE_ENGINE", "bundle").lower()
+
+# Outlier points drawn per box on the analysis page; APP_DEBUG=1 shows payload/render timings
+ANALYSIS_MAX_OUTLIERS = int(os.environ.get("ANALYSIS_MAX_OUTLIERS", "200"))
+APP_DEBUG = os.environ.get("APP_DEBUG", "0") == "1"
+
+# Per-stage timers (off: near-zero overhead). APP_METRICS_DIR=<dir> exports metrics.prom and
+# traces.jsonl there; APP_DEBUG=1 also shows the last request breakdowns on the prediction page
+APP_METRICS_DIR = os.environ.get("APP_METRICS_DIR")
+INSTRUMENTS.configure(enabled=APP_DEBUG or bool(APP_METRICS_DIR), export_dir=APP_METRICS_DIR)
+
+# Prediction requests of concurrent sessions arriving within SCORING_MAX_WAIT_MS are scored
+# together (at most SCORING_MAX_BATCH rows per forest call); SCORING_MAX_BATCH=1 disables it
+SCORING_MAX_BATCH = int(os.environ.get("SCORING_MAX_BATCH", "64"))
+SCORING_MAX_WAIT_MS = float(os.environ.get("SCORING_MAX_WAIT_MS", "3"))
+
+# Form inputs are answered from models/best_model.lut when it exists and matches the model
+# (built by build_lookup_table.py); LOOKUP_TABLE=0 always scores with the forest
+USE_LOOKUP_TABLE = os.environ.get("LOOKUP_TABLE", "1") != "0"
+
+# Results of recurring form profiles, shared by all sessions (PREDICTION_CACHE_SIZE=0 disables it)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "3600"))
+
+# Project paths
+BASE_DIR = Path(__file__).parent.parent
+DATASET_PATH = str(BASE_DIR / 'data' / 'raw' / 'dataset.csv')
+MODEL_PATH = str(BASE_DIR / 'models' / 'best_model.pkl')
+BUNDLE_PATH = str(BASE_DIR / 'models' / 'best_model.rfb')
+LOOKUP_PATH = str(BASE_DIR / 'models' / 'best_model.lut')
+STATS_PATH = str(BASE_DIR / 'models' / 'preprocessing_stats.pkl')
+EVALUATION_PATH = str(BASE_DIR / 'models' / 'evaluation.json')
+SUMMARY_PATH = str(BASE_DIR / 'models' / 'dataset_summary.pkl')
+
 @st.cache_resource
-def load_and_train():
-    """Load data and train model (or load from file if exists)"""
-    # Get absolute paths
-    base_dir = Path(__file__).parent.parent
-    dataset_path = base_dir / 'data' / 'raw' / 'dataset.csv'
-    
-    df = load_data(str(dataset_path))
-    
-    # Check if saved model exists
-    model_path = str(base_dir / 'models' / 'best_model.pkl')
-    stats_path = str(base_dir / 'models' / 'preprocessing_stats.pkl')
-    
-    if os.path.exists(model_path) and os.path.exists(stats_path):
-        print("[INFO] Loading model from file...")
+def load_dataset():
+    """Read the raw dataset (only when a page actually needs rows)"""
+    with STARTUP.phase("csv load"):
+        return load_data(DATASET_PATH)
+
+def dataset_version():
+    """Cheap change marker for the dataset file (None if it is not deployed)"""
+    try:
+        stat = os.stat(DATASET_PATH)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+@st.cache_resource(max_entries=1)
+def load_dataset_summary(version):
+    """Aggregate tables for the home and analysis pages, rebuilt when the dataset changes"""
+    with STARTUP.phase("dataset summary"):
+        summary = load_summary(SUMMARY_PATH, DATASET_PATH)
+        if summary is None:
+            print("[INFO] Dataset summary missing or stale, rebuilding...")
+            # Kept for this process only: the artifact is refreshed by save_model.py, not by the app
+            summary = build_summary(load_data(DATASET_PATH), dataset_fingerprint(DATASET_PATH),
+                                    dataset_stamp(DATASET_PATH))
+    return summary
+
+def load_saved_evaluation(model):
+    """Metrics saved by save_model.py; only re-score the test split if missing or stale"""
+    with STARTUP.phase("evaluation"):
+        evaluation = load_evaluation(EVALUATION_PATH, DATASET_PATH)
+        if evaluation is None:
+            print("[INFO] Evaluation artifact missing or stale, recomputing metrics...")
+            evaluation = evaluate_model(model, load_dataset(), DATASET_PATH)
+    return evaluation
+
+def model_version():
+    """Change marker of the saved model files; a new value reloads the model and empties the prediction cache"""
+    version = []
+    for path in (MODEL_PATH, BUNDLE_PATH, LOOKUP_PATH):
+        try:
+            stat = os.stat(path)
+            version.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            version.append(None)
+    return tuple(version)
+
+@st.cache_resource(max_entries=1)
+@timed("load_and_train")
+def load_and_train(version):
+    """Load model, stats and evaluation artifact (or train if no usable model exists)"""
+    if INFERENCE_ENGINE == "bundle" and os.path.exists(BUNDLE_PATH) and os.path.exists(STATS_PATH):
+        print("[INFO] Loading model bundle...")
         
         try:
-            # Load model
-            with open(model_path, 'rb') as f:
-                model = pickle.load(f)
+            # Read-only memory map, pages are shared by every worker process on the host
+            with STARTUP.phase("model load (bundle)"):
+                model = load_bundle(BUNDLE_PATH)
+                
+                with open(STATS_PATH, 'rb') as f:
+                    stats = pickle.load(f)
             
-            # Load stats
-            with open(stats_path, 'rb') as f:
-                stats = pickle.load(f)
+            evaluation = load_saved_evaluation(model)
             
-            # Get test data for evaluation metrics
-            from sklearn.model_selection import train_test_split
-            from sklearn.metrics import accuracy_score, f1_score, confusion_matrix
+            print("[SUCCESS] Model bundle loaded!")
+            return model, evaluation, stats
+            
+        except Exception as e:
+            print(f"[WARNING] Error loading model bundle: {e}")
+            print("[INFO] Falling back to pickled model...")
+    
+    if os.path.exists(MODEL_PATH) and os.path.exists(STATS_PATH):
+        print("[INFO] Loading model from file...")
+        
+        try:
+            with STARTUP.phase("model load (pickle)"):
+                # Load model
+                with open(MODEL_PATH, 'rb') as f:
+                    model = pickle.load(f)
+                
+                # Load stats
+                with open(STATS_PATH, 'rb') as f:
+                    stats = pickle.load(f)
             
-            processed_df = preprocess_data(df)
-            X = processed_df.drop('Label', axis=1)
-            y = processed_df['Label']
-            _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+            # Models from before the normalizer step expect pre-normalized input
+            if 'normalizer' not in model.named_steps:
+                raise ValueError("Saved model has no normalizer step")
             
-            y_pred = model.predict(X_test)
-            accuracy = accuracy_score(y_test, y_pred)
-            f1 = f1_score(y_test, y_pred, average='weighted')
-            cm = confusion_matrix(y_test, y_pred)
+            evaluation = load_saved_evaluation(model)
             
             print("[SUCCESS] Model loaded from file!")
-            return df, model, accuracy, f1, cm, X_test, y_test, stats
+            return model, evaluation, stats
             
         except Exception as e:
             print(f"[WARNING] Error loading model: {e}")
             print("[INFO] Training new model instead...")
-            # If loading fails, train new model
-            model, accuracy, f1, cm, X_test, y_test, stats = train_model(df)
-            return df, model, accuracy, f1, cm, X_test, y_test, stats
     
     else:
         print("[INFO] No saved model found. Training new model...")
+    
+    # If loading fails, train new model
+    df = load_dataset()
+    with STARTUP.phase("model training"):
+        from src.model_training import train_model
         model, accuracy, f1, cm, X_test, y_test, stats = train_model(df)
-        return df, model, accuracy, f1, cm, X_test, y_test, stats
+        evaluation = build_evaluation(model, accuracy, f1, cm, df, DATASET_PATH)
+    return model, evaluation, stats
+
+@st.cache_resource(max_entries=1)
+def get_compiled_model(_model, version):
+    """The model as a CompiledForest, compiled once per model version (None if it cannot be compiled)"""
+    if isinstance(_model, CompiledForest):
+        return _model
+
+    try:
+        return compile_pipeline(_model)
+    except Exception as e:
+        print(f"[WARNING] Could not compile model: {e}")
+        return None
+
+@st.cache_resource(max_entries=1)
+def get_inference_model(_model, version):
+    """Return the model used for scoring according to INFERENCE_ENGINE"""
+    if INFERENCE_ENGINE == "sklearn":
+        return _model
+
+    compiled = get_compiled_model(_model, version)
+    if compiled is None:
+        print("[INFO] Falling back to sklearn pipeline...")
+        return _model
+    print("[INFO] Using compiled inference engine")
+    return compiled
+
+@st.cache_resource(max_entries=1)
+def get_explainer(_compiled, version):
+    """Per-prediction explanations (tree-path contributions) from the compiled forest, None without one"""
+    from src.explanations import Explainer
+    if _compiled is None:
+        return None
+    try:
+        return Explainer(_compiled)
+    except Exception as e:
+        print(f"[WARNING] Explanations unavailable: {e}")
+        return None
+
+@st.cache_data(max_entries=1, show_spinner="Menghitung permutation importance...")
+def get_permutation_importance(_compiled, version, holdout):
+    """Grouped permutation importance on the rows the model was evaluated on (never trained on),
+    computed once per model version"""
+    from src.explanations import grouped_permutation_importance
+
+    if _compiled is None:
+        raise ValueError("model could not be compiled")
+    if not holdout:
+        raise ValueError("evaluation.json does not record the holdout rows, re-run save_model.py")
+    test = load_dataset().iloc[holdout_rows(holdout)]
+    return grouped_permutation_importance(_compiled, test.drop('Label', axis=1), test['Label'],
+                                          workers=os.cpu_count() or 1)
+
+def with_lookup_table(model):
+    """Put the precomputed lookup table in front of the compiled forest when it was built for this model"""
+    if not USE_LOOKUP_TABLE or not isinstance(model, CompiledForest) or not os.path.exists(LOOKUP_PATH):
+        return model
+    try:
+        lookup = load_lookup_table(LOOKUP_PATH, model)
+        print("[INFO] Using precomputed lookup table for form inputs")
+        return lookup
+    except Exception as e:
+        print(f"[WARNING] Lookup table not used: {e}")
+        return model
+
+@st.cache_resource
+def get_prediction_cache():
+    """One prediction cache per server process"""
+    return PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+@st.cache_resource(max_entries=1)
+def get_prediction_service(_model, version):
+    """Build the batch prediction service once per model load, shared by every session"""
+    service = PredictionService(with_lookup_table(_model))
+    if SCORING_MAX_BATCH > 1:
+        service = QueuedPredictionService(service, SCORING_MAX_BATCH, SCORING_MAX_WAIT_MS)
+    if PREDICTION_CACHE_SIZE > 0:
+        cache = get_prediction_cache()
+        # Keys carry the model version anyway; clearing just frees the old model's entries
+        cache.clear()
+        service = CachedPredictionService(service, cache, version)
+    return service
 
 def main():
     # Header
@@ -95,7 +283,10 @@ def main():
     
     # Load data and train model
     try:
-        df, model, accuracy, f1, cm, X_test, y_test, stats = load_and_train()
+        version = model_version()
+        model, evaluation, stats = load_and_train(version)
+        compiled = get_compiled_model(model, version)
+        model = get_inference_model(model, version)
     except FileNotFoundError:
         st.error("⚠️ File dataset.csv tidak ditemukan. Pastikan file dataset berada di folder data/raw/")
         return
@@ -125,15 +316,45 @@ def main():
         - Faktor sosial
         """)
     
-    # Pages
-    if page == "🏠 Beranda":
-        show_home_page(df, accuracy, f1)
-    elif page == "🔮 Prediksi":
-        show_prediction_page(df, model, stats)
-    elif page == "📈 Analisis Data":
-        show_analysis_page(df)
-    elif page == "📊 Performa Model":
-        show_model_performance(accuracy, f1, cm, model)
+    accuracy = evaluation['accuracy']
+    f1 = evaluation['f1']
+    cm = np.array(evaluation['confusion_matrix'])
+    
+    # Pages (home and analysis plot the precomputed summary, plotly is only imported by the page shown)
+    try:
+        if page == "🏠 Beranda":
+            with STARTUP.phase("pages.home", kind='import'):
+                from pages.home import show_home_page
+            with STARTUP.phase("render home"):
+                show_home_page(load_dataset_summary(dataset_version()), accuracy, f1)
+        elif page == "🔮 Prediksi":
+            with STARTUP.phase("pages.prediction", kind='import'):
+                from pages.prediction import show_prediction_page, show_timing_panel
+            with STARTUP.phase("render prediction"), request("show_prediction_page"):
+                jurusan_list = evaluation['dataset']['categories']['Jurusan/Program Studi']
+                show_prediction_page(jurusan_list, get_prediction_service(model, version), get_explainer(compiled, version))
+            if APP_DEBUG:
+                cache_stats = get_prediction_cache().stats() if PREDICTION_CACHE_SIZE > 0 else None
+                show_timing_panel(INSTRUMENTS.recent_traces(), cache_stats)
+        elif page == "📈 Analisis Data":
+            with STARTUP.phase("pages.analysis", kind='import'):
+                from pages.analysis import show_analysis_page
+            with STARTUP.phase("render analysis"):
+                show_analysis_page(load_dataset_summary(dataset_version()), ANALYSIS_MAX_OUTLIERS, APP_DEBUG)
+        elif page == "📊 Performa Model":
+            with STARTUP.phase("pages.model_performance", kind='import'):
+                from pages.model_performance import show_model_performance
+            with STARTUP.phase("render model performance"):
+                try:
+                    permutation = get_permutation_importance(compiled, version, evaluation.get('holdout'))
+                except Exception as e:
+                    print(f"[WARNING] Could not compute permutation importance: {e}")
+                    permutation = None
+                show_model_performance(accuracy, f1, cm, model, permutation)
+    except FileNotFoundError:
+        st.error("⚠️ File dataset.csv tidak ditemukan. Pastikan file dataset berada di folder data/raw/")
+    
+    STARTUP.emit()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,8 +1,78 @@
+import time
 import streamlit as st
 import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+from src.dataset_summary import sample_outliers
 
-def show_analysis_page(df):
-    """Display data analysis page"""
+LABEL_COLORS = {'Sehat': '#38ef7d', 'Risiko Stres': '#f45c43'}
+
+def _box_figure(boxes, feature, max_outliers):
+    """Box plot from precomputed quartiles/fences, at most max_outliers outlier points per label"""
+    fig = go.Figure()
+    for label, stats in boxes.items():
+        color = LABEL_COLORS.get(label)
+        fig.add_trace(go.Box(
+            x=[label],
+            q1=[stats['q1']],
+            median=[stats['median']],
+            q3=[stats['q3']],
+            lowerfence=[stats['lowerfence']],
+            upperfence=[stats['upperfence']],
+            name=label,
+            legendgroup=label,
+            marker_color=color
+        ))
+        outliers = sample_outliers(stats['outliers'], max_outliers)
+        if outliers:
+            fig.add_trace(go.Scatter(
+                x=[label] * len(outliers),
+                y=outliers,
+                mode='markers',
+                legendgroup=label,
+                showlegend=False,
+                marker_color=color
+            ))
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=14),
+        xaxis_title='Label',
+        yaxis_title=feature,
+        legend_title_text='Label'
+    )
+    return fig
+
+def _histogram_figure(hist, feature):
+    """Overlaid per-label histogram from precomputed bin counts"""
+    fig = px.bar(
+        hist, 
+        x='x', 
+        y='Count', 
+        color='Label',
+        barmode='overlay',
+        color_discrete_map=LABEL_COLORS,
+        opacity=0.7,
+        labels={'x': feature}
+    )
+    fig.update_traces(width=hist['width'].iloc[0])
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=14),
+        bargap=0
+    )
+    return fig
+
+@st.cache_data(max_entries=64)
+def distribution_figures_json(feature, dataset_version, max_outliers, _summary):
+    """Serialized box plot and histogram for one feature, cached per dataset version"""
+    box_json = _box_figure(_summary['boxes'][feature], feature, max_outliers).to_json()
+    hist_json = _histogram_figure(_summary['histograms'][feature], feature).to_json()
+    return box_json, hist_json
+
+def show_analysis_page(summary, max_outliers=200, debug=False):
+    """Display data analysis page (plots the precomputed dataset summary, not raw rows)"""
     st.markdown("## 📈 Analisis Data")
     
     # Tabs for different analyses
@@ -15,36 +85,27 @@ def show_analysis_page(df):
         numeric_cols = ['Umur', 'Jam Belajar per Hari', 'Jam Tidur per Hari', 'Jumlah Tugas Besar per Minggu']
         selected_feature = st.selectbox("Pilih Fitur", numeric_cols)
         
-        # Box plot
-        fig = px.box(
-            df, 
-            x='Label', 
-            y=selected_feature, 
-            color='Label',
-            color_discrete_map={'Sehat': '#38ef7d', 'Risiko Stres': '#f45c43'}
-        )
-        fig.update_layout(
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(size=14)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        start = time.perf_counter()
+        box_json, hist_json = distribution_figures_json(selected_feature, summary['fingerprint'], max_outliers, summary)
+        figures_ms = (time.perf_counter() - start) * 1000
         
-        # Histogram
-        fig2 = px.histogram(
-            df, 
-            x=selected_feature, 
-            color='Label',
-            barmode='overlay',
-            color_discrete_map={'Sehat': '#38ef7d', 'Risiko Stres': '#f45c43'},
-            opacity=0.7
-        )
-        fig2.update_layout(
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(size=14)
-        )
-        st.plotly_chart(fig2, use_container_width=True)
+        start = time.perf_counter()
+        st.plotly_chart(pio.from_json(box_json), use_container_width=True)
+        st.plotly_chart(pio.from_json(hist_json), use_container_width=True)
+        render_ms = (time.perf_counter() - start) * 1000
+        
+        if debug:
+            with st.expander("🛠️ Debug: payload grafik"):
+                n_outliers = {label: stats['n_outliers'] for label, stats in summary['boxes'][selected_feature].items()}
+                st.markdown(f"""
+                | Item | Nilai |
+                |------|-------|
+                | Payload box plot | {len(box_json) / 1024:.1f} KB |
+                | Payload histogram | {len(hist_json) / 1024:.1f} KB |
+                | Ambil JSON grafik (cache) | {figures_ms:.1f} ms |
+                | Render `st.plotly_chart` | {render_ms:.1f} ms |
+                | Outlier unik per label | {n_outliers} (maks. {max_outliers} titik ditampilkan) |
+                """)
     
     with tab2:
         st.markdown("### Analisis Kategorikal")
@@ -53,14 +114,14 @@ def show_analysis_page(df):
         selected_cat = st.selectbox("Pilih Kategori", categorical_cols)
         
         # Grouped bar chart
-        grouped = df.groupby([selected_cat, 'Label']).size().reset_index(name='Count')
+        grouped = summary['contingency'][selected_cat]
         fig = px.bar(
             grouped, 
             x=selected_cat, 
             y='Count', 
             color='Label',
             barmode='group',
-            color_discrete_map={'Sehat': '#38ef7d', 'Risiko Stres': '#f45c43'}
+            color_discrete_map=LABEL_COLORS
         )
         fig.update_layout(
             paper_bgcolor='rgba(0,0,0,0)',
@@ -76,11 +137,5 @@ def show_analysis_page(df):
         # Filter by label
         label_filter = st.selectbox("Filter berdasarkan Label", ["Semua", "Sehat", "Risiko Stres"])
         
-        if label_filter == "Semua":
-            display_df = df
-        else:
-            display_df = df[df['Label'] == label_filter]
-        
         # Show statistics
-        numeric_cols = ['Umur', 'Jam Belajar per Hari', 'Jam Tidur per Hari', 'Jumlah Tugas Besar per Minggu']
-        st.dataframe(display_df[numeric_cols].describe(), use_container_width=True)
\ No newline at end of file
+        st.dataframe(summary['describe'][label_filter], use_container_width=True)
\ No newline at end of file
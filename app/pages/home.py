@@ -1,22 +1,22 @@
 import streamlit as st
 import plotly.express as px
 
-def show_home_page(df, accuracy, f1):
-    """Display home page with overview"""
+def show_home_page(summary, accuracy, f1):
+    """Display home page with overview (from the precomputed dataset summary)"""
     st.markdown("## 📋 Ringkasan Dataset")
     
     # Metrics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("📊 Total Data", f"{len(df):,}")
+        st.metric("📊 Total Data", f"{summary['n_rows']:,}")
     with col2:
         st.metric("🎯 Akurasi Model", f"{accuracy*100:.1f}%")
     with col3:
-        sehat_count = len(df[df['Label'] == 'Sehat'])
+        sehat_count = int(summary['label_counts'].get('Sehat', 0))
         st.metric("✅ Data Sehat", f"{sehat_count:,}")
     with col4:
-        stres_count = len(df[df['Label'] == 'Risiko Stres'])
+        stres_count = int(summary['label_counts'].get('Risiko Stres', 0))
         st.metric("⚠️ Data Risiko Stres", f"{stres_count:,}")
     
     st.markdown("---")
@@ -26,7 +26,7 @@ def show_home_page(df, accuracy, f1):
     
     with col1:
         st.markdown("### 🎯 Distribusi Label")
-        label_counts = df['Label'].value_counts()
+        label_counts = summary['label_counts']
         fig = px.pie(
             values=label_counts.values, 
             names=label_counts.index,
@@ -42,7 +42,7 @@ def show_home_page(df, accuracy, f1):
     
     with col2:
         st.markdown("### 👤 Distribusi Gender")
-        gender_counts = df['Gender'].value_counts()
+        gender_counts = summary['gender_counts']
         fig = px.pie(
             values=gender_counts.values, 
             names=gender_counts.index,
@@ -58,4 +58,4 @@ def show_home_page(df, accuracy, f1):
     
     # Sample data
     st.markdown("### 📄 Contoh Data")
-    st.dataframe(df.head(10), use_container_width=True)
\ No newline at end of file
+    st.dataframe(summary['head'], use_container_width=True)
\ No newline at end of file
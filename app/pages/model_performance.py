@@ -2,7 +2,7 @@ import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
 
-def show_model_performance(accuracy, f1, cm, model):
+def show_model_performance(accuracy, f1, cm, model, permutation=None):
     """Display model performance page"""
     st.markdown("## 📊 Performa Model Random Forest")
     
@@ -69,11 +69,16 @@ def show_model_performance(accuracy, f1, cm, model):
     st.markdown("### 🔍 Fitur Paling Berpengaruh")
     
     try:
-        # Get feature importance from the Random Forest model
-        importances = model.named_steps['classifier'].feature_importances_
-        
-        # Get feature names after preprocessing
-        feature_names = model.named_steps['preprocessor'].get_feature_names_out()
+        if hasattr(model, 'named_steps'):
+            # Get feature importance from the Random Forest model
+            importances = model.named_steps['classifier'].feature_importances_
+            
+            # Get feature names after preprocessing
+            feature_names = model.named_steps['preprocessor'].get_feature_names_out()
+        else:
+            # Compiled inference engine keeps both arrays from the source pipeline
+            importances = model.feature_importances_
+            feature_names = model.feature_names_out_
         
         # Create a dictionary of feature importance
         import pandas as pd
@@ -111,6 +116,37 @@ def show_model_performance(accuracy, f1, cm, model):
     except Exception as e:
         st.warning(f"Feature importance tidak dapat ditampilkan: {str(e)}")
     
+    # Permutation importance per original input column
+    if permutation is not None:
+        st.markdown("---")
+        st.markdown("### 🔀 Permutation Importance")
+        
+        fig = px.bar(
+            permutation,
+            x='Importance',
+            y='Fitur',
+            error_x='Std',
+            orientation='h',
+            title='Penurunan F1-Score saat Fitur Diacak',
+            color='Importance',
+            color_continuous_scale='Viridis'
+        )
+        fig.update_layout(
+            yaxis={'categoryorder':'total ascending'},
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(size=12),
+            height=400
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        st.info("""
+        💡 **Interpretasi Permutation Importance:**
+        - Nilai diukur pada data uji: seberapa besar F1-Score turun jika satu fitur asli diacak
+        - Fitur kategorikal diacak sebagai satu kesatuan (semua kolom one-hot sekaligus)
+        - Nilai mendekati nol berarti model hampir tidak bergantung pada fitur tersebut
+        """)
+    
     # Model explanation
     st.markdown("---")
     st.markdown("### 🧠 Tentang Model")
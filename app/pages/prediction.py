@@ -1,8 +1,19 @@
 import streamlit as st
+import io
+from functools import partial
 import pandas as pd
-from src.utils import generate_certificate_image
-
-def show_prediction_page(df, model, stats):
+from src.certificate_export import cards_from_predictions, export_cards
+from src.instrumentation import stage
+from src.recommendations import evaluate_rules, recommendation_messages
+from src.utils import get_certificate_renderer
+
+def build_cards_zip(data_batch, result):
+    """ZIP with one result card per entry, built when the batch download is clicked"""
+    buf = io.BytesIO()
+    export_cards(cards_from_predictions(data_batch, result), buf, 'zip')
+    return buf.getvalue()
+
+def show_prediction_page(jurusan_list, service, explainer=None):
     st.markdown("## 🔮 Prediksi Risiko Stres")
 
     st.warning("""
@@ -21,8 +32,6 @@ def show_prediction_page(df, model, stats):
     if "show_result" not in st.session_state:
         st.session_state.show_result = False
 
-    jurusan_list = df['Jurusan/Program Studi'].unique().tolist()
-    
     # Use reset_counter in key to force widget recreation
     reset_key = st.session_state.reset_counter
 
@@ -88,28 +97,31 @@ def show_prediction_page(df, model, stats):
 
     # Only show results if prediction button was clicked
     if st.session_state.show_result and 'prediction_data' in st.session_state:
-        for idx, data in enumerate(st.session_state.prediction_data):
+        prediction_data = st.session_state.prediction_data
+
+        # Score every entry with a single forest evaluation
+        with stage("predict_batch"):
+            result = service.predict_batch(prediction_data)
+
+        input_df = service.build_input_frame(prediction_data)
+
+        # Personalized recommendations for the whole batch at once
+        with stage("recommendations"):
+            fired = evaluate_rules(input_df, result.labels)
+            input_rows = input_df.to_dict('records')
+
+        explanations = None
+        if explainer is not None:
+            with stage("explanations"):
+                explanations, _ = explainer.explain(input_df)
+
+        for idx, data in enumerate(prediction_data):
             st.markdown("---")
             st.markdown(f"## 📊 Hasil Prediksi Data ke-{idx+1}")
 
-            input_df = pd.DataFrame({
-                "Gender": [data["Gender"]],
-                "Umur": [data["Umur"]],
-                "Jurusan/Program Studi": [data["Jurusan/Program Studi"]],
-                "Jam Belajar per Hari": [(data["Jam Belajar"] - stats['mean']['Jam Belajar per Hari']) / stats['std']['Jam Belajar per Hari']],
-                "Jam Tidur per Hari": [(data["Jam Tidur"] - stats['mean']['Jam Tidur per Hari']) / stats['std']['Jam Tidur per Hari']],
-                "IPK": [(data["IPK"] - stats['mean']['IPK']) / stats['std']['IPK']],
-                "Jumlah Tugas Besar per Minggu": [(data["Jumlah Tugas"] - stats['mean']['Jumlah Tugas Besar per Minggu']) / stats['std']['Jumlah Tugas Besar per Minggu']],
-                "Frekuensi Olahraga": [data["Olahraga"]],
-                "Pemasukan Keluarga": [data["Pemasukan Keluarga"]],
-                "Status Hubungan": [data["Status Hubungan"]]
-            })
-
-            pred = model.predict(input_df)[0]
-            proba = model.predict_proba(input_df)[0]
-
-            sehat_idx = list(model.classes_).index("Sehat")
-            stres_idx = list(model.classes_).index("Risiko Stres")
+            pred = result.labels[idx]
+            proba_sehat = result.proba_sehat[idx]
+            proba_stres = result.proba_stres[idx]
 
             if pred == "Sehat":
                 st.markdown("""
@@ -127,40 +139,14 @@ def show_prediction_page(df, model, stats):
                 """, unsafe_allow_html=True)
 
             col1, col2 = st.columns(2)
-            col1.metric("Probabilitas Sehat", f"{proba[sehat_idx]*100:.1f}%")
-            col2.metric("Probabilitas Risiko Stres", f"{proba[stres_idx]*100:.1f}%")
+            col1.metric("Probabilitas Sehat", f"{proba_sehat*100:.1f}%")
+            col2.metric("Probabilitas Risiko Stres", f"{proba_stres*100:.1f}%")
+
+            if explanations is not None:
+                show_explanation(explanations[idx])
+
+            recommendations = recommendation_messages(fired[idx], input_rows[idx])
 
-            # Generate personalized recommendations based on input data
-            recommendations = []
-            
-            # Check sleep hours
-            if data["Jam Tidur"] < 6:
-                recommendations.append(f"⏰ **Tingkatkan jam tidur** dari {data['Jam Tidur']} jam menjadi 7-9 jam per hari untuk pemulihan optimal")
-            elif data["Jam Tidur"] > 9:
-                recommendations.append(f"⏰ **Kurangi jam tidur** dari {data['Jam Tidur']} jam menjadi 7-9 jam (tidur berlebihan bisa menurunkan produktivitas)")
-            
-            # Check study hours
-            if data["Jam Belajar"] > 6:
-                recommendations.append(f"📚 **Atur ulang waktu belajar** - {data['Jam Belajar']} jam terlalu lama. Fokus pada kualitas, bukan kuantitas (4-5 jam efektif lebih baik)")
-            elif data["Jam Belajar"] < 2:
-                recommendations.append(f"📚 **Tambah waktu belajar** dari {data['Jam Belajar']} jam menjadi minimal 3-4 jam per hari")
-            
-            # Check exercise
-            if data["Olahraga"] == "Jarang":
-                recommendations.append("🏃 **Mulai olahraga rutin** minimal 3x seminggu (30 menit) untuk mengurangi stres dan meningkatkan fokus")
-            
-            # Check GPA
-            if data["IPK"] < 2.5:
-                recommendations.append(f"📈 **Tingkatkan strategi belajar** - IPK {data['IPK']:.2f} perlu perhatian khusus. Pertimbangkan belajar kelompok atau konsultasi dosen")
-            
-            # Check workload
-            if data["Jumlah Tugas"] >= 4:
-                recommendations.append(f"📝 **Kelola beban tugas** - {data['Jumlah Tugas']} tugas besar per minggu sangat tinggi. Buat prioritas dan deadline yang realistis")
-            
-            # Check relationship status for stress context
-            if data["Status Hubungan"] == "Dalam hubungan" and pred == "Risiko Stres":
-                recommendations.append("💑 **Balance kehidupan pribadi** - Komunikasikan kebutuhan waktu belajar dengan pasangan")
-            
             if pred == "Risiko Stres":
                 if recommendations:
                     st.warning("💡 **Rekomendasi Personal untuk Anda:**\n\n" + "\n".join([f"- {rec}" for rec in recommendations]))
@@ -173,15 +159,8 @@ def show_prediction_page(df, model, stats):
                     - Konsultasi dengan konselor jika diperlukan
                     """)
             else:
-                positive_tips = []
-                if data["Jam Tidur"] >= 7 and data["Jam Tidur"] <= 9:
-                    positive_tips.append(f"✅ Pola tidur Anda ({data['Jam Tidur']} jam) sudah ideal!")
-                if data["Olahraga"] in ["Kadang", "Sering"]:
-                    positive_tips.append(f"✅ Kebiasaan olahraga '{data['Olahraga']}' sangat baik!")
-                if data["IPK"] >= 3.0:
-                    positive_tips.append(f"✅ IPK {data['IPK']:.2f} menunjukkan performa akademik yang baik!")
-                
-                tips_text = "\n".join([f"- {tip}" for tip in positive_tips]) if positive_tips else ""
+                # For "Sehat" rows the fired rules are the positive tips
+                tips_text = "\n".join([f"- {tip}" for tip in recommendations]) if recommendations else ""
                 
                 st.success(f"""
                 💡 **Pertahankan Pola Hidup Sehat!**
@@ -194,19 +173,64 @@ def show_prediction_page(df, model, stats):
 - Luangkan waktu untuk hobi dan relaksasi
                 """)
 
-            # Generate image for download
-            img_bytes = generate_certificate_image(
+            # The card is only rendered when the download button is clicked
+            renderer = get_certificate_renderer()
+            render_card = partial(
+                renderer.render,
                 data["Nama"], 
                 pred, 
-                proba[sehat_idx]*100, 
-                proba[stres_idx]*100, 
+                proba_sehat*100, 
+                proba_stres*100, 
                 data
             )
             
             st.download_button(
-                label="📥 Download Kartu Hasil (PNG)",
-                data=img_bytes,
-                file_name=f"Hasil_Prediksi_{data['Nama']}.png",
-                mime="image/png",
+                label=f"📥 Download Kartu Hasil ({renderer.format})",
+                data=render_card,
+                file_name=f"Hasil_Prediksi_{data['Nama']}.{renderer.extension}",
+                mime=renderer.mime,
                 key=f"dl_{idx}"
-            )
\ No newline at end of file
+            )
+
+        if len(prediction_data) > 1:
+            st.markdown("---")
+            st.download_button(
+                label=f"📦 Download Semua Kartu ({len(prediction_data)} PNG dalam ZIP)",
+                data=partial(build_cards_zip, prediction_data, result),
+                file_name="Hasil_Prediksi_Semua.zip",
+                mime="application/zip",
+                key="dl_all"
+            )
+
+def show_explanation(contributions, top=5):
+    """Expander listing the inputs that moved this prediction's risk probability the most"""
+    with st.expander("🔍 Faktor yang mempengaruhi hasil ini"):
+        lines = []
+        for _, row in contributions.head(top).iterrows():
+            arrow = "⬆️" if row["Kontribusi"] > 0 else "⬇️"
+            lines.append(f"- {arrow} **{row['Fitur']}**: {row['Kontribusi']*100:+.1f} poin probabilitas Risiko Stres")
+        st.markdown("\n".join(lines))
+        st.caption("Kontribusi dihitung dari jalur keputusan setiap pohon pada Random Forest.")
+
+def show_timing_panel(traces, cache_stats=None):
+    """Debug expander with the stage breakdown (ms) of the last requests and the prediction cache counters"""
+    with st.expander(f"🛠️ Debug: waktu per tahap ({len(traces)} request terakhir)"):
+        if cache_stats is not None:
+            st.caption(
+                f"Cache prediksi: {cache_stats['hits']} hit, {cache_stats['misses']} miss "
+                f"({cache_stats['hit_rate'] * 100:.0f}%), {cache_stats['entries']}/{cache_stats['max_entries']} entri, "
+                f"{cache_stats['expired']} kedaluwarsa, {cache_stats['evictions']} dibuang"
+            )
+        if not traces:
+            st.info("Belum ada request yang tercatat.")
+            return
+
+        rows = []
+        for trace in traces:
+            row = {"Waktu": trace["started_at"], "Request": trace["request"], "Total (ms)": trace["total_ms"],
+                   # Model stages of a shared scoring batch are the same wall time for every session in it
+                   "Batch (sesi)": trace.get("batch", {}).get("requests", 1)}
+            for name, ms in trace["stages"]:
+                row[f"{name} (ms)"] = row.get(f"{name} (ms)", 0.0) + ms
+            rows.append(row)
+        st.dataframe(pd.DataFrame(rows).round(2), use_container_width=True, hide_index=True)
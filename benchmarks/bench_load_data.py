@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.data_preprocessing import ingest_dataset
+
+# Runs in a fresh interpreter per measurement. ru_maxrss survives fork/exec (the child
+# would inherit this process's peak), so the Linux high-water mark is reset instead.
+_CHILD = """
+import json, sys, time
+import pandas as pd
+import pyarrow.parquet
+sys.path.insert(0, {root!r})
+from src.data_preprocessing import load_data
+
+def status_kb(key):
+    with open('/proc/self/status') as f:
+        return int(next(line for line in f if line.startswith(key)).split()[1])
+
+with open('/proc/self/clear_refs', 'w') as f:
+    f.write('5')
+before = status_kb('VmRSS')
+start = time.perf_counter()
+if {method!r} == 'csv':
+    df = pd.read_csv({csv!r}, sep=';', usecols={columns!r})
+else:
+    df = load_data({csv!r}, columns={columns!r})
+elapsed = time.perf_counter() - start
+# Categorical groupby, as done by the summary and analysis pages
+start = time.perf_counter()
+df.groupby({group!r}, observed=True).size()
+groupby = time.perf_counter() - start
+peak = status_kb('VmHWM')
+print(json.dumps({{'load_s': elapsed, 'groupby_s': groupby, 'peak_kb': peak - before,
+                  'frame_kb': int(df.memory_usage(deep=True).sum() / 1024)}}))
+"""
+
+
+def measure(method, csv_path, columns, group, repeat):
+    """Best-of-repeat load time and the matching peak RSS increase (Linux only)"""
+    code = _CHILD.format(root=ROOT, method=method, csv=csv_path, columns=columns, group=group)
+    runs = [json.loads(subprocess.run([sys.executable, '-c', code], capture_output=True,
+                                      text=True, check=True).stdout) for _ in range(repeat)]
+    return min(runs, key=lambda run: run['load_s'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare load_data from the raw CSV and from the Parquet copy")
+    parser.add_argument('--scale', type=int, default=100, help="Replicate data/raw/dataset.csv this many times (default: 100)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    source = pd.read_csv(os.path.join(ROOT, 'data', 'raw', 'dataset.csv'), sep=';')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'raw', 'dataset.csv')
+        os.makedirs(os.path.dirname(csv_path))
+        pd.concat([source] * args.scale, ignore_index=True).to_csv(csv_path, sep=';', index=False)
+        ingest_dataset(csv_path)
+
+        print(f"📊 {len(source) * args.scale:,} rows (dataset x{args.scale}), best of {args.repeat}\n")
+        print(f"{'method':<10} {'columns':<10} {'load (ms)':>10} {'groupby (ms)':>13} {'peak RSS (MB)':>14} {'frame (MB)':>11}")
+        projections = {'all': None, 'label+cat': ['Jurusan/Program Studi', 'Label']}
+        for name, columns in projections.items():
+            for method in ('csv', 'parquet'):
+                result = measure(method, csv_path, columns, ['Jurusan/Program Studi', 'Label'], args.repeat)
+                print(f"{method:<10} {name:<10} {result['load_s'] * 1000:>10.1f} {result['groupby_s'] * 1000:>13.1f} "
+                      f"{result['peak_kb'] / 1024:>14.1f} {result['frame_kb'] / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
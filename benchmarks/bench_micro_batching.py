@@ -0,0 +1,85 @@
+import argparse
+import os
+import pickle
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.load_test import random_entry
+from src.model_bundle import load_bundle
+from src.prediction_service import PredictionService, QueuedPredictionService
+
+
+def load_engine(engine):
+    if engine == 'bundle':
+        return load_bundle(os.path.join(ROOT, 'models', 'best_model.rfb'))
+    with open(os.path.join(ROOT, 'models', 'best_model.pkl'), 'rb') as f:
+        return pickle.load(f)
+
+
+def simulate(service, sessions, clicks, entries_per_click, spread, seed=0):
+    """Sessions as threads clicking "Prediksi Sekarang" at random moments within `spread` seconds"""
+    rng = random.Random(seed)
+    plans = [[(rng.uniform(0, spread), [random_entry(rng) for _ in range(entries_per_click)]) for _ in range(clicks)]
+             for _ in range(sessions)]
+    for plan in plans:
+        plan.sort(key=lambda click: click[0])
+
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(sessions + 1)
+
+    def session(plan):
+        barrier.wait()
+        for at, data_batch in plan:
+            delay = start + at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            t0 = time.perf_counter()
+            service.predict_batch(data_batch)
+            with lock:
+                latencies.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=session, args=(plan,)) for plan in plans]
+    for thread in threads:
+        thread.start()
+    start = time.perf_counter()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated concurrent sessions: direct scoring vs the shared micro-batching queue")
+    parser.add_argument('--sessions', type=int, default=40, help="Concurrent sessions (default: 40)")
+    parser.add_argument('--clicks', type=int, default=5, help="Predictions per session (default: 5)")
+    parser.add_argument('--entries', type=int, default=1, help="Form entries per prediction (default: 1)")
+    parser.add_argument('--spread', type=float, default=1.0, help="Clicks land within this many seconds (default: 1.0)")
+    parser.add_argument('--engines', nargs='+', default=['bundle', 'sklearn'], choices=['bundle', 'sklearn'])
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"📊 {args.sessions} sessions x {args.clicks} clicks x {args.entries} entries, clicks within {args.spread}s\n")
+    print(f"{'engine':<8} {'mode':<8} {'calls/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} {'forest calls':>13}")
+    for engine in args.engines:
+        service = PredictionService(load_engine(engine))
+        service.predict_batch([random_entry(random.Random(0))])  # warm-up
+        queued = QueuedPredictionService(service, args.max_batch, args.max_wait_ms)
+        for mode, front in (('direct', service), ('queued', queued)):
+            latencies, elapsed = simulate(front, args.sessions, args.clicks, args.entries, args.spread)
+            ms = latencies * 1000
+            calls = queued.batcher.batches if mode == 'queued' else len(latencies)
+            print(f"{engine:<8} {mode:<8} {len(latencies) / elapsed:>9,.0f} {np.percentile(ms, 50):>9.1f} "
+                  f"{np.percentile(ms, 99):>9.1f} {ms.max():>9.1f} {calls:>13,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SOURCE_PATH = os.path.join(ROOT, 'data', 'raw', 'dataset.csv')
+MODEL_PATH = os.path.join(ROOT, 'models', 'best_model.pkl')
+BUNDLE_PATH = os.path.join(ROOT, 'models', 'best_model.rfb')
+DEFAULT_HISTORY = os.path.join(ROOT, 'benchmarks', 'history.json')
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'resiko_bench_data')
+
+# name -> (unit, largest dataset it runs on by default, runs once per suite instead of per size)
+BENCHMARKS = {
+    'load_data': ('rows', None, False),
+    'preprocess_data': ('rows', None, False),
+    'get_preprocessing_stats': ('rows', None, False),
+    'train_model': ('rows', 1_000_000, False),
+    'predict_single': ('calls', None, True),
+    'predict_batch': ('rows', None, False),
+    'predict_batch_bundle': ('rows', None, False),
+    'predict_batch_discretized': ('rows', None, False),
+    'recommendations': ('rows', None, False),
+    'generate_certificate_image': ('cards', None, True),
+}
+
+# Work per once-per-suite benchmark
+SINGLE_CALLS = 100
+CERTIFICATE_CARDS = 50
+
+GENERATE_CHUNK_ROWS = 1_000_000
+
+
+def synthetic_dataset(rows, data_dir=DEFAULT_DATA_DIR, seed=0):
+    """CSV with the schema of dataset.csv, made by resampling its rows (messy IPK strings included).
+
+    Files are reused across runs and also ingested to Parquet, as the app does.
+    """
+    from src.data_preprocessing import ingest_dataset
+    from src.evaluation import dataset_fingerprint
+
+    directory = os.path.join(data_dir, f"{rows}_{dataset_fingerprint(SOURCE_PATH)[:12]}")
+    csv_path = os.path.join(directory, 'raw', 'dataset.csv')
+    if os.path.exists(csv_path):
+        return csv_path
+
+    source = pd.read_csv(SOURCE_PATH, sep=';', dtype=str)
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    partial = csv_path + '.tmp'
+    for start in range(0, rows, GENERATE_CHUNK_ROWS):
+        n = min(GENERATE_CHUNK_ROWS, rows - start)
+        chunk = source.iloc[rng.integers(0, len(source), n)]
+        chunk.to_csv(partial, sep=';', index=False, header=start == 0, mode='w' if start == 0 else 'a')
+    os.replace(partial, csv_path)
+    ingest_dataset(csv_path)
+    return csv_path
+
+
+# --- measured in a fresh interpreter per (benchmark, rows) ---
+
+def _status_kb(key):
+    with open('/proc/self/status') as f:
+        return int(next(line for line in f if line.startswith(key)).split()[1])
+
+
+def _reset_peak():
+    """Restart the peak RSS counter at the current RSS (Linux); ru_maxrss cannot be reset"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_mb(resettable):
+    if resettable:
+        return _status_kb('VmHWM') / 1024
+    import resource
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1024 / 1024
+
+
+def _prepare(name, csv_path):
+    """Untimed setup; returns (operation, items processed per call)"""
+    import pickle
+
+    from src.data_preprocessing import get_preprocessing_stats, load_data, preprocess_data
+
+    if name == 'load_data':
+        return (lambda: load_data(csv_path)), None
+    if name == 'generate_certificate_image':
+        from src.utils import generate_certificate_image
+        # Distinct names, otherwise the renderer memo would answer
+        calls = iter(range(10 ** 9))
+        summary = {'Umur': 20, 'IPK': 3.25, 'Jam Belajar': 6, 'Jam Tidur': 7, 'Jumlah Tugas': 2}
+
+        def render():
+            for _ in range(CERTIFICATE_CARDS):
+                generate_certificate_image(f"Mahasiswa {next(calls)}", 'Sehat', 80.0, 20.0, summary)
+        return render, CERTIFICATE_CARDS
+
+    df = load_data(csv_path)
+    if name == 'preprocess_data':
+        return (lambda: preprocess_data(df)), len(df)
+    if name == 'get_preprocessing_stats':
+        return (lambda: get_preprocessing_stats(df)), len(df)
+    if name == 'train_model':
+        from src.model_training import train_model
+        return (lambda: train_model(df)), len(df)
+
+    X = df.drop(columns='Label')
+    if name == 'recommendations':
+        from src.recommendations import evaluate_rules, recommendation_codes
+        # Actual labels stand in for predictions: rule cost does not depend on the model
+        labels = df['Label'].to_numpy(dtype=object)
+        return (lambda: recommendation_codes(evaluate_rules(X, labels))), len(X)
+    if name == 'predict_batch_bundle':
+        from src.model_bundle import load_bundle
+        bundle = load_bundle(BUNDLE_PATH)
+        return (lambda: bundle.predict_proba(X)), len(X)
+
+    with open(MODEL_PATH, 'rb') as f:
+        model = pickle.load(f)
+    if name == 'predict_batch':
+        return (lambda: model.predict_proba(X)), len(X)
+    if name == 'predict_batch_discretized':
+        from src.discretization import DiscretizedForest
+        from src.inference import compile_pipeline
+        forest = DiscretizedForest(compile_pipeline(model))
+        return (lambda: forest.predict_proba(X)), len(X)
+    if name == 'predict_single':
+        rows = [X.iloc[[i % len(X)]] for i in range(SINGLE_CALLS)]
+
+        def predict_rows():
+            for row in rows:
+                model.predict_proba(row)
+        return predict_rows, SINGLE_CALLS
+
+    raise ValueError(f"Unknown benchmark '{name}'")
+
+
+def run_child(name, csv_path, repeat):
+    operation, items = _prepare(name, csv_path)
+    resettable = _reset_peak()
+    baseline = _status_kb('VmRSS') / 1024 if resettable else 0.0
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = operation()
+        times.append(time.perf_counter() - start)
+        if items is None:
+            items = len(output)
+        del output
+
+    wall = min(times)
+    peak = _peak_mb(resettable)
+    print(json.dumps({'wall_s': wall, 'peak_rss_mb': peak, 'delta_rss_mb': peak - baseline,
+                      'items': items, 'throughput': items / wall if wall else None}))
+
+
+def measure(name, csv_path, repeat):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '_child', name, csv_path, str(repeat)],
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# --- history ---
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_history(history, path):
+    partial = path + '.tmp'
+    with open(partial, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=1)
+    os.replace(partial, path)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment():
+    import sklearn
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+            'sklearn': sklearn.__version__, 'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+
+def find_run(history, run_id):
+    """A run by id, or by position (-1 = latest)"""
+    for run in history:
+        if run['run_id'] == run_id:
+            return run
+    try:
+        return history[int(run_id)]
+    except (ValueError, IndexError):
+        raise SystemExit(f"❌ Run '{run_id}' not found in history")
+
+
+def compare_runs(baseline, candidate, threshold=0.10, min_seconds=0.005, min_mb=5.0):
+    """Per (benchmark, rows) changes; a regression is a slowdown or RSS growth beyond threshold.
+
+    Tiny absolute differences (timer noise) never count as regressions.
+    """
+    before = {(r['benchmark'], r['rows']): r for r in baseline['results']}
+    rows = []
+    for result in candidate['results']:
+        old = before.get((result['benchmark'], result['rows']))
+        if old is None:
+            continue
+        time_ratio = result['wall_s'] / old['wall_s'] if old['wall_s'] else float('inf')
+        rss_ratio = result['peak_rss_mb'] / old['peak_rss_mb'] if old['peak_rss_mb'] else float('inf')
+        slower = time_ratio > 1 + threshold and result['wall_s'] - old['wall_s'] > min_seconds
+        bigger = rss_ratio > 1 + threshold and result['peak_rss_mb'] - old['peak_rss_mb'] > min_mb
+        rows.append({'benchmark': result['benchmark'], 'rows': result['rows'],
+                     'wall_before': old['wall_s'], 'wall_after': result['wall_s'], 'time_ratio': time_ratio,
+                     'rss_before': old['peak_rss_mb'], 'rss_after': result['peak_rss_mb'], 'rss_ratio': rss_ratio,
+                     'regression': slower or bigger,
+                     'reason': ', '.join(reason for reason, flag in (('time', slower), ('memory', bigger)) if flag)})
+    return rows
+
+
+# --- commands ---
+
+def command_run(args):
+    names = args.only or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"❌ Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    print("=" * 80)
+    print("BENCHMARK SUITE")
+    print("=" * 80)
+    print(f"\n📊 Sizes: {', '.join(f'{n:,}' for n in args.sizes)} rows | best of {args.repeat}")
+
+    datasets = {}
+    for rows in args.sizes:
+        start = time.perf_counter()
+        datasets[rows] = synthetic_dataset(rows, args.data_dir)
+        print(f"📂 {rows:>12,} rows: {datasets[rows]} ({time.perf_counter() - start:.1f}s)")
+
+    print(f"\n{'benchmark':<28} {'rows':>12} {'wall (ms)':>12} {'peak RSS (MB)':>14} {'throughput':>20}")
+    results = []
+    for name in names:
+        unit, max_rows, once = BENCHMARKS[name]
+        sizes = args.sizes[:1] if once else [rows for rows in args.sizes
+                                            if args.all_sizes or max_rows is None or rows <= max_rows]
+        for rows in sizes:
+            result = measure(name, datasets[rows], args.repeat)
+            result.update(benchmark=name, rows=None if once else rows, unit=f"{unit}/s")
+            results.append(result)
+            size = '-' if once else f"{rows:,}"
+            print(f"{name:<28} {size:>12} {result['wall_s'] * 1000:>12.1f} {result['peak_rss_mb']:>14.1f} "
+                  f"{result['throughput']:>14,.0f} {unit}/s")
+
+    run = {'run_id': datetime.now().strftime('%Y%m%d-%H%M%S'), 'created_at': datetime.now().isoformat(timespec='seconds'),
+           'commit': _git_commit(), 'label': args.label, 'repeat': args.repeat,
+           'environment': _environment(), 'results': results}
+    history = load_history(args.history)
+    history.append(run)
+    save_history(history, args.history)
+    print(f"\n💾 Run {run['run_id']} appended to {args.history}")
+
+
+def command_compare(args):
+    history = load_history(args.history)
+    if len(history) < 2 and (args.baseline is None or args.candidate is None):
+        raise SystemExit("❌ Need at least two runs in the history to compare")
+
+    baseline = find_run(history, args.baseline or '-2')
+    candidate = find_run(history, args.candidate or '-1')
+    rows = compare_runs(baseline, candidate, args.threshold)
+
+    print(f"📊 {baseline['run_id']} ({baseline.get('commit')}) -> {candidate['run_id']} ({candidate.get('commit')}), "
+          f"threshold {args.threshold * 100:.0f}%\n")
+    print(f"{'benchmark':<28} {'rows':>12} {'wall (ms)':>22} {'change':>8} {'peak RSS (MB)':>18} {'change':>8}")
+    for row in rows:
+        size = '-' if row['rows'] is None else f"{row['rows']:,}"
+        flag = f"  ⚠️  {row['reason']}" if row['regression'] else ''
+        print(f"{row['benchmark']:<28} {size:>12} "
+              f"{row['wall_before'] * 1000:>10.1f} → {row['wall_after'] * 1000:>9.1f} {(row['time_ratio'] - 1) * 100:>+7.1f}% "
+              f"{row['rss_before']:>8.1f} → {row['rss_after']:>7.1f} {(row['rss_ratio'] - 1) * 100:>+7.1f}%{flag}")
+
+    regressions = [row for row in rows if row['regression']]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold * 100:.0f}%")
+        sys.exit(1)
+    print("\n✅ No regressions")
+
+
+def command_list(args):
+    for i, run in enumerate(load_history(args.history)):
+        print(f"{i:>3}  {run['run_id']}  {run.get('commit') or '-':<9} {len(run['results']):>3} results  {run.get('label') or ''}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '_child':
+        run_child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    parser = argparse.ArgumentParser(description="Time preprocessing, training, inference and certificate rendering")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="JSON history file (default: benchmarks/history.json)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="Run the suite and append the results to the history")
+    run.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                     help="Synthetic dataset sizes, up to 10,000,000 (default: 1000 10000 100000)")
+    run.add_argument('--only', nargs='+', metavar='BENCHMARK', help=f"Subset of: {', '.join(BENCHMARKS)}")
+    run.add_argument('--repeat', type=int, default=3, help="Best of this many runs (default: 3)")
+    run.add_argument('--all-sizes', action='store_true', help="Also train on sizes above 1,000,000 rows")
+    run.add_argument('--label', help="Free-text note stored with the run")
+    run.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="Where synthetic datasets are generated and reused")
+    run.set_defaults(func=command_run)
+
+    compare = commands.add_parser('compare', help="Compare two runs and exit with 1 on regressions")
+    compare.add_argument('--baseline', help="Run id or index (default: second to last)")
+    compare.add_argument('--candidate', help="Run id or index (default: last)")
+    compare.add_argument('--threshold', type=float, default=0.10, help="Allowed slowdown / RSS growth (default: 0.10)")
+    compare.set_defaults(func=command_compare)
+
+    commands.add_parser('list', help="List the runs in the history").set_defaults(func=command_list)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+SAMPLE_ENTRY = {
+    'Gender': 'Perempuan', 'Umur': 20, 'Jurusan/Program Studi': 'Teknik Informatika',
+    'Status Hubungan': 'Jomblo', 'Pemasukan Keluarga': 'Sedang', 'IPK': 3.1,
+    'Jam Belajar': 4, 'Jam Tidur': 6, 'Jumlah Tugas': 2, 'Olahraga': 'Jarang',
+}
+
+
+def random_entry(rng):
+    """Form-like entry with varied values, so responses are not all identical"""
+    return dict(SAMPLE_ENTRY, Umur=rng.randint(18, 25), IPK=round(rng.uniform(2.0, 4.0), 2),
+                **{'Jam Belajar': rng.randint(1, 7), 'Jam Tidur': rng.randint(3, 9), 'Jumlah Tugas': rng.randint(0, 5)})
+
+
+async def _request(reader, writer, host, path, body):
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode('ascii') + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(host, port, path, bodies, deadline, latencies, errors):
+    """One keep-alive connection sending requests back to back until the deadline"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        i = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status = await _request(reader, writer, host, path, bodies[i % len(bodies)])
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+            i += 1
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, concurrency, duration, batch_size, seed=0):
+    rng = random.Random(seed)
+    if batch_size == 1:
+        path = '/predict'
+        bodies = [json.dumps(random_entry(rng)).encode() for _ in range(256)]
+    else:
+        path = '/predict/batch'
+        bodies = [json.dumps({'instances': [random_entry(rng) for _ in range(batch_size)]}).encode() for _ in range(64)]
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, path, bodies, start + duration, latencies, errors)
+                           for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for serve_api.py: latency percentiles and throughput")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32], help="Concurrent connections (default: 1 8 32)")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per concurrency level (default: 10)")
+    parser.add_argument('--batch-size', type=int, default=1, help="Entries per request, 1 = /predict (default: 1)")
+    args = parser.parse_args()
+
+    print(f"📊 http://{args.host}:{args.port} | {args.duration:.0f}s per level | {args.batch_size} entries/request\n")
+    print(f"{'conc.':>6} {'requests':>9} {'req/s':>9} {'rows/s':>10} {'p50 (ms)':>9} {'p90 (ms)':>9} {'p99 (ms)':>9} {'errors':>7}")
+    for concurrency in args.concurrency:
+        latencies, errors, elapsed = asyncio.run(run_load(args.host, args.port, concurrency, args.duration, args.batch_size))
+        ms = np.array(latencies) * 1000
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99]) if len(ms) else (float('nan'),) * 3
+        rate = len(latencies) / elapsed
+        print(f"{concurrency:>6} {len(latencies):>9,} {rate:>9,.0f} {rate * args.batch_size:>10,.0f} "
+              f"{p50:>9.2f} {p90:>9.2f} {p99:>9.2f} {len(errors):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import os
+import pickle
+import time
+from datetime import datetime
+
+import numpy as np
+
+from src.inference import compile_pipeline
+from src.lookup_table import GridLookupModel, build_lookup_table, save_lookup_table, verify_lookup_table
+
+MODEL_PATH = 'models/best_model.pkl'
+LOOKUP_PATH = 'models/best_model.lut'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the saved model's predictions for every prediction form input")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--output', default=LOOKUP_PATH)
+    parser.add_argument('--verify-rows', type=int, default=200_000,
+                        help="Random raw form inputs also compared with the live pipeline (default: 200000)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=0, help="Worker processes, 0 = all cores (default: 0)")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    print("=" * 80)
+    print("BUILD LOOKUP TABLE")
+    print("=" * 80)
+
+    with open(args.model, 'rb') as f:
+        model = pickle.load(f)
+    compiled = compile_pipeline(model)
+
+    def progress(done, total):
+        if done == total or done % max(1, total // 10) == 0:
+            print(f"  • {done}/{total} category combinations")
+
+    print(f"\n🧮 Scoring the form input space of {args.model} and checking every cell ({workers} workers)...")
+    start = time.perf_counter()
+    try:
+        header, cells = build_lookup_table(compiled, workers=workers, progress=progress)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}, nothing was written")
+    build_s = time.perf_counter() - start
+    print(f"✅ {len(cells):,} cells ({cells.nbytes / 1e6:.0f} MB) in {build_s:.1f}s, float64 sums equal to the forest, labels of the float32 cells too")
+    print(f"  • Max probability difference (float32 storage): {header['verification']['max_abs_diff']:.2e}")
+    for column in header['numeric']:
+        n_cells = int(np.count_nonzero(np.asarray(column['coordinate']) >= 0))
+        print(f"  • {column['column']}: {n_cells} threshold intervals")
+
+    print(f"\n🔍 End-to-end check against the live pipeline ({args.verify_rows:,} random raw form inputs)...")
+    check = verify_lookup_table(GridLookupModel(header, cells, compiled), model, args.verify_rows, args.seed)
+    print(f"  • Off-grid rows: {check['off_grid']:,}")
+    print(f"  • Label mismatches: {check['label_mismatches']:,}")
+    print(f"  • Max probability difference: {check['max_abs_diff']:.2e}")
+    if check['off_grid'] or check['label_mismatches'] or check['max_abs_diff'] > np.finfo(np.float32).eps:
+        raise SystemExit("❌ Lookup table does not agree with the model, nothing was written")
+
+    save_lookup_table(header, cells, args.output, metadata={
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'model': os.path.basename(args.model),
+        'build_s': round(build_s, 2),
+        'verification': check,
+    })
+    print(f"\n💾 Lookup table saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from src.certificate_export import DEFAULT_BATCH_SIZE, cards_from_scored_frame, export_cards
+from src.data_preprocessing import RAW_CSV_DTYPES
+
+
+def iter_scored_cards(input_path, name_column='Nama', chunk_size=10_000):
+    """Read a scored CSV chunk by chunk and yield one card tuple per row"""
+    start = 0
+    # Names stay text, e.g. student IDs with leading zeros
+    for chunk in pd.read_csv(input_path, sep=';', chunksize=chunk_size, dtype={**RAW_CSV_DTYPES, name_column: str}):
+        yield from cards_from_scored_frame(chunk, name_column, start)
+        start += len(chunk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render result cards for every row of a CSV scored by score_csv.py")
+    parser.add_argument('input', help="Scored CSV (output of score_csv.py)")
+    parser.add_argument('output', help="Output .zip (one PNG per row) or .pdf (one page per row)")
+    parser.add_argument('--format', choices=['zip', 'pdf'], help="Default: taken from the output extension")
+    parser.add_argument('--name-column', default='Nama', help="Column with student names (default: Nama, numbered if missing)")
+    parser.add_argument('--workers', type=int, default=0, help="Worker processes, 0 = all cores (default: 0)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help=f"Cards per worker task (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--best-compression', action='store_true', help="Slower encoding, smaller files")
+    args = parser.parse_args()
+
+    fmt = args.format or ('pdf' if args.output.lower().endswith('.pdf') else 'zip')
+    workers = args.workers or os.cpu_count() or 1
+
+    print("=" * 80)
+    print("BATCH CERTIFICATE EXPORT")
+    print("=" * 80)
+    print(f"\n📂 Input : {args.input}")
+    print(f"💾 Output: {args.output} ({fmt.upper()})")
+    print(f"⚙️  Workers: {workers} | Batch size: {args.batch_size}")
+
+    cards = iter_scored_cards(args.input, args.name_column)
+
+    start = time.perf_counter()
+    n_cards = export_cards(cards, args.output, fmt, workers,
+                           fast=not args.best_compression, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n✅ Exported {n_cards:,} cards in {elapsed:.2f}s ({n_cards / max(elapsed, 1e-9):,.1f} cards/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import time
+
+from src.data_preprocessing import ingest_dataset, load_data
+
+CSV_PATH = 'data/raw/dataset.csv'
+
+print("=" * 80)
+print("INGEST DATASET")
+print("=" * 80)
+
+print(f"\n📂 Converting {CSV_PATH} to Parquet...")
+start = time.perf_counter()
+parquet_path = ingest_dataset(CSV_PATH)
+print(f"✅ Saved to: {parquet_path} ({time.perf_counter() - start:.2f}s)")
+
+df = load_data(CSV_PATH)
+print(f"\n📊 {len(df):,} rows, {df.memory_usage(deep=True).sum() / 1024:,.0f} KB in memory")
+print(df.dtypes.to_string())
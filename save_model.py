@@ -1,6 +1,11 @@
 import pickle
 from src.data_preprocessing import load_data
 from src.model_training import train_model
+from src.evaluation import build_evaluation, save_evaluation
+from src.inference import compile_pipeline
+from src.model_bundle import export_bundle
+from src.incremental_training import data_watermark
+from src.dataset_summary import build_summary, save_summary
 
 print("=" * 80)
 print("SAVING MODEL")
@@ -31,6 +36,30 @@ with open('models/preprocessing_stats.pkl', 'wb') as f:
     pickle.dump(stats, f)
 print("✅ Stats saved to: models/preprocessing_stats.pkl")
 
+# Save evaluation artifact (lets the app skip re-scoring the test split on startup)
+print("\n💾 Saving evaluation artifact...")
+evaluation = build_evaluation(model, accuracy, f1, cm, df, 'data/raw/dataset.csv')
+save_evaluation(evaluation, 'models/evaluation.json')
+print("✅ Evaluation saved to: models/evaluation.json")
+
+# Export memory-mappable bundle (loaded by the app without pickle or sklearn)
+print("\n💾 Exporting model bundle...")
+export_bundle(compile_pipeline(model), 'models/best_model.rfb', metadata={
+    'created_at': evaluation['created_at'],
+    'dataset_fingerprint': evaluation['dataset']['fingerprint'],
+    'accuracy': evaluation['accuracy'],
+    'f1': evaluation['f1'],
+    # update_model.py trains only on rows appended after this point
+    'data_watermark': data_watermark('data/raw/dataset.csv')
+})
+print("✅ Bundle saved to: models/best_model.rfb")
+
+# Save aggregate tables for the home and analysis pages
+print("\n💾 Saving dataset summary...")
+save_summary(build_summary(df, evaluation['dataset']['fingerprint'], evaluation['dataset']['stamp']),
+             'models/dataset_summary.pkl')
+print("✅ Summary saved to: models/dataset_summary.pkl")
+
 print("\n" + "=" * 80)
 print("✅ ALL FILES SAVED SUCCESSFULLY!")
 print("=" * 80)
\ No newline at end of file
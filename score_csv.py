@@ -0,0 +1,113 @@
+import argparse
+import os
+import pickle
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src.data_preprocessing import RAW_CSV_DTYPES
+from src.discretization import discretize
+from src.inference import compile_pipeline
+from src.prediction_service import PredictionService
+from src.recommendations import evaluate_rules, recommendation_codes
+
+# Per-process scoring service, built once by _init_worker
+_service = None
+
+
+def _init_worker(model_path, engine):
+    """Load the model once per process"""
+    global _service
+
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+
+    if engine == 'discretized':
+        # Deep forests (leaf tables too large) are scored by the compiled forest instead
+        model = discretize(compile_pipeline(model))
+    elif engine == 'compiled':
+        model = compile_pipeline(model)
+    else:
+        # Parallelism comes from the worker processes, not joblib threads
+        model.set_params(classifier__n_jobs=1)
+
+    _service = PredictionService(model)
+
+
+def _score_chunk(chunk):
+    """Score one raw chunk and append prediction columns"""
+    features = chunk.drop('Label', axis=1) if 'Label' in chunk.columns else chunk
+    result = _service.predict_frame(features)
+
+    scored = chunk.copy()
+    scored['Prediksi'] = result.labels
+    scored['Probabilitas Sehat'] = result.proba_sehat
+    scored['Probabilitas Risiko Stres'] = result.proba_stres
+    scored['Kode Rekomendasi'] = recommendation_codes(evaluate_rules(features, result.labels))
+    return scored
+
+
+def score_csv(input_path, output_path, model_path='models/best_model.pkl',
+              chunk_size=50_000, workers=1, engine='discretized'):
+    """Stream a raw survey CSV through the saved model, writing results chunk by chunk"""
+    reader = pd.read_csv(input_path, sep=';', chunksize=chunk_size, dtype=RAW_CSV_DTYPES)
+    n_rows = 0
+    header = True
+
+    def write(scored):
+        nonlocal n_rows, header
+        scored.to_csv(output_path, sep=';', index=False, mode='w' if header else 'a', header=header)
+        n_rows += len(scored)
+        header = False
+
+    if workers == 1:
+        _init_worker(model_path, engine)
+        for chunk in reader:
+            write(_score_chunk(chunk))
+        return n_rows
+
+    # Keep a bounded number of chunks in flight so memory stays flat
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, engine)) as executor:
+        pending = deque()
+        for chunk in reader:
+            pending.append(executor.submit(_score_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                write(pending.popleft().result())
+        while pending:
+            write(pending.popleft().result())
+
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a ';'-separated survey CSV with the saved model")
+    parser.add_argument('input', help="Input CSV (same layout as data/raw/dataset.csv, Label optional)")
+    parser.add_argument('output', help="Output CSV with Prediksi, probability and recommendation code columns appended")
+    parser.add_argument('--model', default='models/best_model.pkl')
+    parser.add_argument('--chunk-size', type=int, default=50_000, help="Rows per chunk (default: 50000)")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes, 0 = all cores (default: 1)")
+    parser.add_argument('--engine', choices=['discretized', 'compiled', 'sklearn'], default='discretized')
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count() or 1
+
+    print("=" * 80)
+    print("BULK SCORING")
+    print("=" * 80)
+    print(f"\n📂 Input : {args.input}")
+    print(f"💾 Output: {args.output}")
+    print(f"⚙️  Workers: {workers} | Chunk size: {args.chunk_size:,} | Engine: {args.engine}")
+
+    start = time.perf_counter()
+    n_rows = score_csv(args.input, args.output, args.model,
+                       args.chunk_size, workers, args.engine)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n✅ Scored {n_rows:,} rows in {elapsed:.2f}s ({n_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
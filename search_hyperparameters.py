@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import time
+
+from src.data_preprocessing import load_data
+from src.evaluation import dataset_fingerprint
+from src.hyperparameter_search import DEFAULT_SPACE, HyperparameterSearch, generate_candidates, leaderboard
+
+DATASET_PATH = 'data/raw/dataset.csv'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter search for the Random Forest pipeline")
+    parser.add_argument('--strategy', choices=['grid', 'random', 'halving'], default='halving', help="Default: halving")
+    parser.add_argument('--n-iter', type=int, default=30, help="Candidates sampled for random/halving (default: 30)")
+    parser.add_argument('--space', help="JSON file mapping parameter -> list of values (default: built-in space)")
+    parser.add_argument('--cv', type=int, default=5, help="Cross-validation folds (default: 5)")
+    parser.add_argument('--eta', type=int, default=3, help="Halving: keep the best 1/eta per rung (default: 3)")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for sampling, folds and forests; the holdout is always the production split (default: 42)")
+    parser.add_argument('--workers', type=int, default=0, help="Worker processes, 0 = all cores (default: 0)")
+    parser.add_argument('--output', default='reports/search', help="Results, leaderboard and cache directory")
+    parser.add_argument('--top', type=int, default=10, help="Leaderboard rows to print (default: 10)")
+    args = parser.parse_args()
+
+    space = DEFAULT_SPACE
+    if args.space:
+        with open(args.space, encoding='utf-8') as f:
+            space = json.load(f)
+    workers = args.workers or os.cpu_count() or 1
+
+    print("=" * 80)
+    print("HYPERPARAMETER SEARCH")
+    print("=" * 80)
+
+    print(f"\n📂 Loading dataset from {DATASET_PATH}...")
+    df = load_data(DATASET_PATH)
+    print(f"✅ Dataset loaded: {df.shape}")
+
+    candidates = generate_candidates(space, args.strategy, args.n_iter, args.seed)
+    search = HyperparameterSearch(df, dataset_fingerprint(DATASET_PATH), args.output,
+                                  cv=args.cv, seed=args.seed, workers=workers)
+    print(f"\n🔍 {args.strategy} search: {len(candidates)} candidates, {args.cv}-fold CV, {workers} workers")
+    if search.results:
+        print(f"♻️  {len(search.results)} finished evaluations found in {search.results_path}")
+
+    def progress(result):
+        print(f"  • {result['candidate_id']} rows={result['n_rows']:>6,} F1={result['f1_mean']*100:.2f}% "
+              f"fit={result['fit_s']:.2f}s")
+
+    start = time.perf_counter()
+    results = search.run(candidates, args.strategy, eta=args.eta, progress=progress)
+    elapsed = time.perf_counter() - start
+
+    board = leaderboard(results)
+    board_path = os.path.join(args.output, 'leaderboard.csv')
+    board.to_csv(board_path, index=False)
+
+    print(f"\n✅ {len(results)} evaluations ({search.reused} reused) in {elapsed:.1f}s")
+    print(f"💾 Leaderboard saved to {board_path}")
+    print(f"\n🏆 Top {min(args.top, len(board))}:")
+    columns = ['rank', 'candidate_id', 'f1_mean', 'fit_s', 'predict_ms', 'model_kb', 'n_rows']
+    print(board[columns + [c for c in board.columns if c.startswith('param_')]].head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
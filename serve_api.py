@@ -0,0 +1,38 @@
+import argparse
+import os
+
+import uvicorn
+
+from src.micro_batching import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS
+from src.scoring_api import DEFAULT_MODEL_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP scoring service for the stress risk model")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes sharing the memory-mapped model (default: 1)")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help=f"Model bundle (.rfb) or pickled pipeline (default: {DEFAULT_MODEL_PATH})")
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH_SIZE, help=f"Rows per forest evaluation (default: {DEFAULT_MAX_BATCH_SIZE})")
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS, help=f"How long a request waits for others to join its batch (default: {DEFAULT_MAX_WAIT_MS})")
+    args = parser.parse_args()
+
+    # Worker processes build the app from these
+    os.environ['RESIKO_MODEL'] = os.path.abspath(args.model)
+    os.environ['RESIKO_MAX_BATCH'] = str(args.max_batch)
+    os.environ['RESIKO_MAX_WAIT_MS'] = str(args.max_wait_ms)
+
+    print("=" * 80)
+    print("SCORING SERVICE")
+    print("=" * 80)
+    print(f"\n🚀 http://{args.host}:{args.port}  ({args.workers} workers, model {args.model})")
+    print("   POST /predict        one entry")
+    print("   POST /predict/batch  {\"instances\": [...]}")
+    print("   GET  /health\n")
+
+    uvicorn.run('src.scoring_api:create_app', factory=True, host=args.host, port=args.port,
+                workers=args.workers, log_level='warning')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import os
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .data_preprocessing import clean_ipk_column
+from .utils import CANVAS_SIZE, CertificateRenderer
+
+# Cards sent to a worker per task (amortizes pickling overhead between processes)
+DEFAULT_BATCH_SIZE = 32
+
+# Scored CSV column -> key expected by the certificate summary
+_SUMMARY_COLUMNS = {
+    'Umur': 'Umur',
+    'IPK': 'IPK',
+    'Jam Belajar per Hari': 'Jam Belajar',
+    'Jam Tidur per Hari': 'Jam Tidur',
+    'Jumlah Tugas Besar per Minggu': 'Jumlah Tugas',
+}
+
+# Per-worker-process renderer, built once by _init_renderer
+_renderer = None
+
+def card_filename(index, name, extension):
+    """Archive member name, numbered so students with the same name do not collide"""
+    safe_name = re.sub(r'[^\w\-]+', '_', str(name)).strip('_') or 'Mahasiswa'
+    return f"{index + 1:05d}_Hasil_Prediksi_{safe_name}.{extension}"
+
+def cards_from_predictions(data_batch, result):
+    """Card tuples for the prediction page (form entries + PredictionResult)"""
+    for idx, data in enumerate(data_batch):
+        yield (data["Nama"], result.labels[idx], result.proba_sehat[idx] * 100, result.proba_stres[idx] * 100, data)
+
+def cards_from_scored_frame(scored, name_column='Nama', start=0):
+    """Card tuples for a chunk of score_csv.py output (raw survey columns + prediction columns)"""
+    summary = {key: scored[col] for col, key in _SUMMARY_COLUMNS.items()}
+    summary['IPK'] = clean_ipk_column(scored['IPK'])
+    names = scored[name_column] if name_column in scored.columns else None
+
+    for i in range(len(scored)):
+        name = names.iat[i] if names is not None else None
+        # Names may be numbers (student IDs, floats once the column has gaps) or missing; cards need text
+        if name is None or pd.isna(name):
+            name = f"Mahasiswa {start + i + 1}"
+        elif isinstance(name, float) and name.is_integer():
+            name = str(int(name))
+        else:
+            name = str(name)
+        input_data = {key: values.iat[i] for key, values in summary.items()}
+        yield (name, scored['Prediksi'].iat[i],
+               scored['Probabilitas Sehat'].iat[i] * 100,
+               scored['Probabilitas Risiko Stres'].iat[i] * 100,
+               input_data)
+
+def _batch_renderer(encoding, fast):
+    # Batch cards are all different, so skip the memo
+    return CertificateRenderer(encoding=encoding, fast=fast, cache_size=0)
+
+def _init_renderer(encoding, fast):
+    """Build one renderer per worker process (fonts and background drawn once)"""
+    global _renderer
+    _renderer = _batch_renderer(encoding, fast)
+
+def _render_batch(batch, renderer=None):
+    """Render (index, card) pairs to (member name, encoded bytes), in a worker with its process renderer"""
+    renderer = renderer or _renderer
+    return [(card_filename(index, card[0], renderer.extension), renderer.render(*card))
+            for index, card in batch]
+
+def _batches(cards, batch_size):
+    batch = []
+    for item in enumerate(cards):
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def render_cards(cards, workers=1, encoding='png', fast=True, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield (member name, bytes) in input order, keeping a bounded number of batches in flight"""
+    batches = _batches(cards, batch_size)
+
+    if workers == 1:
+        # In-process exports of concurrent sessions each keep their own renderer
+        renderer = _batch_renderer(encoding, fast)
+        for batch in batches:
+            yield from _render_batch(batch, renderer)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_renderer,
+                             initargs=(encoding, fast)) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(_render_batch, batch))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+class _PdfWriter:
+    """Minimal streaming PDF writer: one JPEG image per page, pages written as they arrive"""
+
+    def __init__(self, f, width, height, dpi=150):
+        self.f = f
+        self.width = width
+        self.height = height
+        self.page_size = (width * 72 / dpi, height * 72 / dpi)
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 3  # 1 = catalog, 2 = page tree (written last)
+        self.position = 0
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    def _write(self, data):
+        self.f.write(data)
+        self.position += len(data)
+
+    def _object(self, obj_id, body, stream=None):
+        self.offsets[obj_id] = self.position
+        self._write(f"{obj_id} 0 obj\n".encode('ascii') + body)
+        if stream is not None:
+            self._write(b"\nstream\n")
+            self._write(stream)
+            self._write(b"\nendstream")
+        self._write(b"\nendobj\n")
+
+    def add_jpeg_page(self, jpeg_bytes):
+        image_id, content_id, page_id = self.next_id, self.next_id + 1, self.next_id + 2
+        self.next_id += 3
+        page_w, page_h = self.page_size
+
+        self._object(image_id, (
+            f"<< /Type /XObject /Subtype /Image /Width {self.width} /Height {self.height} "
+            f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode /Length {len(jpeg_bytes)} >>"
+        ).encode('ascii'), jpeg_bytes)
+
+        content = f"q {page_w:.2f} 0 0 {page_h:.2f} 0 0 cm /Im0 Do Q".encode('ascii')
+        self._object(content_id, f"<< /Length {len(content)} >>".encode('ascii'), content)
+
+        self._object(page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_w:.2f} {page_h:.2f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode('ascii'))
+        self.page_ids.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode('ascii'))
+
+        xref_position = self.position
+        lines = [f"xref\n0 {self.next_id}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[obj_id]:010d} 00000 n \n" for obj_id in range(1, self.next_id)]
+        lines.append(f"trailer\n<< /Size {self.next_id} /Root 1 0 R >>\nstartxref\n{xref_position}\n%%EOF\n")
+        self._write("".join(lines).encode('ascii'))
+
+def export_cards(cards, output, fmt='zip', workers=1, fast=True, batch_size=DEFAULT_BATCH_SIZE):
+    """Stream rendered cards into a ZIP of PNGs or a multi-page PDF; returns the number of cards.
+
+    output is a path or a writable binary file object. Only the batches in
+    flight are held in memory, never the whole export.
+    """
+    if fmt not in ('zip', 'pdf'):
+        raise ValueError(f"Unknown export format '{fmt}', expected 'zip' or 'pdf'")
+
+    n_cards = 0
+    try:
+        if fmt == 'zip':
+            # PNG is already deflate-compressed, so members are stored as-is
+            with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive:
+                for member, img_bytes in render_cards(cards, workers, 'png', fast, batch_size):
+                    archive.writestr(member, img_bytes)
+                    n_cards += 1
+        else:
+            f = open(output, 'wb') if isinstance(output, str) else output
+            try:
+                writer = _PdfWriter(f, *CANVAS_SIZE)
+                for _, img_bytes in render_cards(cards, workers, 'jpeg', fast, batch_size):
+                    writer.add_jpeg_page(img_bytes)
+                    n_cards += 1
+                writer.close()
+            finally:
+                if f is not output:
+                    f.close()
+    except BaseException:
+        # Do not leave a truncated archive behind that looks like a finished export
+        if isinstance(output, str) and os.path.exists(output):
+            os.remove(output)
+        raise
+
+    return n_cards
@@ -1,10 +1,50 @@
+import os
 import pandas as pd
 import numpy as np
 
-def load_data(filepath='data/raw/dataset.csv'):
-    """Load and preprocess the dataset"""
-    df = pd.read_csv(filepath, sep=';')
-    return df
+CATEGORICAL_COLUMNS = ['Gender', 'Jurusan/Program Studi', 'Frekuensi Olahraga', 'Pemasukan Keluarga', 'Status Hubungan', 'Label']
+INTEGER_COLUMNS = ['Umur', 'Jam Belajar per Hari', 'Jam Tidur per Hari', 'Jumlah Tugas Besar per Minggu']
+
+# IPK in the raw CSV is survey text ('03.13', '0,188...'); read it as str so clean_ipk's
+# time-fraction rule applies even to files whose IPK values all look like numbers
+RAW_CSV_DTYPES = {'IPK': str}
+
+# Parquet schema metadata keys holding the SHA-256 and the size/mtime stamp of the CSV it was built from
+SOURCE_FINGERPRINT_KEY = b'source_fingerprint'
+SOURCE_STAMP_KEY = b'source_stamp'
+
+def columnar_path_for(csv_path):
+    """data/raw/<name>.csv -> data/processed/<name>.parquet"""
+    data_dir = os.path.dirname(os.path.dirname(os.path.abspath(csv_path)))
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(data_dir, 'processed', f'{name}.parquet')
+
+def columnar_is_fresh(parquet_path, csv_path):
+    """True if the Parquet copy exists and was built from the current CSV (or the CSV is not deployed)"""
+    if not os.path.exists(parquet_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+
+    import json
+    import pyarrow.parquet as pq
+    from .evaluation import dataset_matches
+
+    metadata = pq.read_schema(parquet_path).metadata or {}
+    stamp = metadata.get(SOURCE_STAMP_KEY)
+    return dataset_matches({
+        'fingerprint': metadata.get(SOURCE_FINGERPRINT_KEY, b'').decode(),
+        'stamp': json.loads(stamp) if stamp else None
+    }, csv_path)
+
+def load_data(filepath='data/raw/dataset.csv', columns=None):
+    """Load the dataset, from its columnar copy (see ingest_dataset) when that is up to date"""
+    parquet_path = columnar_path_for(filepath)
+    if columnar_is_fresh(parquet_path, filepath):
+        return pd.read_parquet(parquet_path, columns=columns)
+
+    df = pd.read_csv(filepath, sep=';', usecols=columns, dtype=RAW_CSV_DTYPES)
+    return df[columns] if columns is not None else df
 
 def clean_ipk(value):
     """Clean IPK value - convert various formats to float"""
@@ -31,12 +71,60 @@ def clean_ipk(value):
     except:
         return np.nan
 
+# pd.to_numeric equals float() on plain decimals with up to 15 digits (longer mantissas are not
+# correctly rounded); signs, exponents, long mantissas and junk go through float() row by row
+_PLAIN_DECIMAL = r'[0-9]+\.?[0-9]*|\.[0-9]+'
+_MAX_FAST_DIGITS = 15
+
+def _parse_ipk_strings(text):
+    """float() of every IPK string after comma -> dot, NaN where float() fails"""
+    text = pd.Series(text, dtype='str').str.strip().str.replace(',', '.', regex=False)
+    parsed = np.full(len(text), np.nan)
+    
+    n_digits = text.str.len() - text.str.contains('.', regex=False)
+    plain = (text.str.fullmatch(_PLAIN_DECIMAL) & (n_digits <= _MAX_FAST_DIGITS)).to_numpy(dtype=bool)
+    parsed[plain] = pd.to_numeric(text[plain]).to_numpy(dtype=np.float64)
+    
+    for pos in np.flatnonzero(~plain):
+        try:
+            parsed[pos] = float(text.iat[pos])
+        except ValueError:
+            pass
+    
+    return parsed
+
+def clean_ipk_column(values):
+    """Vectorized clean_ipk over a whole IPK column of survey text, same output as .apply(clean_ipk).
+
+    Numeric columns already hold IPK values (form and API input, the cleaned
+    Parquet copy) and are only converted to float: the time-fraction rescale
+    below 1 is a rule for the raw survey text, not for an IPK of 0.5.
+    """
+    values = pd.Series(values)
+    result = np.full(len(values), np.nan)
+    
+    if pd.api.types.is_bool_dtype(values.dtype):
+        # str(True) is not a number, clean_ipk turns booleans into NaN
+        return pd.Series(result, index=values.index, name=values.name)
+    
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return pd.Series(values.to_numpy(dtype=np.float64, na_value=np.nan), index=values.index, name=values.name)
+    
+    present = ~values.isna().to_numpy()
+    result[present] = _parse_ipk_strings(values[present].astype(str))
+    
+    # Time-fraction values below 1 are rescaled to the IPK range and capped at 4
+    fraction = result < 1
+    result[fraction] = np.minimum(result[fraction] * 20, 4.0)
+    
+    return pd.Series(result, index=values.index, name=values.name)
+
 def preprocess_data(df):
     """Preprocess the dataframe similar to notebook"""
     df = df.copy()
     
     # Clean IPK column
-    df['IPK'] = df['IPK'].apply(clean_ipk)
+    df['IPK'] = clean_ipk_column(df['IPK'])
     
     # Convert numeric columns to proper numeric type
     numeric_features = ['Jam Belajar per Hari', 'Jam Tidur per Hari', 'IPK', 'Jumlah Tugas Besar per Minggu']
@@ -51,7 +139,7 @@ def preprocess_data(df):
 def get_preprocessing_stats(df):
     """Get mean and std for normalization - used for prediction"""
     raw_df = df.copy()
-    raw_df['IPK'] = raw_df['IPK'].apply(clean_ipk)
+    raw_df['IPK'] = clean_ipk_column(raw_df['IPK'])
     numeric_cols = ['Jam Belajar per Hari', 'Jam Tidur per Hari', 'IPK', 'Jumlah Tugas Besar per Minggu']
     raw_df[numeric_cols] = raw_df[numeric_cols].apply(pd.to_numeric, errors='coerce')
     
@@ -60,4 +148,41 @@ def get_preprocessing_stats(df):
         'std': raw_df[numeric_cols].std().to_dict()
     }
     
-    return stats
\ No newline at end of file
+    return stats
+
+def to_columnar_frame(df):
+    """Typed copy of the raw frame: category labels, downcast integers and cleaned float IPK"""
+    df = df.copy()
+    
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
+    
+    for col in INTEGER_COLUMNS:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    
+    # Stored as cleaned floats: the pipeline takes numeric IPK as is, without rescaling it again
+    df['IPK'] = clean_ipk_column(df['IPK'])
+    
+    return df
+
+def ingest_dataset(csv_path='data/raw/dataset.csv', parquet_path=None):
+    """Convert the raw CSV once into a typed Parquet file that load_data prefers"""
+    import json
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from .evaluation import dataset_fingerprint, dataset_stamp
+    
+    parquet_path = parquet_path or columnar_path_for(csv_path)
+    df = to_columnar_frame(pd.read_csv(csv_path, sep=';', dtype=RAW_CSV_DTYPES))
+    
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SOURCE_FINGERPRINT_KEY] = dataset_fingerprint(csv_path).encode()
+    metadata[SOURCE_STAMP_KEY] = json.dumps(dataset_stamp(csv_path)).encode()
+    
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+    tmp_path = f"{parquet_path}.tmp"
+    pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+    os.replace(tmp_path, parquet_path)
+    
+    return parquet_path
@@ -0,0 +1,133 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from .evaluation import CATEGORICAL_FEATURES, dataset_matches, dataset_stamp
+
+# Bump when the layout of the summary changes
+SUMMARY_VERSION = 2
+
+# Numeric columns offered by the analysis page
+NUMERIC_FEATURES = ['Umur', 'Jam Belajar per Hari', 'Jam Tidur per Hari', 'Jumlah Tugas Besar per Minggu']
+
+# Columns with at most this many distinct values get one histogram bar per value
+MAX_DISCRETE_VALUES = 60
+
+# Distinct outlier values kept per box (the page can show fewer)
+MAX_STORED_OUTLIERS = 1000
+
+def sample_outliers(outliers, max_count):
+    """Evenly spaced subset of sorted outlier values, always keeping the two extremes"""
+    if len(outliers) <= max_count:
+        return list(outliers)
+    if max_count <= 0:
+        return []
+    index = np.unique(np.linspace(0, len(outliers) - 1, max_count).round().astype(int))
+    return [outliers[i] for i in index]
+
+def _histogram(values, labels, label_order):
+    """Per-label bin counts on bins shared by all labels"""
+    distinct = np.unique(values)
+    if len(distinct) <= MAX_DISCRETE_VALUES:
+        centers = distinct
+        widths = np.full(len(distinct), np.min(np.diff(distinct)) if len(distinct) > 1 else 1.0)
+        edges = None
+    else:
+        edges = np.histogram_bin_edges(values, bins='auto')
+        centers = (edges[:-1] + edges[1:]) / 2
+        widths = np.diff(edges)
+
+    rows = []
+    for label in label_order:
+        subset = values[labels == label]
+        if edges is None:
+            counts = pd.Series(subset).value_counts().reindex(distinct, fill_value=0).to_numpy()
+        else:
+            counts, _ = np.histogram(subset, bins=edges)
+        rows.append(pd.DataFrame({'x': centers, 'width': widths, 'Label': label, 'Count': counts}))
+    return pd.concat(rows, ignore_index=True)
+
+def _box_stats(values):
+    """Quartiles (linear interpolation, as plotly), whisker ends at the last point inside 1.5 IQR, sampled outlier values"""
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = np.unique(values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)])
+    return {
+        'q1': float(q1), 'median': float(median), 'q3': float(q3),
+        'lowerfence': float(inside.min()), 'upperfence': float(inside.max()),
+        'mean': float(values.mean()), 'n': int(len(values)),
+        'n_outliers': int(len(outliers)),
+        'outliers': sample_outliers(outliers.tolist(), MAX_STORED_OUTLIERS)
+    }
+
+def build_summary(df, fingerprint=None, stamp=None):
+    """Small precomputed tables behind the home and analysis pages"""
+    labels = df['Label'].to_numpy()
+    label_order = [str(v) for v in df['Label'].dropna().unique()]
+
+    histograms = {}
+    boxes = {}
+    for col in NUMERIC_FEATURES:
+        values = pd.to_numeric(df[col], errors='coerce')
+        valid = values.notna().to_numpy()
+        values = values.to_numpy(dtype=float)[valid]
+        histograms[col] = _histogram(values, labels[valid], label_order)
+        boxes[col] = {label: _box_stats(values[labels[valid] == label]) for label in label_order
+                      if np.any(labels[valid] == label)}
+
+    describe = {'Semua': df[NUMERIC_FEATURES].describe()}
+    for label in label_order:
+        describe[label] = df.loc[df['Label'] == label, NUMERIC_FEATURES].describe()
+
+    return {
+        'format_version': SUMMARY_VERSION,
+        'fingerprint': fingerprint,
+        'stamp': stamp,
+        'n_rows': int(len(df)),
+        'label_order': label_order,
+        'label_counts': df['Label'].value_counts(),
+        'gender_counts': df['Gender'].value_counts(),
+        'head': df.head(10),
+        'contingency': {col: df.groupby([col, 'Label'], observed=True).size().reset_index(name='Count')
+                        for col in CATEGORICAL_FEATURES},
+        'histograms': histograms,
+        'boxes': boxes,
+        'describe': describe
+    }
+
+def save_summary(summary, filepath='models/dataset_summary.pkl'):
+    tmp_path = f"{filepath}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(summary, f)
+        # Readers never see a half-written pickle
+        os.replace(tmp_path, filepath)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def load_summary(filepath, dataset_path=None):
+    """Load a saved summary, or None if it is missing, from another version or stale.
+
+    As with the evaluation artifact, the dataset is only checked when the file
+    is present, by its size/mtime stamp first and its SHA-256 only if those
+    differ, and a refreshed stamp is kept in the returned dict, not written back.
+    """
+    if not os.path.exists(filepath):
+        return None
+
+    with open(filepath, 'rb') as f:
+        summary = pickle.load(f)
+
+    if summary.get('format_version') != SUMMARY_VERSION:
+        return None
+
+    if dataset_path is not None and os.path.exists(dataset_path):
+        if not dataset_matches(summary, dataset_path):
+            return None
+        summary['stamp'] = dataset_stamp(dataset_path)
+
+    return summary
@@ -0,0 +1,256 @@
+import math
+
+import numpy as np
+
+# Rows scored per block; group codes, table indices and the probability block stay in cache
+DEFAULT_CHUNK_ROWS = 16_384
+
+# Code columns are fused into groups of at most this many code combinations, so a
+# tree does one table gather per group it uses instead of one per column
+MAX_GROUP_CODES = 4096
+
+# A tree's leaf table has one cell per combination of its local codes, which grows
+# exponentially with depth: forests whose tables would need more memory than this
+# are not discretized (see discretize)
+MAX_TABLE_BYTES = 512 * 1024 * 1024
+
+# Codes are stored as uint16 at most
+MAX_CODES = 1 << 16
+
+
+def split_thresholds(compiled, column_index):
+    """Sorted distinct thresholds of every split on one design-matrix column"""
+    internal = compiled.children[:, 0] != np.arange(len(compiled.feature))
+    return np.unique(compiled.threshold[internal & (compiled.feature == column_index)])
+
+
+def interval_codes(thresholds, design_values):
+    """Index of the threshold interval of each float32 design value (trees go left when x <= threshold).
+
+    NaN lands after the last threshold.
+    """
+    return np.searchsorted(thresholds, np.asarray(design_values, dtype=np.float64), side='left')
+
+
+class DiscretizedForest:
+    """CompiledForest evaluated on small integer codes with one leaf table per tree.
+
+    Every input column becomes a code: numeric values the index of their
+    interval between the forest's split thresholds for that column, categories
+    their position in the one-hot table (unknown categories one extra code).
+    A tree only tells apart the codes its own splits separate, so its leaf is
+    read from a small table indexed by those local codes. Columns are fused
+    into a few groups; per group a tree has one table turning the group's
+    code into an offset in its leaf table, so scoring is three or four
+    integer gathers per tree over uint8 codes instead of a walk over a
+    float32 design matrix. Missing numeric values have their own code that follows each
+    split's learned missing-value direction. Probabilities match
+    ``Pipeline.predict_proba`` bit for bit under the same condition as
+    CompiledForest (estimator order, i.e. sklearn with n_jobs=1). A leaf table has one cell per
+    combination of a tree's local codes, so it grows exponentially with depth:
+    the size is estimated first and ValueError raised above max_table_bytes
+    (discretize then falls back to the CompiledForest).
+    """
+
+    def __init__(self, compiled, max_table_bytes=MAX_TABLE_BYTES):
+        self.compiled = compiled
+        self.classes_ = compiled.classes_
+        self.normalizes_input = compiled.normalizes_input
+        self.metadata = compiled.metadata
+        self.n_trees = compiled.n_trees
+
+        self.thresholds = [split_thresholds(compiled, index) for index in compiled.numeric_index]
+        # Numeric: one code per interval plus a last one for missing values; categorical: one per category plus unknown
+        self.n_codes = [len(t) + 2 for t in self.thresholds] + [len(t) + 1 for t in compiled.categorical_tables]
+        if max(self.n_codes) > MAX_CODES:
+            raise ValueError(f"A column has {max(self.n_codes):,} codes, more than uint16 codes can hold")
+        self.code_dtype = np.uint8 if max(self.n_codes) <= 256 else np.uint16
+
+        # Size everything from the local codes before walking any tree
+        node_test_bytes = len(compiled.feature) * max(self.n_codes)
+        if node_test_bytes > max_table_bytes:
+            raise ValueError(f"Node tests would take {node_test_bytes / 2**20:,.0f} MB "
+                             f"(limit {max_table_bytes / 2**20:,.0f} MB)")
+        self.groups = self._column_groups()
+        node_dim, node_left = self._node_tests()
+        layouts = [self._tree_layout(tree, node_dim, node_left) for tree in range(self.n_trees)]
+        sizes = [self._layout_bytes(layout) for layout in layouts]
+        self.table_bytes = node_test_bytes + sum(kept for kept, _ in sizes)
+        needed = self.table_bytes + max(working for _, working in sizes)
+        if needed > max_table_bytes:
+            raise ValueError(f"Leaf tables would take {needed / 2**20:,.0f} MB (limit {max_table_bytes / 2**20:,.0f} MB)")
+
+        self._trees = [self._tree_table(layout, node_dim, node_left) for layout in layouts]
+
+    def _column_groups(self):
+        """Consecutive code columns packed while their code combinations stay under MAX_GROUP_CODES"""
+        groups, current, size = [], [], 1
+        for dim, n_codes in enumerate(self.n_codes):
+            if current and size * n_codes > MAX_GROUP_CODES:
+                groups.append(current)
+                current, size = [], 1
+            current.append(dim)
+            size *= n_codes
+        groups.append(current)
+        return groups
+
+    def _node_tests(self):
+        """Per node: the code column it tests and, for every code of that column, whether the row goes left"""
+        compiled = self.compiled
+        n_nodes = len(compiled.feature)
+        node_dim = np.zeros(n_nodes, dtype=np.intp)
+        node_left = np.zeros((n_nodes, max(self.n_codes)), dtype=bool)
+
+        numeric = {index: dim for dim, index in enumerate(compiled.numeric_index)}
+        categorical = {}
+        for i, (offset, table) in enumerate(zip(compiled.categorical_offsets, compiled.categorical_tables)):
+            for code in range(len(table)):
+                categorical[offset + code] = (len(self.thresholds) + i, code)
+
+        for node in np.flatnonzero(compiled.children[:, 0] != np.arange(n_nodes)):
+            column, threshold = compiled.feature[node], compiled.threshold[node]
+            if column in numeric:
+                dim = numeric[column]
+                # Interval code c holds values above c thresholds: left iff the split's threshold is one of them or later
+                codes = np.arange(self.n_codes[dim])
+                left = codes <= np.searchsorted(self.thresholds[dim], threshold)
+                left[-1] = compiled.missing_go_to_left[node]
+            else:
+                # One-hot column: 1 for its category, 0 for the others (and for unknown categories)
+                dim, category = categorical[column]
+                codes = np.arange(self.n_codes[dim])
+                left = np.where(codes == category, 1.0, 0.0) <= threshold
+            node_dim[node] = dim
+            node_left[node, :len(left)] = left
+        return node_dim, node_left
+
+    def _tree_layout(self, tree, node_dim, node_left):
+        """Root, tested code columns and, per column, local code of every code plus one representative code per local code"""
+        compiled = self.compiled
+        root = compiled.roots[tree]
+        end = compiled.roots[tree + 1] if tree + 1 < self.n_trees else len(compiled.feature)
+        nodes = np.arange(root, end)
+        internal = nodes[compiled.children[nodes, 0] != nodes]
+        dims = np.unique(node_dim[internal])
+
+        # Codes of a column with the same decision at every split of this tree share a local code
+        local_codes, representatives = [], []
+        for dim in dims:
+            decisions = node_left[internal[node_dim[internal] == dim], :self.n_codes[dim]]
+            _, first, inverse = np.unique(decisions.T, axis=0, return_index=True, return_inverse=True)
+            order = np.argsort(first)
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+            local_codes.append(rank[inverse.ravel()])
+            representatives.append(first[order])
+        return root, dims, local_codes, representatives
+
+    def _layout_bytes(self, layout):
+        """(bytes kept for one tree's tables, bytes used while walking it)"""
+        _, dims, _, representatives = layout
+        cells = math.prod(len(r) for r in representatives)
+        used = set(dims.tolist())
+        # A single leaf still reads through the first group's table (see _tree_table)
+        groups = [group for group in self.groups if used & set(group)] or self.groups[:1]
+        group_tables = sum(math.prod(self.n_codes[dim] for dim in group) * 4 for group in groups)
+        kept = cells * len(self.classes_) * 8 + group_tables
+        # Combination indices, the code matrix and the walk's row/node/decision vectors
+        working = cells * (len(dims) + len(self.n_codes) + 4) * 8
+        return kept, working
+
+    def _tree_table(self, layout, node_dim, node_left):
+        """(per used group: group index and group code -> table offset, leaf distribution per table cell)"""
+        compiled = self.compiled
+        root, dims, local_codes, representatives = layout
+        if not len(dims):
+            # A single leaf: every row reads cell 0 through an all-zero table of the first group
+            table = np.zeros(math.prod(self.n_codes[dim] for dim in self.groups[0]), dtype=np.int32)
+            return [(0, table)], np.ascontiguousarray(compiled.value[[root]])
+
+        sizes = [len(r) for r in representatives]
+        strides = [int(np.prod(sizes[i + 1:])) for i in range(len(sizes))]
+        offsets = {dim: local * stride for dim, local, stride in zip(dims.tolist(), local_codes, strides)}
+
+        # Walk the tree once for every combination of local codes
+        combos = np.indices(sizes).reshape(len(sizes), -1)
+        codes = np.zeros((combos.shape[1], len(self.n_codes)), dtype=np.intp)
+        for i, dim in enumerate(dims):
+            codes[:, dim] = representatives[i][combos[i]]
+        rows = np.arange(len(codes))
+        current = np.full(len(codes), root)
+        for _ in range(compiled.max_depth):
+            go_left = node_left[current, codes[rows, node_dim[current]]]
+            current = compiled._children[2 * current + go_left]
+
+        group_offsets = []
+        for g, group in enumerate(self.groups):
+            if not offsets.keys() & set(group):
+                continue
+            group_codes = np.indices([self.n_codes[dim] for dim in group]).reshape(len(group), -1)
+            table = np.zeros(group_codes.shape[1], dtype=np.int32)
+            for dim, code in zip(group, group_codes):
+                if dim in offsets:
+                    table += offsets[dim][code]
+            group_offsets.append((g, table))
+        return group_offsets, np.ascontiguousarray(compiled.value[current])
+
+    def encode(self, X):
+        """(n_rows, n_columns) interval/category codes of raw input rows"""
+        compiled = self.compiled
+        codes = np.empty((len(X), len(self.n_codes)), dtype=self.code_dtype)
+        for dim, (column, thresholds) in enumerate(zip(compiled.numeric_columns, self.thresholds)):
+            design = compiled._numeric_values(X[column]).astype(np.float32)
+            interval = interval_codes(thresholds, design)
+            interval[np.isnan(design)] = len(thresholds) + 1
+            codes[:, dim] = interval
+        for i, (column, index) in enumerate(zip(compiled.categorical_columns, compiled._category_index)):
+            category = index.get_indexer(X[column])
+            # Unknown categories (all-zero one-hot row) get the extra last code
+            category[category < 0] = len(index)
+            codes[:, len(self.thresholds) + i] = category
+        return codes
+
+    def predict_proba_codes(self, codes, chunk_size=DEFAULT_CHUNK_ROWS):
+        """Class probabilities for rows already encoded by encode()"""
+        proba = np.zeros((len(codes), len(self.classes_)), dtype=np.float64)
+
+        for start in range(0, len(codes), chunk_size):
+            block_codes = codes[start:start + chunk_size]
+            group_codes = []
+            for group in self.groups:
+                combined = np.zeros(len(block_codes), dtype=np.intp)
+                for dim in group:
+                    combined *= self.n_codes[dim]
+                    combined += block_codes[:, dim]
+                group_codes.append(combined)
+
+            block = proba[start:start + chunk_size]
+            index = np.empty(len(block_codes), dtype=np.int32)
+            # Estimator order, as in CompiledForest
+            for group_offsets, leaf_values in self._trees:
+                (first, table), *rest = group_offsets
+                np.take(table, group_codes[first], out=index)
+                for g, table in rest:
+                    index += table[group_codes[g]]
+                block += leaf_values[index]
+
+        proba /= self.n_trees
+        return proba
+
+    def predict_proba(self, X, chunk_size=DEFAULT_CHUNK_ROWS):
+        """Predict class probabilities for a DataFrame of raw input rows"""
+        return self.predict_proba_codes(self.encode(X), chunk_size=chunk_size)
+
+    def predict(self, X, chunk_size=DEFAULT_CHUNK_ROWS):
+        """Predict class labels for a DataFrame of raw input rows"""
+        return self.classes_.take(np.argmax(self.predict_proba(X, chunk_size=chunk_size), axis=1))
+
+
+def discretize(compiled, max_table_bytes=MAX_TABLE_BYTES):
+    """DiscretizedForest of compiled, or compiled itself when the forest cannot be discretized
+    (leaf tables over max_table_bytes, e.g. deep trees, or more codes than uint16 holds)"""
+    try:
+        return DiscretizedForest(compiled, max_table_bytes)
+    except ValueError as e:
+        print(f"[WARNING] Discretized engine not used: {e}. Scoring with the compiled forest")
+        return compiled
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+# Bump when the layout of evaluation.json changes
+EVALUATION_VERSION = 1
+
+CATEGORICAL_FEATURES = ['Gender', 'Jurusan/Program Studi', 'Frekuensi Olahraga', 'Pemasukan Keluarga', 'Status Hubungan']
+
+# (path, size, mtime_ns) -> SHA-256, so a process hashes an unchanged file once
+_fingerprints = {}
+
+def dataset_stamp(filepath):
+    """Size and modification time of the dataset file, checked before hashing it"""
+    stat = os.stat(filepath)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def dataset_fingerprint(filepath):
+    """SHA-256 of the raw dataset file, read in blocks without parsing it"""
+    stamp = dataset_stamp(filepath)
+    key = (os.path.abspath(filepath), stamp['size'], stamp['mtime_ns'])
+    if key not in _fingerprints:
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        _fingerprints[key] = digest.hexdigest()
+    return _fingerprints[key]
+
+def dataset_matches(saved, filepath):
+    """Whether an artifact's saved {'fingerprint', 'stamp'} still describe the dataset file.
+
+    An unchanged size and mtime answer without reading the file; otherwise
+    the SHA-256 decides, so a touched (or freshly cloned) but identical file
+    still matches.
+    """
+    stamp = saved.get('stamp')
+    if stamp is not None and stamp == dataset_stamp(filepath):
+        return True
+    return saved.get('fingerprint') == dataset_fingerprint(filepath)
+
+def summarize_dataset(df):
+    """Row count, label counts and category order (first appearance) of the raw dataset"""
+    return {
+        'n_rows': int(len(df)),
+        'label_counts': {str(k): int(v) for k, v in df['Label'].value_counts().items()},
+        'categories': {col: [str(v) for v in df[col].dropna().unique()] for col in CATEGORICAL_FEATURES}
+    }
+
+def merge_dataset_summaries(previous, new):
+    """Summary of previous rows plus appended rows, without re-reading the previous ones"""
+    label_counts = dict(previous['label_counts'])
+    for label, count in new['label_counts'].items():
+        label_counts[label] = label_counts.get(label, 0) + count
+
+    categories = {}
+    for col in CATEGORICAL_FEATURES:
+        seen = list(previous['categories'].get(col, []))
+        categories[col] = seen + [v for v in new['categories'].get(col, []) if v not in seen]
+
+    return {
+        'n_rows': previous['n_rows'] + new['n_rows'],
+        'label_counts': label_counts,
+        'categories': categories
+    }
+
+def holdout_segment(start, stop, split='train_test_split', test_size=0.2, random_state=42):
+    """Dataset rows start..stop held out as train_model/update_model do ('train_test_split')
+    or as train_model_out_of_core does ('random': a seeded uniform draw per row)"""
+    return {'start': int(start), 'stop': int(stop), 'split': split,
+            'test_size': test_size, 'random_state': random_state}
+
+def holdout_rows(holdout):
+    """Positions (in the raw dataset) of the rows no tree of the model was trained on"""
+    import numpy as np
+    from sklearn.model_selection import train_test_split
+
+    rows = []
+    for segment in holdout:
+        n_rows = segment['stop'] - segment['start']
+        if segment['split'] == 'random':
+            test = np.flatnonzero(np.random.default_rng(segment['random_state']).random(n_rows) < segment['test_size'])
+        else:
+            _, test = train_test_split(np.arange(n_rows), test_size=segment['test_size'],
+                                       random_state=segment['random_state'])
+        rows.append(segment['start'] + test)
+    return np.concatenate(rows) if rows else np.empty(0, dtype=np.intp)
+
+def build_evaluation(model, accuracy, f1, cm, df, dataset_path, summary=None, holdout=None):
+    """Evaluation artifact saved next to the model (summary replaces summarize_dataset(df) when given).
+
+    holdout lists the held-out row segments (see holdout_segment); by default
+    train_model's split over all rows of the summary.
+    """
+    summary = dict(summary) if summary is not None else summarize_dataset(df)
+    summary['fingerprint'] = dataset_fingerprint(dataset_path)
+    summary['stamp'] = dataset_stamp(dataset_path)
+    if holdout is None:
+        holdout = [holdout_segment(0, summary['n_rows'])]
+
+    return {
+        'format_version': EVALUATION_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'accuracy': float(accuracy),
+        'f1': float(f1),
+        'confusion_matrix': [[int(v) for v in row] for row in cm],
+        'classes': [str(c) for c in model.classes_],
+        'dataset': summary,
+        'holdout': holdout
+    }
+
+def evaluate_model(model, df, dataset_path):
+    """Recompute the test-split metrics of a saved model from the raw dataset"""
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import accuracy_score, f1_score, confusion_matrix
+
+    X = df.drop('Label', axis=1)
+    y = df['Label']
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    y_pred = model.predict(X_test)
+    accuracy = accuracy_score(y_test, y_pred)
+    f1 = f1_score(y_test, y_pred, average='weighted')
+    cm = confusion_matrix(y_test, y_pred)
+
+    return build_evaluation(model, accuracy, f1, cm, df, dataset_path)
+
+def save_evaluation(evaluation, filepath='models/evaluation.json'):
+    """Write the evaluation artifact as JSON, replacing the old file only once the new one is complete"""
+    tmp_path = f"{filepath}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(evaluation, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, filepath)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def load_evaluation(filepath, dataset_path=None):
+    """Load the evaluation artifact, or None if it is missing, from another version or stale.
+
+    The dataset is only checked when the file is present, so deployments
+    that ship the model without the raw CSV still work; the SHA-256 is only
+    computed when the file's size or mtime differ from the saved stamp (once
+    per process, see dataset_fingerprint). The file itself is never
+    rewritten here: a refreshed stamp only goes into the returned dict.
+    """
+    if not os.path.exists(filepath):
+        return None
+
+    with open(filepath, encoding='utf-8') as f:
+        evaluation = json.load(f)
+
+    if evaluation.get('format_version') != EVALUATION_VERSION:
+        return None
+
+    if dataset_path is not None and os.path.exists(dataset_path):
+        if not dataset_matches(evaluation['dataset'], dataset_path):
+            return None
+        # Same content under a new mtime (e.g. a fresh clone)
+        evaluation['dataset']['stamp'] = dataset_stamp(dataset_path)
+
+    return evaluation
@@ -0,0 +1,127 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .inference import CompiledForest, compile_pipeline
+
+def as_compiled(model):
+    """CompiledForest for a fitted pipeline (explanations walk the flat node arrays)"""
+    return model if isinstance(model, CompiledForest) else compile_pipeline(model)
+
+def feature_groups(compiled):
+    """Original input columns and, per design-matrix column, the index of the column it came from"""
+    names = list(compiled.numeric_columns) + list(compiled.categorical_columns)
+    column_group = np.empty(compiled.n_features_, dtype=np.intp)
+    column_group[compiled.numeric_index] = np.arange(len(compiled.numeric_columns))
+    for i, (offset, table) in enumerate(zip(compiled.categorical_offsets, compiled.categorical_tables)):
+        column_group[offset:offset + len(table)] = len(compiled.numeric_columns) + i
+    return names, column_group
+
+def path_contributions(compiled, matrix):
+    """Exact decomposition of predict_proba along each row's decision paths.
+
+    Every split on a row's path moves the class distribution from the node to
+    the child taken; that change is credited to the input column of the split
+    (one-hot columns fold back into their categorical). Averaged over trees,
+    bias + contributions.sum(axis=1) equals predict_proba for every row.
+    Returns bias (n_classes,) and contributions (n_rows, n_columns, n_classes).
+    """
+    names, column_group = feature_groups(compiled)
+    n_rows = matrix.shape[0]
+    n_groups = len(names)
+    n_classes = compiled.value.shape[1]
+
+    columns = np.ascontiguousarray(matrix.T).ravel()
+    rows = np.arange(n_rows)
+    nodes = np.repeat(compiled.roots[:, None], n_rows, axis=1)
+    check_missing = compiled._routes_missing and np.isnan(matrix).any()
+    contributions = np.zeros((n_rows * n_groups, n_classes), dtype=np.float64)
+
+    for _ in range(compiled.max_depth):
+        x = columns[compiled.feature[nodes] * n_rows + rows]
+        go_left = x <= compiled.threshold[nodes]
+        if check_missing:
+            go_left |= np.isnan(x) & compiled.missing_go_to_left[nodes]
+        children = compiled._children[2 * nodes + go_left]
+
+        # Leaves point to themselves, so their "moves" are zero and can be summed too
+        target = (rows * n_groups + column_group[compiled.feature[nodes]]).ravel()
+        delta = (compiled.value[children] - compiled.value[nodes]).reshape(-1, n_classes)
+        for k in range(n_classes):
+            contributions[:, k] += np.bincount(target, weights=delta[:, k], minlength=n_rows * n_groups)
+        nodes = children
+
+    bias = compiled.value[compiled.roots].mean(axis=0)
+    return bias, contributions.reshape(n_rows, n_groups, n_classes) / compiled.n_trees
+
+class Explainer:
+    """Per-prediction explanations for the prediction page"""
+
+    def __init__(self, model):
+        self.compiled = as_compiled(model)
+        self.feature_names, _ = feature_groups(self.compiled)
+        self.classes = list(self.compiled.classes_)
+
+    def explain(self, input_df, target_class='Risiko Stres'):
+        """One DataFrame per row: contribution (probability points) of each input column to target_class"""
+        bias, contributions = path_contributions(self.compiled, self.compiled.transform(input_df))
+        k = self.classes.index(target_class)
+        return [pd.DataFrame({'Fitur': self.feature_names, 'Kontribusi': row[:, k]})
+                .sort_values('Kontribusi', key=np.abs, ascending=False, ignore_index=True)
+                for row in contributions], float(bias[k])
+
+# Per-process state of the permutation workers
+_worker = {}
+
+def _init_permutation_worker(compiled, matrix, y, column_group):
+    _worker.update(compiled=compiled, matrix=matrix, y=y, column_group=column_group)
+
+def _score(compiled, matrix, y):
+    # Imported here so per-prediction explanations do not load sklearn
+    from sklearn.metrics import f1_score
+    labels = compiled.classes_.take(np.argmax(compiled.predict_proba_matrix(matrix), axis=1))
+    return f1_score(y, labels, average='weighted')
+
+def _permuted_score(task):
+    group, repeat, random_state = task
+    matrix = _worker['matrix'].copy()
+    columns = np.flatnonzero(_worker['column_group'] == group)
+    # Fixed seed per (group, repeat): the same numbers whatever the worker count
+    order = np.random.default_rng([random_state, group, repeat]).permutation(len(matrix))
+    matrix[:, columns] = _worker['matrix'][order][:, columns]
+    return group, _score(_worker['compiled'], matrix, _worker['y'])
+
+def grouped_permutation_importance(model, X, y, n_repeats=5, random_state=42, workers=1):
+    """Drop in weighted F1 when one original input column is shuffled (all its one-hot columns together).
+
+    The design matrix is built once; each (column, repeat) shuffle is scored
+    by the compiled forest, spread over `workers` processes.
+    """
+    compiled = as_compiled(model)
+    names, column_group = feature_groups(compiled)
+    matrix = compiled.transform(X)
+    y = np.asarray(y, dtype=object)
+
+    _init_permutation_worker(compiled, matrix, y, column_group)
+    baseline = _score(compiled, matrix, y)
+    tasks = [(group, repeat, random_state) for group in range(len(names)) for repeat in range(n_repeats)]
+
+    if workers == 1:
+        results = [_permuted_score(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_permutation_worker,
+                                 initargs=(compiled, matrix, y, column_group)) as executor:
+            results = list(executor.map(_permuted_score, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+    drops = np.zeros((len(names), n_repeats))
+    counts = np.zeros(len(names), dtype=int)
+    for group, score in results:
+        drops[group, counts[group]] = baseline - score
+        counts[group] += 1
+
+    return pd.DataFrame({
+        'Fitur': names,
+        'Importance': drops.mean(axis=1),
+        'Std': drops.std(axis=1),
+    }).sort_values('Importance', ascending=False, ignore_index=True)
@@ -0,0 +1,267 @@
+import hashlib
+import json
+import math
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import f1_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold, train_test_split
+
+from .model_training import DEFAULT_CLASSIFIER_PARAMS, build_preprocessor
+from .normalizer import SurveyNormalizer
+
+# Candidate keys prefixed with this go to the OneHotEncoder, the rest to the RandomForestClassifier
+ENCODER_PREFIX = 'encoder__'
+
+DEFAULT_SPACE = {
+    'n_estimators': [100, 200, 400],
+    'max_depth': [4, 6, 8, 12, None],
+    'min_samples_leaf': [1, 5, 20],
+    'max_features': ['sqrt', 0.5],
+    'class_weight': [None, 'balanced'],
+    'encoder__min_frequency': [None, 0.01],
+}
+
+# Rows per single-row latency measurement
+LATENCY_REPEATS = 20
+
+# train_model's split: the held-out rows are the production holdout whatever the search seed is
+HOLDOUT_TEST_SIZE = 0.2
+HOLDOUT_RANDOM_STATE = 42
+
+def candidate_id(params):
+    """Stable short id of a parameter set"""
+    return hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+def split_params(params):
+    """Candidate -> (classifier params, encoder params)"""
+    classifier = {k: v for k, v in params.items() if not k.startswith(ENCODER_PREFIX)}
+    encoder = {k[len(ENCODER_PREFIX):]: v for k, v in params.items() if k.startswith(ENCODER_PREFIX)}
+    return classifier, encoder
+
+def generate_candidates(space, strategy='grid', n_iter=30, seed=42):
+    """Deterministic candidate list for a search space"""
+    if strategy == 'grid':
+        candidates = list(ParameterGrid(space))
+    elif strategy in ('random', 'halving'):
+        candidates = list(ParameterSampler(space, n_iter=n_iter, random_state=seed))
+    else:
+        raise ValueError(f"Unknown search strategy '{strategy}', expected 'grid', 'random' or 'halving'")
+
+    # ParameterSampler may repeat a candidate when the space is small
+    unique = {}
+    for params in candidates:
+        unique.setdefault(candidate_id(params), params)
+    return list(unique.values())
+
+def design_matrix_path(cache_dir, dataset_key, encoder_params):
+    key = candidate_id({'dataset': dataset_key, 'encoder': encoder_params})
+    return os.path.join(cache_dir, f"design_{key}")
+
+def build_design_matrix(df, encoder_params=None):
+    """Normalized + one-hot encoded training rows of the split used by train_model.
+
+    The held-out 20% never enters the search and is always the production
+    holdout (the search seed only drives sampling, folds and forests).
+    Normalizer and encoder are fitted once on all searchable rows instead of
+    per fold: the z-score is monotone so trees find the same splits, and the
+    encoder only differs for categories missing from a fold.
+    """
+    X = df.drop('Label', axis=1)
+    y = df['Label']
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=HOLDOUT_TEST_SIZE,
+                                                random_state=HOLDOUT_RANDOM_STATE)
+
+    preprocessor = build_preprocessor(encoder_params)
+    Xt = preprocessor.fit_transform(SurveyNormalizer().fit_transform(X_train))
+    if hasattr(Xt, 'toarray'):
+        Xt = Xt.toarray()
+
+    # Trees work in float32, casting once here saves a copy per fit
+    return np.ascontiguousarray(Xt, dtype=np.float32), y_train.to_numpy(dtype=str)
+
+def cached_design_matrix(df, dataset_key, encoder_params, cache_dir):
+    """Build the design matrix once per (dataset, encoder settings) and store it as .npy files"""
+    path = design_matrix_path(cache_dir, dataset_key, encoder_params)
+    if not os.path.exists(f"{path}_X.npy"):
+        os.makedirs(cache_dir, exist_ok=True)
+        X, y = build_design_matrix(df, encoder_params)
+        np.save(f"{path}_y.npy", y)
+        # X last and via rename, so an interrupted write is never mistaken for a cached matrix
+        np.save(f"{path}_X.tmp.npy", X)
+        os.replace(f"{path}_X.tmp.npy", f"{path}_X.npy")
+    return path
+
+# Per-process design matrices, memory-mapped on first use
+_designs = {}
+
+def _load_design(path):
+    if path not in _designs:
+        _designs[path] = (np.load(f"{path}_X.npy", mmap_mode='r'), np.load(f"{path}_y.npy"))
+    return _designs[path]
+
+def _subsample(y, n_rows, seed):
+    """Stratified, seeded row subset for the reduced-budget rungs of successive halving"""
+    if n_rows is None or n_rows >= len(y):
+        return np.arange(len(y))
+    index, _ = train_test_split(np.arange(len(y)), train_size=n_rows, stratify=y, random_state=seed)
+    return np.sort(index)
+
+def evaluate_candidate(task):
+    """Cross-validate one candidate on a cached design matrix and time it"""
+    params, design_path, n_rows, cv, seed = task
+    X, y = _load_design(design_path)
+    rows = _subsample(y, n_rows, seed)
+    X, y = np.asarray(X[rows]), y[rows]
+    classifier_params, _ = split_params(params)
+
+    scores, fit_times, batch_times = [], [], []
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=seed)
+    for train_index, val_index in folds.split(X, y):
+        forest = RandomForestClassifier(**{**DEFAULT_CLASSIFIER_PARAMS, **classifier_params,
+                                           'random_state': seed, 'n_jobs': 1})
+        start = time.perf_counter()
+        forest.fit(X[train_index], y[train_index])
+        fit_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        y_pred = forest.predict(X[val_index])
+        batch_times.append((time.perf_counter() - start) / len(val_index))
+        scores.append(f1_score(y[val_index], y_pred, average='weighted'))
+
+    # Single-row latency and size of the last fold's forest
+    single = X[val_index[:1]]
+    latencies = []
+    for _ in range(LATENCY_REPEATS):
+        start = time.perf_counter()
+        forest.predict(single)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        'candidate_id': candidate_id(params),
+        'params': params,
+        'n_rows': int(len(y)),
+        'cv': cv,
+        'seed': seed,
+        'f1_mean': float(np.mean(scores)),
+        'f1_std': float(np.std(scores)),
+        'fit_s': float(np.mean(fit_times)),
+        'predict_ms': float(np.median(latencies) * 1000),
+        'predict_us_per_row': float(np.mean(batch_times) * 1e6),
+        'model_kb': len(pickle.dumps(forest)) / 1024,
+    }
+
+def result_key(params, n_rows, cv, seed, dataset_key):
+    """Everything a result depends on; a finished key is never evaluated again"""
+    return candidate_id({'params': params, 'n_rows': n_rows, 'cv': cv, 'seed': seed, 'dataset': dataset_key})
+
+def load_results(results_path):
+    """Finished evaluations of previous (possibly interrupted) runs, by result key"""
+    results = {}
+    if os.path.exists(results_path):
+        with open(results_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # partial last line of an interrupted run
+                results[record['key']] = record
+    return results
+
+class HyperparameterSearch:
+    """Cross-validated search over forest and encoder settings on cached design matrices.
+
+    Every finished evaluation is appended to results.jsonl in output_dir, so a
+    rerun with the same settings skips the work already done.
+    """
+
+    def __init__(self, df, dataset_key, output_dir='reports/search', cv=5, seed=42, workers=1):
+        self.df = df
+        self.dataset_key = dataset_key
+        self.output_dir = output_dir
+        self.cache_dir = os.path.join(output_dir, 'cache')
+        self.results_path = os.path.join(output_dir, 'results.jsonl')
+        self.cv = cv
+        self.seed = seed
+        self.workers = workers
+        os.makedirs(output_dir, exist_ok=True)
+        self.results = load_results(self.results_path)
+        self.reused = 0
+
+    def _design_path(self, params):
+        _, encoder_params = split_params(params)
+        return cached_design_matrix(self.df, self.dataset_key, encoder_params, self.cache_dir)
+
+    def evaluate(self, candidates, n_rows=None, progress=None):
+        """Results for candidates at a row budget (None = all rows), running only missing ones"""
+        keys = [result_key(params, n_rows, self.cv, self.seed, self.dataset_key) for params in candidates]
+        tasks = [(key, (params, self._design_path(params), n_rows, self.cv, self.seed))
+                 for key, params in zip(keys, candidates) if key not in self.results]
+        self.reused += len(candidates) - len(tasks)
+
+        with open(self.results_path, 'a', encoding='utf-8') as log:
+            def record(key, result):
+                result['key'] = key
+                self.results[key] = result
+                log.write(json.dumps(result, default=str) + "\n")
+                log.flush()
+                if progress is not None:
+                    progress(result)
+
+            if self.workers == 1:
+                for key, task in tasks:
+                    record(key, evaluate_candidate(task))
+            elif tasks:
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    futures = {executor.submit(evaluate_candidate, task): key for key, task in tasks}
+                    for future in as_completed(futures):
+                        record(futures[future], future.result())
+
+        return [self.results[key] for key in keys]
+
+    def run(self, candidates, strategy='grid', eta=3, min_rows=None, progress=None):
+        """Evaluate candidates; 'halving' races them on growing row budgets, keeping the best 1/eta per rung"""
+        if strategy != 'halving':
+            return self.evaluate(candidates, progress=progress)
+
+        n_total = int(len(self.df) * 0.8)
+        n_rungs = max(1, math.ceil(math.log(len(candidates), eta))) if len(candidates) > 1 else 1
+        min_rows = min_rows or max(self.cv * 50, n_total // eta ** (n_rungs - 1))
+
+        results = []
+        survivors = candidates
+        for rung in range(n_rungs):
+            n_rows = None if rung == n_rungs - 1 else min(n_total, min_rows * eta ** rung)
+            rung_results = self.evaluate(survivors, n_rows, progress)
+            results.extend(rung_results)
+            ranked = sorted(zip(rung_results, survivors), key=lambda pair: -pair[0]['f1_mean'])
+            survivors = [params for _, params in ranked[:max(1, math.ceil(len(survivors) / eta))]]
+        return results
+
+def leaderboard(results):
+    """One row per candidate at the largest budget it reached, best F1 first"""
+    best = {}
+    for result in results:
+        current = best.get(result['candidate_id'])
+        if current is None or result['n_rows'] > current['n_rows']:
+            best[result['candidate_id']] = result
+
+    rows = []
+    for result in best.values():
+        row = {k: v for k, v in result.items() if k not in ('params', 'key', 'cv', 'seed')}
+        row.update({f"param_{k}": v for k, v in result['params'].items()})
+        rows.append(row)
+
+    board = pd.DataFrame(rows)
+    if board.empty:
+        return board
+    # Ties broken by size then id, not by timings, so reruns rank identically
+    board = board.sort_values(['n_rows', 'f1_mean', 'model_kb', 'candidate_id'],
+                              ascending=[False, False, True, True], ignore_index=True)
+    board.insert(0, 'rank', range(1, len(board) + 1))
+    return board
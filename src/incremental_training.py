@@ -0,0 +1,119 @@
+import hashlib
+import io
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score, f1_score, confusion_matrix
+
+from .data_preprocessing import RAW_CSV_DTYPES
+
+def data_watermark(filepath):
+    """How far into the raw CSV a model has been trained: rows, bytes and a hash of those bytes"""
+    digest = hashlib.sha256()
+    n_bytes = 0
+    n_lines = 0
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+            n_bytes += len(block)
+            n_lines += block.count(b'\n')
+        if n_bytes:
+            f.seek(n_bytes - 1)
+            if f.read(1) != b'\n':
+                n_lines += 1
+
+    return {'rows': n_lines - 1, 'bytes': n_bytes, 'prefix_sha256': digest.hexdigest()}
+
+def read_new_rows(filepath, watermark, verify=True):
+    """Rows appended to the CSV after the watermark (only the appended bytes are parsed)"""
+    with open(filepath, 'rb') as f:
+        header = f.readline()
+
+        if verify:
+            # The history must be unchanged, otherwise incremental training would silently miss edits
+            f.seek(0)
+            digest = hashlib.sha256()
+            remaining = watermark['bytes']
+            while remaining:
+                block = f.read(min(1 << 20, remaining))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+            if remaining or digest.hexdigest() != watermark['prefix_sha256']:
+                raise ValueError(f"{filepath} was modified before the watermark, retrain from scratch with save_model.py")
+
+        f.seek(watermark['bytes'])
+        appended = f.read()
+
+    return pd.read_csv(io.BytesIO(header + appended), sep=';', dtype=RAW_CSV_DTYPES)
+
+def _remap_thresholds(forest, feature_index, old_mean, old_std, new_mean, new_std):
+    """Rewrite split thresholds of fitted trees so they keep the same cut points in raw units"""
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        state = tree.__getstate__()
+        nodes = state['nodes'].copy()
+        for column, index in feature_index.items():
+            split = nodes['feature'] == index
+            raw = old_mean[column] + nodes['threshold'][split] * old_std[column]
+            nodes['threshold'][split] = (raw - new_mean[column]) / new_std[column]
+        state['nodes'] = nodes
+        tree.__setstate__(state)
+
+def update_model(model, new_df, extra_trees=50, max_trees=None, random_state=42):
+    """Grow a fitted pipeline with trees trained on new rows only.
+
+    The normalization statistics are updated with the new training rows, the
+    thresholds of the existing trees are rescaled to the new statistics (so
+    they keep splitting at the same raw values, up to float32 rounding of
+    values within ~1e-7 of a split), extra_trees trees are fitted
+    on the new rows with warm_start, and the oldest trees are dropped if the
+    forest exceeds max_trees. The one-hot encoder is kept as is: categories
+    first seen in the new rows are ignored until the next full retrain.
+    Metrics are computed on a 20% holdout of the new rows.
+    """
+    normalizer = model.named_steps['normalizer']
+    preprocessor = model.named_steps['preprocessor']
+    forest = model.named_steps['classifier']
+
+    X = new_df.drop('Label', axis=1)
+    y = new_df['Label']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=random_state)
+
+    missing = set(forest.classes_) - set(y_train)
+    if missing:
+        raise ValueError(f"New rows have no training examples of {sorted(missing)}, collect more data first")
+
+    unseen = {}
+    for name, encoder, columns in preprocessor.transformers_:
+        if hasattr(encoder, 'categories_'):
+            for column, categories in zip(columns, encoder.categories_):
+                new_values = set(X_train[column].dropna()) - set(categories)
+                if new_values:
+                    unseen[column] = sorted(map(str, new_values))
+
+    # Streaming mean/std update, then keep the old trees consistent with it
+    old_mean, old_std = normalizer.mean_.copy(), normalizer.std_.copy()
+    normalizer.partial_fit(X_train)
+    feature_names = list(preprocessor.get_feature_names_out())
+    feature_index = {column: feature_names.index(f'num__{column}') for column in normalizer.numeric_features
+                     if f'num__{column}' in feature_names}
+    _remap_thresholds(forest, feature_index, old_mean, old_std, normalizer.mean_, normalizer.std_)
+
+    # Only the new trees see the new rows
+    Xt = preprocessor.transform(normalizer.transform(X_train))
+    forest.set_params(warm_start=True, n_estimators=len(forest.estimators_) + extra_trees)
+    forest.fit(Xt, y_train)
+    forest.set_params(warm_start=False)
+
+    if max_trees is not None and len(forest.estimators_) > max_trees:
+        forest.estimators_ = forest.estimators_[-max_trees:]
+        forest.n_estimators = max_trees
+
+    y_pred = model.predict(X_test)
+    accuracy = accuracy_score(y_test, y_pred)
+    f1 = f1_score(y_test, y_pred, average='weighted')
+    cm = confusion_matrix(y_test, y_pred, labels=forest.classes_)
+
+    return model, accuracy, f1, cm, normalizer.get_stats(), unseen
@@ -0,0 +1,249 @@
+import numpy as np
+import pandas as pd
+
+from .data_preprocessing import clean_ipk_column
+
+# Rows evaluated per traversal block; keeps the (n_trees x rows) node-index matrix cache-sized
+DEFAULT_CHUNK_SIZE = 1024
+
+
+class CompiledForest:
+    """Flat-array version of the fitted preprocessing + Random Forest pipeline.
+
+    All trees are concatenated into one set of node arrays (global node ids),
+    the SurveyNormalizer step is reduced to per-column mean/std arrays, and the
+    ColumnTransformer to a passthrough column list plus a one-hot column map,
+    so a whole batch is scored with a handful of NumPy operations instead of
+    200 sklearn estimator calls.
+
+    Inputs are cast to float32 like sklearn does before the tree walk, and the
+    per-tree leaf distributions are accumulated in estimator order and then
+    divided by the number of trees. That matches ``Pipeline.predict_proba`` bit
+    for bit when the forest runs with n_jobs=1; with more joblib threads
+    sklearn adds the trees in whatever order the threads finish, so its
+    last bits can vary from call to call (differences around 1e-16, labels
+    only on exact ties).
+    """
+
+    def __init__(self, classes, feature_names_out, feature_importances,
+                 numeric_columns, numeric_index, categorical_columns,
+                 categorical_tables, categorical_offsets, feature, threshold,
+                 children, missing_go_to_left, value, roots, max_depth, normalized_columns=(), normalize_mean=(),
+                 normalize_std=(), ipk_column=None):
+        self.classes_ = np.asarray(classes, dtype=object)
+        self.feature_names_out_ = np.asarray(feature_names_out, dtype=object)
+        self.feature_importances_ = np.asarray(feature_importances, dtype=np.float64)
+        self.n_features_ = len(self.feature_names_out_)
+        self.metadata = {}
+
+        # Raw-input normalization (empty for pipelines trained on pre-normalized frames)
+        self.normalized_columns = list(normalized_columns)
+        self.normalize_mean = np.asarray(normalize_mean, dtype=np.float64)
+        self.normalize_std = np.asarray(normalize_std, dtype=np.float64)
+        self.ipk_column = ipk_column
+        self.normalizes_input = bool(self.normalized_columns)
+        self._normalize_index = {column: i for i, column in enumerate(self.normalized_columns)}
+
+        # Input layout
+        self.numeric_columns = list(numeric_columns)
+        self.numeric_index = np.asarray(numeric_index, dtype=np.intp)
+        self.categorical_columns = list(categorical_columns)
+        self.categorical_tables = [np.asarray(cats, dtype=object) for cats in categorical_tables]
+        self.categorical_offsets = np.asarray(categorical_offsets, dtype=np.intp)
+        self._category_index = [pd.Index(cats) for cats in self.categorical_tables]
+
+        # Node arrays (leaves point to themselves so extra levels are no-ops)
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        # children[node] = (right, left), so children.ravel()[2 * node + go_left] is the next
+        # node: one gather per level instead of two plus a where
+        self.children = np.asarray(children, dtype=np.intp)
+        self.missing_go_to_left = np.asarray(missing_go_to_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.n_trees = len(self.roots)
+
+        self._children = self.children.reshape(-1)
+        self._routes_missing = bool(self.missing_go_to_left.any())
+
+    @property
+    def children_left(self):
+        return self.children[:, 1]
+
+    @property
+    def children_right(self):
+        return self.children[:, 0]
+
+    def transform(self, X):
+        """Build the float32 design matrix the forest was trained on"""
+        n_rows = len(X)
+        matrix = np.zeros((n_rows, self.n_features_), dtype=np.float32)
+
+        for column, index in zip(self.numeric_columns, self.numeric_index):
+            matrix[:, index] = self._numeric_values(X[column])
+
+        rows = np.arange(n_rows)
+        for column, index, offset in zip(self.categorical_columns, self._category_index, self.categorical_offsets):
+            codes = index.get_indexer(X[column])
+            known = codes >= 0  # unknown categories stay all-zero (handle_unknown='ignore')
+            matrix[rows[known], offset + codes[known]] = 1.0
+
+        return matrix
+
+    def _numeric_values(self, values):
+        """float64 values of one numeric column, cleaned and normalized like SurveyNormalizer"""
+        position = self._normalize_index.get(values.name)
+        if position is None:
+            return values.to_numpy(dtype=np.float64)
+
+        if values.name == self.ipk_column:
+            values = clean_ipk_column(values)
+        values = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+        return (values - self.normalize_mean[position]) / self.normalize_std[position]
+
+    def apply(self, matrix):
+        """Return the global leaf id reached by every row in every tree, shape (n_trees, n_rows)"""
+        n_rows = matrix.shape[0]
+        # Feature-major copy so x[feature, row] is a single flat gather
+        columns = np.ascontiguousarray(matrix.T).ravel()
+        rows = np.arange(n_rows)
+        nodes = np.repeat(self.roots[:, None], n_rows, axis=1)
+        check_missing = self._routes_missing and np.isnan(matrix).any()
+
+        for _ in range(self.max_depth):
+            x = columns[self.feature[nodes] * n_rows + rows]
+            go_left = x <= self.threshold[nodes]
+            if check_missing:
+                go_left |= np.isnan(x) & self.missing_go_to_left[nodes]
+            nodes = self._children[2 * nodes + go_left]
+
+        return nodes
+
+    def predict_proba_matrix(self, matrix, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Class probabilities for an already transformed float32 matrix"""
+        n_rows = matrix.shape[0]
+        proba = np.zeros((n_rows, len(self.classes_)), dtype=np.float64)
+
+        for start in range(0, n_rows, chunk_size):
+            stop = min(start + chunk_size, n_rows)
+            leaves = self.apply(matrix[start:stop])
+            block = proba[start:stop]
+            # Estimator order: sklearn's _accumulate_prediction order when it runs single-threaded
+            for tree_leaves in leaves:
+                block += self.value[tree_leaves]
+
+        proba /= self.n_trees
+        return proba
+
+    def predict_proba(self, X, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Predict class probabilities for a DataFrame of raw input rows"""
+        return self.predict_proba_matrix(self.transform(X), chunk_size=chunk_size)
+
+    def predict(self, X, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Predict class labels for a DataFrame of raw input rows"""
+        proba = self.predict_proba(X, chunk_size=chunk_size)
+        return self.classes_.take(np.argmax(proba, axis=1))
+
+
+def _leaf_distribution(tree):
+    """Per-node class distribution exactly as DecisionTreeClassifier.predict_proba returns it"""
+    value = np.array(tree.value[:, 0, :], dtype=np.float64)
+    totals = value.sum(axis=1, keepdims=True)
+    # Older sklearn stored raw class counts and normalized at predict time
+    if not np.allclose(totals, 1.0):
+        totals[totals == 0.0] = 1.0
+        value /= totals
+    return value
+
+
+def _normalizer_arrays(normalizer):
+    """Keyword arguments describing a fitted SurveyNormalizer (none for legacy pipelines)"""
+    if normalizer is None:
+        return {}
+
+    columns = list(normalizer.numeric_features)
+    return {
+        'normalized_columns': columns,
+        'normalize_mean': normalizer.mean_[columns].to_numpy(dtype=np.float64),
+        'normalize_std': normalizer.std_[columns].to_numpy(dtype=np.float64),
+        'ipk_column': normalizer.ipk_column,
+    }
+
+
+def compile_pipeline(model):
+    """Compile a fitted Pipeline([normalizer], preprocessor, RandomForestClassifier) into a CompiledForest"""
+    normalizer = model.named_steps.get('normalizer')
+    preprocessor = model.named_steps['preprocessor']
+    forest = model.named_steps['classifier']
+    input_names = list(preprocessor.feature_names_in_)
+
+    numeric_columns, numeric_index = [], []
+    categorical_columns, categorical_tables, categorical_offsets = [], [], []
+    position = 0
+
+    for name, transformer, columns in preprocessor.transformers_:
+        columns = [input_names[c] if isinstance(c, (int, np.integer)) else c for c in columns]
+        if transformer == 'drop' or len(columns) == 0:
+            continue
+
+        if transformer == 'passthrough' or getattr(transformer, 'func', False) is None:
+            numeric_columns.extend(columns)
+            numeric_index.extend(range(position, position + len(columns)))
+            position += len(columns)
+        elif type(transformer).__name__ == 'OneHotEncoder':
+            if transformer.drop_idx_ is not None:
+                raise ValueError("OneHotEncoder with drop is not supported by the compiled engine")
+            for column, cats in zip(columns, transformer.categories_):
+                categorical_columns.append(column)
+                categorical_tables.append(cats)
+                categorical_offsets.append(position)
+                position += len(cats)
+        else:
+            raise ValueError(f"Unsupported transformer '{name}' for compiled inference: {transformer!r}")
+
+    feature_names_out = preprocessor.get_feature_names_out()
+    if position != len(feature_names_out):
+        raise ValueError("Compiled column map does not match the preprocessor output width")
+
+    feature, threshold, left, right, missing_left, value, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+
+        roots.append(offset)
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+        left.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        right.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        if hasattr(tree, 'missing_go_to_left'):
+            missing_left.append(np.asarray(tree.missing_go_to_left, dtype=bool))
+        else:
+            missing_left.append(np.zeros(tree.node_count, dtype=bool))
+        value.append(_leaf_distribution(tree))
+
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    return CompiledForest(
+        classes=forest.classes_,
+        feature_names_out=feature_names_out,
+        feature_importances=forest.feature_importances_,
+        numeric_columns=numeric_columns,
+        numeric_index=numeric_index,
+        categorical_columns=categorical_columns,
+        categorical_tables=categorical_tables,
+        categorical_offsets=categorical_offsets,
+        feature=np.concatenate(feature),
+        threshold=np.concatenate(threshold),
+        children=np.stack([np.concatenate(right), np.concatenate(left)], axis=1),
+        missing_go_to_left=np.concatenate(missing_left),
+        value=np.concatenate(value),
+        roots=roots,
+        max_depth=max_depth,
+        **_normalizer_arrays(normalizer),
+    )
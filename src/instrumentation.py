@@ -0,0 +1,244 @@
+import bisect
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Histogram bucket upper bounds in seconds (Prometheus convention)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Request breakdowns kept for the debug panel
+DEFAULT_RECENT = 20
+
+METRIC_NAME = 'resiko_stage_duration_seconds'
+
+_NULL = nullcontext()
+
+# Stages of the request being traced in this thread/session
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+
+
+class _Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+class Instrumentation:
+    """Per-stage timing histograms plus the breakdown of the last requests.
+
+    Disabled by default: stage() then hands back a shared null context and
+    timed() functions call straight through, so the hooks can stay in the hot
+    path. When export_dir is set, metrics.prom (Prometheus text format, e.g.
+    for the node_exporter textfile collector) is rewritten and one JSON line
+    per request is appended to traces.jsonl after every request.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.export_dir = None
+        self.histograms = {}
+        self.recent = deque(maxlen=DEFAULT_RECENT)
+        self._lock = threading.Lock()
+        # File exports run outside _lock; this only orders them (newest metrics.prom wins)
+        self._export_lock = threading.Lock()
+        self._snapshots = 0
+        self._exported = 0
+
+    def configure(self, enabled=True, export_dir=None, recent=DEFAULT_RECENT):
+        self.enabled = enabled
+        self.export_dir = export_dir
+        if recent != self.recent.maxlen:
+            self.recent = deque(self.recent, maxlen=recent)
+        if export_dir:
+            os.makedirs(export_dir, exist_ok=True)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.recent.clear()
+
+    def _observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = _Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def _stage(self, name):
+        trace = _current_trace.get()
+        if trace is None:
+            # Outside a request (e.g. a deferred download) the stage is its own request
+            with self._request(name):
+                yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self._observe(name, seconds)
+            trace['stages'].append((name, seconds * 1000))
+
+    def stage(self, name):
+        """Context manager timing one stage"""
+        if not self.enabled:
+            return _NULL
+        return self._stage(name)
+
+    @contextmanager
+    def _request(self, name):
+        trace = {'request': name, 'started_at': datetime.now().isoformat(timespec='seconds'), 'stages': []}
+        token = _current_trace.set(trace)
+        start = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            _current_trace.reset(token)
+            seconds = time.perf_counter() - start
+            trace['total_ms'] = seconds * 1000
+            self._observe(name, seconds)
+            self._finish(trace)
+
+    def request(self, name):
+        """Context manager grouping the stages run inside it into one request breakdown"""
+        if not self.enabled:
+            return _NULL
+        return self._request(name)
+
+    def current_trace(self):
+        """Breakdown of the request running in this thread/session (None outside a request or when disabled)"""
+        return _current_trace.get() if self.enabled else None
+
+    @contextmanager
+    def _shared(self, traces):
+        callers = list({id(trace): trace for trace in traces if trace is not None}.values())
+        if not callers:
+            yield
+            return
+
+        batch = {'stages': []}
+        token = _current_trace.set(batch)
+        try:
+            yield
+        finally:
+            _current_trace.reset(token)
+            for trace in callers:
+                trace['stages'].extend(batch['stages'])
+                trace['batch'] = {'requests': len(callers), 'stages': len(batch['stages'])}
+
+    def shared(self, traces):
+        """Context manager for work done once on behalf of several requests (e.g. a micro-batch).
+
+        traces are the callers' current_trace() values. Stages run inside it
+        are observed once in the histograms and, when it exits, appended to
+        every caller's breakdown, which also gets a 'batch' entry with the
+        number of requests that shared that wall time.
+        """
+        if not self.enabled:
+            return _NULL
+        return self._shared(traces)
+
+    def timed(self, name):
+        """Decorator timing every call of a function as a stage"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self._stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _finish(self, trace):
+        export_dir = self.export_dir
+        with self._lock:
+            self.recent.append(trace)
+            if not export_dir:
+                return
+            snapshot = self._snapshot()
+            self._snapshots += 1
+            sequence = self._snapshots
+        # Serializing and writing happen outside _lock so other sessions' stages are not held up by disk I/O
+        self._export(export_dir, trace, snapshot, sequence)
+
+    def _snapshot(self):
+        """Copy of the histograms, taken under _lock"""
+        return {name: (list(h.counts), h.total, h.count) for name, h in self.histograms.items()}
+
+    def _export(self, export_dir, trace, snapshot, sequence):
+        line = json.dumps(trace) + "\n"
+        text = _prometheus_text(snapshot)
+        try:
+            with self._export_lock:
+                with open(os.path.join(export_dir, 'traces.jsonl'), 'a', encoding='utf-8') as f:
+                    f.write(line)
+                if sequence < self._exported:
+                    return  # a newer snapshot is already on disk
+                self._exported = sequence
+                path = os.path.join(export_dir, 'metrics.prom')
+                with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                    f.write(text)
+                # Scrapers must never see a half-written file
+                os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"[WARNING] Could not export metrics: {e}")
+
+    def prometheus_text(self):
+        """All histograms in the Prometheus text exposition format"""
+        with self._lock:
+            snapshot = self._snapshot()
+        return _prometheus_text(snapshot)
+
+    def recent_traces(self):
+        """Last request breakdowns, newest first"""
+        with self._lock:
+            return list(reversed(self.recent))
+
+
+def _prometheus_text(snapshot):
+    """Histogram snapshot (see Instrumentation._snapshot) in the Prometheus text exposition format"""
+    lines = [f"# HELP {METRIC_NAME} Wall time of instrumented stages and requests",
+             f"# TYPE {METRIC_NAME} histogram"]
+    for name, (counts, total, count) in sorted(snapshot.items()):
+        label = name.replace('\\', '\\\\').replace('"', '\\"')
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS + (float('inf'),), counts):
+            cumulative += bucket
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'{METRIC_NAME}_bucket{{stage="{label}",le="{le}"}} {cumulative}')
+        lines.append(f'{METRIC_NAME}_sum{{stage="{label}"}} {total!r}')
+        lines.append(f'{METRIC_NAME}_count{{stage="{label}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+# Process-wide instance used by the hooks below (configured by the app)
+INSTRUMENTS = Instrumentation()
+
+def stage(name):
+    return INSTRUMENTS.stage(name)
+
+def request(name):
+    return INSTRUMENTS.request(name)
+
+def timed(name):
+    return INSTRUMENTS.timed(name)
+
+def shared(traces):
+    return INSTRUMENTS.shared(traces)
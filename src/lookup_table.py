@@ -0,0 +1,361 @@
+# Precomputed probabilities for every input the prediction form can produce.
+#
+# Every form input is discrete, and a tree only compares a numeric input with
+# its split thresholds, so all values falling between the same two thresholds
+# (of the whole forest) score identically. Each numeric column is reduced to the
+# threshold intervals the form can reach (401 IPK values become ~90 intervals; the
+# other sliders keep one interval per value, since the forest splits between all
+# of them), the table holds one float32 probability per combination of interval
+# and category, and a prediction is a binary search per column plus one array read.
+# Every cell is checked against the forest when the table is built. The guarantee
+# is exact labels, not exact probabilities: stored probabilities differ from
+# predict_proba by float32 rounding (a few 1e-8). Bit-exact answers would need
+# both class sums as float64 (predict_proba's p1 is its own sum, not 1 - p0),
+# four times the ~213 MB of the default model's table.
+#
+# File layout (little endian):
+#   b'RFLOOKUP' | uint32 format version | uint32 reserved | uint64 header length
+#   header JSON (classes, columns, thresholds, interval maps, model fingerprint, metadata)
+#   64-byte aligned float32 probability of classes[0] per cell, C order over the
+#   categorical columns then the numeric interval coordinates
+import hashlib
+import json
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .discretization import DiscretizedForest, interval_codes, split_thresholds
+
+MAGIC = b'RFLOOKUP'
+# 2: form IPK below 1 is no longer rescaled as a survey time fraction, older tables hold those cells rescaled
+LOOKUP_VERSION = 2
+ALIGNMENT = 64
+
+_PREFIX = struct.Struct('<8sIIQ')
+
+# Values the prediction form sliders produce (app/pages/prediction.py); categories come from the model
+FORM_NUMERIC_GRID = {
+    'Umur': np.arange(18, 26),
+    'Jam Belajar per Hari': np.arange(1, 8),
+    'Jam Tidur per Hari': np.arange(3, 10),
+    'IPK': np.round(np.arange(401) * 0.01, 2),
+    'Jumlah Tugas Besar per Minggu': np.arange(0, 6),
+}
+
+
+def forest_fingerprint(compiled):
+    """SHA-256 of everything that decides a CompiledForest's output"""
+    digest = hashlib.sha256()
+    for array, dtype in ((compiled.feature, '<i8'), (compiled.threshold, '<f8'), (compiled.children, '<i8'),
+                         (compiled.value, '<f8'), (compiled.roots, '<i8'), (compiled.numeric_index, '<i8'),
+                         (compiled.normalize_mean, '<f8'), (compiled.normalize_std, '<f8')):
+        digest.update(np.ascontiguousarray(array, dtype=dtype).tobytes())
+    digest.update(json.dumps([[str(c) for c in compiled.classes_], compiled.numeric_columns,
+                              compiled.categorical_columns, compiled.normalized_columns,
+                              [[str(c) for c in cats] for cats in compiled.categorical_tables]]).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _numeric_dimensions(compiled, grid):
+    """Per numeric column: thresholds, interval -> cell coordinate map, and one representative design value per cell"""
+    dimensions = []
+    for column, index in zip(compiled.numeric_columns, compiled.numeric_index):
+        if column not in grid:
+            raise ValueError(f"No form grid for numeric column '{column}'")
+        thresholds = split_thresholds(compiled, index)
+        design = compiled._numeric_values(pd.Series(grid[column], name=column)).astype(np.float32)
+        intervals = interval_codes(thresholds, design)
+        reachable, first = np.unique(intervals, return_index=True)
+
+        coordinate = np.full(len(thresholds) + 1, -1, dtype=np.int32)
+        coordinate[reachable] = np.arange(len(reachable))
+        dimensions.append({'column': column, 'index': index, 'thresholds': thresholds,
+                           'coordinate': coordinate, 'representatives': design[first]})
+    # Most intervals innermost: longer contiguous runs when leaves are added to the grid
+    return sorted(dimensions, key=lambda d: len(d['representatives']))
+
+
+def _leaf_regions(compiled, tree, numeric):
+    """Leaves of one tree as boxes: per categorical column a mask of allowed categories,
+    per numeric column a [start, stop) range of interval coordinates, plus the leaf distribution.
+    """
+    categorical = {}
+    for i, (offset, table) in enumerate(zip(compiled.categorical_offsets, compiled.categorical_tables)):
+        for code in range(len(table)):
+            categorical[offset + code] = (i, code)
+    numeric_dim = {d['index']: i for i, d in enumerate(numeric)}
+
+    regions = []
+    stack = [(compiled.roots[tree], [np.ones(len(t), dtype=bool) for t in compiled.categorical_tables],
+              [(0, len(d['representatives'])) for d in numeric])]
+    while stack:
+        node, masks, ranges = stack.pop()
+        right, left = compiled.children[node]
+        if left == node:
+            regions.append((masks, ranges, compiled.value[node]))
+            continue
+        column, threshold = compiled.feature[node], compiled.threshold[node]
+        if column in categorical:
+            # One-hot column: x = 1 for its category, so "x <= threshold" keeps or drops that category
+            dim, code = categorical[column]
+            goes_left = np.where(np.arange(len(masks[dim])) == code, 1.0 <= threshold, 0.0 <= threshold)
+            for child, keep in ((left, goes_left), (right, ~goes_left)):
+                child_masks = list(masks)
+                child_masks[dim] = masks[dim] & keep
+                stack.append((child, child_masks, ranges))
+        else:
+            # Interval coordinates are ordered, so "x <= threshold" is a prefix of them
+            dim = numeric_dim[column]
+            split = int(np.searchsorted(numeric[dim]['representatives'].astype(np.float64), threshold, side='right'))
+            start, stop = ranges[dim]
+            for child, bounds in ((left, (start, min(stop, split))), (right, (max(start, split), stop))):
+                child_ranges = list(ranges)
+                child_ranges[dim] = bounds
+                stack.append((child, masks, child_ranges))
+    return regions
+
+
+def _cell_codes(forest, numeric, categories, coords):
+    """DiscretizedForest codes of grid cells given by category codes and numeric interval coordinates"""
+    codes = np.empty((len(coords[0]), len(forest.n_codes)), dtype=forest.code_dtype)
+    dims = {index: dim for dim, index in enumerate(forest.compiled.numeric_index)}
+    for dimension, coordinate in zip(numeric, coords):
+        dim = dims[dimension['index']]
+        codes[:, dim] = interval_codes(forest.thresholds[dim], dimension['representatives'])[coordinate]
+    for i, code in enumerate(categories):
+        codes[:, len(forest.thresholds) + i] = code
+    return codes
+
+
+# Per-process state of the build workers
+_worker = {}
+
+def _init_build_worker(forest, numeric, regions):
+    _worker.update(forest=forest, numeric=numeric, regions=regions)
+
+def _build_chunk(categories):
+    """float32 cells of one category combination, checked cell by cell against the forest;
+    returns them with the largest probability deviation from predict_proba"""
+    forest, numeric, regions = _worker['forest'], _worker['numeric'], _worker['regions']
+    numeric_sizes = [len(d['representatives']) for d in numeric]
+
+    total = np.zeros(numeric_sizes, dtype=np.float64)
+    # Leaves of one tree are disjoint, so each cell still receives its trees in estimator order
+    for masks, ranges, value in regions:
+        if all(mask[code] for mask, code in zip(masks, categories)):
+            total[tuple(slice(start, stop) for start, stop in ranges)] += value[0]
+    total /= forest.n_trees
+    first = total.ravel()
+
+    # The forest's own answer for the representative inputs of every cell (bit-identical to predict_proba)
+    coords = np.unravel_index(np.arange(len(first)), numeric_sizes)
+    proba = forest.predict_proba_codes(_cell_codes(forest, numeric, categories, coords))
+    if not np.array_equal(first, proba[:, 0]):
+        mismatches = int((first != proba[:, 0]).sum())
+        raise ValueError(f"{mismatches} lookup cells for category codes {categories} differ from the forest")
+
+    # predict_proba's argmax picks classes[0] iff p0 >= p1, GridLookupModel's iff the float32
+    # cell >= 0.5. Within float32 rounding of 0.5 these can disagree: store a value on the
+    # forest's side for those few cells
+    stored = first.astype(np.float32)
+    wins = proba[:, 0] >= proba[:, 1]
+    flipped = np.flatnonzero((stored >= np.float32(0.5)) != wins)
+    stored[flipped] = np.where(wins[flipped], np.float32(0.5), np.nextafter(np.float32(0.5), np.float32(0)))
+
+    # What GridLookupModel will answer: (p0, 1 - p0) from the float32 cell
+    served = stored.astype(np.float64)
+    if not np.array_equal(served >= 1.0 - served, wins):
+        raise ValueError(f"Lookup labels for category codes {categories} differ from the forest")
+    deviation = max(float(np.abs(served - proba[:, 0]).max()), float(np.abs(1.0 - served - proba[:, 1]).max()))
+    return stored, deviation
+
+
+def build_lookup_table(compiled, grid=FORM_NUMERIC_GRID, workers=1, progress=None):
+    """Probabilities of classes[0] for every reachable form combination.
+
+    The grid is filled one category combination at a time. Every tree's
+    leaves are boxes of interval ranges, so a tree adds its leaf value to a
+    chunk with one slice per leaf; trees are added in estimator order and the
+    sum divided by the number of trees, the same float64 operations as
+    predict_proba. Every cell is then checked against the forest itself
+    (DiscretizedForest on the cell's representative inputs): the float64
+    values must be equal and the labels of the stored float32 cells identical,
+    otherwise ValueError. Chunks are spread over `workers` processes;
+    progress(done, total) is called after each. Returns (header dict, float32
+    cells); header['verification'] holds the number of cells checked and the
+    largest probability deviation caused by float32 storage.
+    """
+    if len(compiled.classes_) != 2:
+        raise ValueError("Lookup tables support binary classifiers only")
+
+    numeric = _numeric_dimensions(compiled, grid)
+    category_sizes = [len(t) for t in compiled.categorical_tables]
+    numeric_sizes = [len(d['representatives']) for d in numeric]
+    chunk_cells = int(np.prod(numeric_sizes))
+    regions = [region for tree in range(compiled.n_trees) for region in _leaf_regions(compiled, tree, numeric)]
+    forest = DiscretizedForest(compiled)
+    chunks = list(np.ndindex(*category_sizes))
+    cells = np.empty(len(chunks) * chunk_cells, dtype=np.float32)
+
+    if workers == 1:
+        _init_build_worker(forest, numeric, regions)
+        results = map(_build_chunk, chunks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_build_worker,
+                                       initargs=(forest, numeric, regions))
+        results = executor.map(_build_chunk, chunks)
+
+    deviation = 0.0
+    try:
+        for chunk, (stored, chunk_deviation) in enumerate(results):
+            cells[chunk * chunk_cells:(chunk + 1) * chunk_cells] = stored
+            deviation = max(deviation, chunk_deviation)
+            if progress is not None:
+                progress(chunk + 1, len(chunks))
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        _worker.clear()
+
+    header = {
+        'classes': [str(c) for c in compiled.classes_],
+        'categorical': [{'column': column, 'categories': [str(c) for c in table]}
+                        for column, table in zip(compiled.categorical_columns, compiled.categorical_tables)],
+        'numeric': [{'column': d['column'], 'thresholds': d['thresholds'].tolist(),
+                     'coordinate': d['coordinate'].tolist()} for d in numeric],
+        'shape': category_sizes + numeric_sizes,
+        'fingerprint': forest_fingerprint(compiled),
+        'verification': {'cells': len(cells), 'max_abs_diff': deviation},
+    }
+    return header, cells
+
+
+def _aligned(position):
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_lookup_table(header, cells, filepath, metadata=None):
+    """Write a lookup table file (atomically replaces filepath)"""
+    header = dict(header, metadata=metadata or {})
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    data_start = _aligned(_PREFIX.size + len(header_bytes))
+    header_bytes = header_bytes.ljust(data_start - _PREFIX.size, b' ')
+
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, LOOKUP_VERSION, 0, len(header_bytes)))
+        f.write(header_bytes)
+        np.ascontiguousarray(cells, dtype='<f4').tofile(f)
+    os.replace(tmp_path, filepath)
+
+
+def load_lookup_table(filepath, fallback):
+    """Open a lookup table (memory-mapped) in front of the CompiledForest it was built from"""
+    with open(filepath, 'rb') as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) != _PREFIX.size:
+            raise ValueError(f"{filepath} is not a lookup table (file too short)")
+        magic, version, _, header_length = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} is not a lookup table")
+        if version != LOOKUP_VERSION:
+            raise ValueError(f"Lookup table version {version} is not supported (expected {LOOKUP_VERSION}), rebuild it with build_lookup_table.py")
+        header = json.loads(f.read(header_length).decode('utf-8'))
+
+    if header['fingerprint'] != forest_fingerprint(fallback):
+        raise ValueError(f"Lookup table {filepath} was built for another model, rebuild it with build_lookup_table.py")
+
+    n_cells = int(np.prod(header['shape']))
+    data_start = _PREFIX.size + header_length
+    if os.path.getsize(filepath) - data_start < 4 * n_cells:
+        raise ValueError(f"Lookup table {filepath} is truncated")
+    cells = np.memmap(filepath, dtype='<f4', mode='r', offset=data_start, shape=(n_cells,))
+    return GridLookupModel(header, cells, fallback)
+
+
+class GridLookupModel:
+    """Answer form inputs from a lookup table, other rows (off-grid values, unknown categories) from the forest.
+
+    Exposes the parts of the CompiledForest interface PredictionService uses.
+    """
+
+    def __init__(self, header, cells, fallback):
+        self.header = header
+        self.cells = cells
+        self.fallback = fallback
+        self.classes_ = np.asarray(header['classes'], dtype=object)
+        self.normalizes_input = fallback.normalizes_input
+        self.metadata = header.get('metadata', {})
+        self.hits = 0
+        self.misses = 0
+
+        self._numeric = [(d['column'], np.asarray(d['thresholds'], dtype=np.float64),
+                          np.asarray(d['coordinate'], dtype=np.int64)) for d in header['numeric']]
+        self._categorical = [(d['column'], {c: code for code, c in enumerate(d['categories'])})
+                             for d in header['categorical']]
+        shape = header['shape']
+        self._strides = np.array([int(np.prod(shape[i + 1:])) for i in range(len(shape))], dtype=np.int64)
+
+    def cell_index(self, X):
+        """Table position of each raw input row, and whether the row is on the grid"""
+        index = np.zeros(len(X), dtype=np.int64)
+        hit = np.ones(len(X), dtype=bool)
+        dimension = 0
+        for column, categories in self._categorical:
+            codes = np.fromiter((categories.get(value, -1) for value in X[column].tolist()), dtype=np.int64, count=len(X))
+            hit &= codes >= 0
+            index += np.maximum(codes, 0) * self._strides[dimension]
+            dimension += 1
+        for column, thresholds, coordinate in self._numeric:
+            design = self.fallback._numeric_values(X[column]).astype(np.float32)
+            coords = coordinate[interval_codes(thresholds, design)]
+            hit &= (coords >= 0) & ~np.isnan(design)
+            index += np.maximum(coords, 0) * self._strides[dimension]
+            dimension += 1
+        return index, hit
+
+    def predict_proba(self, X):
+        """Class probabilities for a DataFrame of raw input rows"""
+        index, hit = self.cell_index(X)
+        proba = np.empty((len(X), 2), dtype=np.float64)
+        proba[hit, 0] = self.cells[index[hit]]
+        proba[hit, 1] = 1.0 - proba[hit, 0]
+        if not hit.all():
+            proba[~hit] = self.fallback.predict_proba(X[~hit])
+        self.hits += int(hit.sum())
+        self.misses += len(X) - int(hit.sum())
+        return proba
+
+    def predict(self, X):
+        """Predict class labels for a DataFrame of raw input rows"""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def random_form_inputs(header, rows, seed=0, grid=FORM_NUMERIC_GRID):
+    """Raw survey frame of random form inputs (every value the sliders and select boxes offer)"""
+    rng = np.random.default_rng(seed)
+    frame = {d['column']: rng.choice(grid[d['column']], rows) for d in header['numeric']}
+    for d in header['categorical']:
+        frame[d['column']] = rng.choice(d['categories'], rows)
+    return pd.DataFrame(frame)
+
+
+def verify_lookup_table(lookup, model, rows=100_000, seed=0):
+    """Compare the table with the live model on random form inputs; returns the agreement statistics.
+
+    Labels must be identical and probabilities equal up to the float32 rounding of the table.
+    """
+    X = random_form_inputs(lookup.header, rows, seed)
+    _, hit = lookup.cell_index(X)
+    expected = model.predict_proba(X)
+    actual = lookup.predict_proba(X)
+    return {
+        'rows': rows,
+        'off_grid': int((~hit).sum()),
+        'label_mismatches': int((np.argmax(expected, axis=1) != np.argmax(actual, axis=1)).sum()),
+        'max_abs_diff': float(np.abs(expected - actual).max()) if rows else 0.0,
+    }
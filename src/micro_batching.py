@@ -0,0 +1,198 @@
+import asyncio
+import threading
+import time
+
+# Defaults: small enough that a lone request barely waits, large enough to coalesce a burst
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_WAIT_MS = 2.0
+
+
+class AsyncMicroBatcher:
+    """Coalesce concurrent scoring calls of an asyncio server into one batched call.
+
+    submit(items) queues a list of inputs and waits for its share of the result.
+    A collector task takes the first waiting submission, keeps accepting more
+    for at most max_wait_ms or until max_batch_size inputs are gathered, then
+    calls predict_many(all_inputs) once in a worker thread (the event loop keeps
+    accepting requests meanwhile) and hands each caller its slice. predict_many
+    must return a sequence aligned with its input list. A request arriving
+    alone after a batch of one does not wait: waiting only pays off when other
+    callers are active.
+    """
+
+    def __init__(self, predict_many, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.predict_many = predict_many
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.items = 0
+        self._last_requests = 0
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, items):
+        """Results for items, computed together with whatever else arrives meanwhile"""
+        if self._task is None:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((list(items), future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + (self.max_wait if self._last_requests > 1 else 0)
+            while size < self.max_batch_size:
+                if not self._queue.empty():
+                    entry = self._queue.get_nowait()
+                else:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        entry = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                pending.append(entry)
+                size += len(entry[0])
+            self._last_requests = len(pending)
+
+            batch = [item for items, _ in pending for item in items]
+            try:
+                results = await loop.run_in_executor(None, self.predict_many, batch)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            start = 0
+            for items, future in pending:
+                if not future.done():  # caller may have gone away
+                    future.set_result(results[start:start + len(items)])
+                start += len(items)
+
+
+class _Slot:
+    """One caller's submission and, once scored, its share of the result"""
+    __slots__ = ('items', 'done', 'result', 'error', 'promoted')
+
+    def __init__(self, items):
+        self.items = items
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.promoted = False
+
+
+class MicroBatcher:
+    """Thread-safe counterpart of AsyncMicroBatcher for threaded callers (Streamlit sessions).
+
+    There is no background thread: the first caller to find the queue idle
+    becomes the leader, waits up to max_wait_ms for other callers to queue
+    their inputs (less if max_batch_size is reached), scores everything with
+    one predict_many call and wakes the others with their slices. Callers that
+    arrive while a batch is being scored queue up, and the oldest of them leads
+    the next batch. As in the async version, a lone caller after a batch of one
+    does not wait.
+    """
+
+    def __init__(self, predict_many, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.predict_many = predict_many
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.items = 0
+        self._cond = threading.Condition()
+        self._pending = []
+        self._pending_size = 0
+        self._leading = False
+        self._last_requests = 0
+
+    def submit(self, items):
+        """Result for items, computed together with whatever other callers submit meanwhile"""
+        slot = _Slot(list(items))
+        with self._cond:
+            self._pending.append(slot)
+            self._pending_size += len(slot.items)
+            if self._pending_size >= self.max_batch_size:
+                self._cond.notify_all()
+            lead = not self._leading
+            self._leading = True
+
+        if not lead:
+            slot.done.wait()
+            if slot.promoted:
+                slot.done.clear()
+                self._lead()
+        else:
+            self._lead()
+
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def _take_batch(self):
+        """Whole submissions from the front of the queue, up to max_batch_size inputs (at least one)"""
+        wait = self.max_wait if self._last_requests > 1 else 0
+        deadline = time.monotonic() + wait
+        while self._pending_size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._cond.wait(remaining)
+
+        taken, size = [], 0
+        while self._pending and (not taken or size + len(self._pending[0].items) <= self.max_batch_size):
+            slot = self._pending.pop(0)
+            taken.append(slot)
+            size += len(slot.items)
+        self._pending_size -= size
+        self._last_requests = len(taken)
+        return taken
+
+    def _lead(self):
+        with self._cond:
+            taken = self._take_batch()
+
+        batch = [item for slot in taken for item in slot.items]
+        try:
+            results = self.predict_many(batch)
+        except Exception as e:
+            for slot in taken:
+                slot.error = e
+        else:
+            start = 0
+            for slot in taken:
+                slot.result = results[start:start + len(slot.items)]
+                start += len(slot.items)
+
+        with self._cond:
+            self.batches += 1
+            self.items += len(batch)
+            for slot in taken:
+                slot.done.set()
+            # Hand the queue over to the oldest waiting caller
+            if self._pending:
+                successor = self._pending[0]
+                successor.promoted = True
+                successor.done.set()
+            else:
+                self._leading = False
@@ -0,0 +1,155 @@
+# Versioned binary bundle for the compiled Random Forest.
+#
+# Layout (little endian):
+#   b'RFBUNDLE' | uint32 format version | uint32 reserved | uint64 header length
+#   header JSON (column layout, class names, array table, payload checksum, metadata)
+#   64-byte aligned raw arrays (node arrays, thresholds, leaf values, stats, ...)
+#
+# The arrays are opened with np.memmap in read-only mode, so every worker process
+# on a host shares the same page-cache pages, and loading needs only NumPy and
+# pandas (no sklearn, no pickle).
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+
+from .inference import CompiledForest
+
+MAGIC = b'RFBUNDLE'
+BUNDLE_VERSION = 1
+ALIGNMENT = 64
+
+_PREFIX = struct.Struct('<8sIIQ')
+
+# CompiledForest array attributes stored in the payload, with their on-disk dtype
+_ARRAYS = {
+    'feature_importances': ('feature_importances_', '<f8'),
+    'numeric_index': ('numeric_index', '<i8'),
+    'categorical_offsets': ('categorical_offsets', '<i8'),
+    'normalize_mean': ('normalize_mean', '<f8'),
+    'normalize_std': ('normalize_std', '<f8'),
+    'feature': ('feature', '<i8'),
+    'threshold': ('threshold', '<f8'),
+    'children': ('children', '<i8'),
+    'missing_go_to_left': ('missing_go_to_left', '|b1'),
+    'value': ('value', '<f8'),
+    'roots': ('roots', '<i8'),
+}
+
+
+def _aligned(position):
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def export_bundle(compiled, filepath, metadata=None):
+    """Write a CompiledForest as a memory-mappable bundle (atomically replaces filepath)"""
+    arrays = {name: np.ascontiguousarray(getattr(compiled, attr), dtype=dtype)
+              for name, (attr, dtype) in _ARRAYS.items()}
+
+    # Lay the arrays out relative to the start of the payload
+    table = {}
+    position = 0
+    for name, array in arrays.items():
+        position = _aligned(position)
+        table[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': position}
+        position += array.nbytes
+    payload = bytearray(position)
+    for name, array in arrays.items():
+        start = table[name]['offset']
+        payload[start:start + array.nbytes] = array.tobytes()
+
+    header = {
+        'model': {
+            'classes': [str(c) for c in compiled.classes_],
+            'feature_names_out': [str(f) for f in compiled.feature_names_out_],
+            'numeric_columns': compiled.numeric_columns,
+            'categorical_columns': compiled.categorical_columns,
+            'categorical_tables': [[str(c) for c in cats] for cats in compiled.categorical_tables],
+            'normalized_columns': compiled.normalized_columns,
+            'ipk_column': compiled.ipk_column,
+            'max_depth': compiled.max_depth,
+        },
+        'arrays': table,
+        'payload_sha256': hashlib.sha256(payload).hexdigest(),
+        'metadata': metadata or {},
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    data_start = _aligned(_PREFIX.size + len(header_bytes))
+    header_bytes = header_bytes.ljust(data_start - _PREFIX.size, b' ')
+
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, BUNDLE_VERSION, 0, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(payload)
+    os.replace(tmp_path, filepath)
+
+
+def read_bundle_header(filepath):
+    """Return (header dict, payload offset), rejecting foreign files and other versions"""
+    with open(filepath, 'rb') as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) != _PREFIX.size:
+            raise ValueError(f"{filepath} is not a model bundle (file too short)")
+        magic, version, _, header_length = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} is not a model bundle")
+        if version != BUNDLE_VERSION:
+            raise ValueError(f"Model bundle version {version} is not supported (expected {BUNDLE_VERSION}), re-export it with save_model.py")
+        header = json.loads(f.read(header_length).decode('utf-8'))
+
+    return header, _PREFIX.size + header_length
+
+
+def load_bundle(filepath, verify=True):
+    """Open a bundle as a CompiledForest whose arrays are read-only memory maps"""
+    header, data_start = read_bundle_header(filepath)
+    payload_size = os.path.getsize(filepath) - data_start
+
+    if verify:
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            f.seek(data_start)
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        if digest.hexdigest() != header['payload_sha256']:
+            raise ValueError(f"Model bundle {filepath} failed its integrity check")
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        shape = tuple(spec['shape'])
+        nbytes = dtype.itemsize * int(np.prod(shape))
+        if spec['offset'] + nbytes > payload_size:
+            raise ValueError(f"Model bundle {filepath} is truncated (array '{name}')")
+        if nbytes == 0:
+            arrays[name] = np.empty(shape, dtype=dtype)
+        else:
+            arrays[name] = np.memmap(filepath, dtype=dtype, mode='r', offset=data_start + spec['offset'], shape=shape)
+
+    model = header['model']
+    compiled = CompiledForest(
+        classes=model['classes'],
+        feature_names_out=model['feature_names_out'],
+        feature_importances=arrays['feature_importances'],
+        numeric_columns=model['numeric_columns'],
+        numeric_index=arrays['numeric_index'],
+        categorical_columns=model['categorical_columns'],
+        categorical_tables=model['categorical_tables'],
+        categorical_offsets=arrays['categorical_offsets'],
+        feature=arrays['feature'],
+        threshold=arrays['threshold'],
+        children=arrays['children'],
+        missing_go_to_left=arrays['missing_go_to_left'],
+        value=arrays['value'],
+        roots=arrays['roots'],
+        max_depth=model['max_depth'],
+        normalized_columns=model['normalized_columns'],
+        normalize_mean=arrays['normalize_mean'],
+        normalize_std=arrays['normalize_std'],
+        ipk_column=model['ipk_column'],
+    )
+    compiled.metadata = header['metadata']
+    return compiled
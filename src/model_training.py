@@ -7,42 +7,38 @@ from sklearn.metrics import accuracy_score, f1_score, confusion_matrix
 import warnings
 warnings.filterwarnings('ignore')
 
-from .data_preprocessing import preprocess_data, get_preprocessing_stats
+from .normalizer import SurveyNormalizer
 
-def train_model(df):
-    """Train the Random Forest model"""
-    # Preprocess data
-    processed_df = preprocess_data(df)
-    
-    # Define features
-    numeric_features = ['Umur', 'Jam Belajar per Hari', 'Jam Tidur per Hari', 'IPK', 'Jumlah Tugas Besar per Minggu']
-    categorical_features = ['Gender', 'Jurusan/Program Studi', 'Frekuensi Olahraga', 'Pemasukan Keluarga', 'Status Hubungan']
-    
-    # Prepare data
-    X = processed_df.drop('Label', axis=1)
-    y = processed_df['Label']
-    
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
-    # Create preprocessor
-    preprocessor = ColumnTransformer(
+MODEL_NUMERIC_FEATURES = ['Umur', 'Jam Belajar per Hari', 'Jam Tidur per Hari', 'IPK', 'Jumlah Tugas Besar per Minggu']
+MODEL_CATEGORICAL_FEATURES = ['Gender', 'Jurusan/Program Studi', 'Frekuensi Olahraga', 'Pemasukan Keluarga', 'Status Hubungan']
+
+# Production settings (search_hyperparameters.py explores alternatives)
+DEFAULT_CLASSIFIER_PARAMS = {'n_estimators': 200, 'max_depth': 4, 'random_state': 42, 'n_jobs': -1}
+
+def build_preprocessor(encoder_params=None):
+    """Numeric passthrough + one-hot encoded categoricals"""
+    return ColumnTransformer(
         transformers=[
-            ('num', 'passthrough', numeric_features),
-            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features)
+            ('num', 'passthrough', MODEL_NUMERIC_FEATURES),
+            ('cat', OneHotEncoder(handle_unknown='ignore', **(encoder_params or {})), MODEL_CATEGORICAL_FEATURES)
         ],
         remainder='passthrough'
     )
+
+def train_model(df, classifier_params=None, encoder_params=None):
+    """Train the Random Forest model"""
+    # Prepare data (raw rows, cleaning and normalization happen inside the pipeline)
+    X = df.drop('Label', axis=1)
+    y = df['Label']
+    
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
     # Create pipeline
     model = Pipeline([
-        ('preprocessor', preprocessor),
-        ('classifier', RandomForestClassifier(
-            n_estimators=200,
-            max_depth=4,
-            random_state=42,
-            n_jobs=-1
-        ))
+        ('normalizer', SurveyNormalizer()),
+        ('preprocessor', build_preprocessor(encoder_params)),
+        ('classifier', RandomForestClassifier(**{**DEFAULT_CLASSIFIER_PARAMS, **(classifier_params or {})}))
     ])
     
     # Train model
@@ -54,7 +50,7 @@ def train_model(df):
     f1 = f1_score(y_test, y_pred, average='weighted')
     cm = confusion_matrix(y_test, y_pred)
     
-    # Get preprocessing stats
-    stats = get_preprocessing_stats(df)
+    # Normalization stats learned while fitting the pipeline
+    stats = model.named_steps['normalizer'].get_stats()
     
     return model, accuracy, f1, cm, X_test, y_test, stats
\ No newline at end of file
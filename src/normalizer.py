@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from .data_preprocessing import clean_ipk_column
+
+NUMERIC_FEATURES = ('Jam Belajar per Hari', 'Jam Tidur per Hari', 'IPK', 'Jumlah Tugas Besar per Minggu')
+
+
+class SurveyNormalizer(BaseEstimator, TransformerMixin):
+    """Clean IPK, coerce numeric columns and apply z-score normalization as one pipeline step.
+
+    Fitting learns the mean/std of the cleaned numeric columns in the same pass
+    that cleans them, so raw survey rows (form input, CSV exports) can be fed
+    straight into the saved pipeline.
+    """
+
+    def __init__(self, numeric_features=NUMERIC_FEATURES, ipk_column='IPK'):
+        self.numeric_features = numeric_features
+        self.ipk_column = ipk_column
+
+    def _clean(self, X):
+        """Copy X with IPK cleaned and numeric columns coerced"""
+        X = X.copy()
+        numeric_features = list(self.numeric_features)
+
+        if self.ipk_column in X.columns:
+            X[self.ipk_column] = clean_ipk_column(X[self.ipk_column])
+        X[numeric_features] = X[numeric_features].apply(pd.to_numeric, errors='coerce')
+
+        return X
+
+    def _normalize(self, X):
+        numeric_features = list(self.numeric_features)
+        X[numeric_features] = (X[numeric_features] - self.mean_) / self.std_
+        return X
+
+    def fit(self, X, y=None):
+        self.fit_transform(X, y)
+        return self
+
+    def fit_transform(self, X, y=None):
+        """Clean once, learn the statistics and normalize with them"""
+        X = self._clean(X)
+        numeric_features = list(self.numeric_features)
+
+        self.mean_ = X[numeric_features].mean()
+        self.std_ = X[numeric_features].std()
+        self.n_samples_seen_ = X[numeric_features].count()
+
+        return self._normalize(X)
+
+    def partial_fit(self, X, y=None):
+        """Fold new rows into mean_/std_ (Chan et al. parallel variance update, per column)"""
+        if not hasattr(self, 'mean_'):
+            return self.fit(X, y)
+        if not hasattr(self, 'n_samples_seen_'):
+            raise ValueError("Normalizer was fitted without n_samples_seen_, retrain it with save_model.py first")
+
+        X = self._clean(X)
+        numeric_features = list(self.numeric_features)
+
+        n_a, mean_a = self.n_samples_seen_, self.mean_
+        m2_a = self.std_ ** 2 * (n_a - 1)
+        n_b = X[numeric_features].count()
+        mean_b = X[numeric_features].mean().fillna(mean_a)
+        m2_b = (X[numeric_features].var() * (n_b - 1)).fillna(0.0)
+
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        self.mean_ = mean_a + delta * n_b / n
+        self.std_ = np.sqrt((m2_a + m2_b + delta ** 2 * n_a * n_b / n) / (n - 1))
+        self.n_samples_seen_ = n
+
+        return self
+
+    def transform(self, X):
+        return self._normalize(self._clean(X))
+
+    def get_stats(self):
+        """Learned statistics in the preprocessing_stats.pkl format"""
+        return {
+            'mean': self.mean_.to_dict(),
+            'std': self.std_.to_dict()
+        }
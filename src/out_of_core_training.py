@@ -0,0 +1,256 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+from joblib import effective_n_jobs
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+from .data_preprocessing import RAW_CSV_DTYPES, columnar_is_fresh, columnar_path_for
+from .evaluation import holdout_segment, merge_dataset_summaries, summarize_dataset
+from .model_training import DEFAULT_CLASSIFIER_PARAMS, MODEL_CATEGORICAL_FEATURES, build_preprocessor
+from .normalizer import SurveyNormalizer
+
+# Working memory per row, measured on the survey schema (pandas 3 / sklearn 1.9) with ~30% headroom:
+# a raw chunk while it is parsed, cleaned, normalized and one-hot encoded
+CHUNK_BYTES_PER_ROW = 2_000
+# a bootstrap sample held for a tree batch (float32 design row, labels, sklearn's y and indices)
+SAMPLE_BYTES_PER_ROW = 200
+# per tree fitted in parallel (sample weights and the tree builder's index/value buffers)
+TREE_BYTES_PER_ROW = 60
+
+# Share of the budget left after start-up that chunks and tree batch samples may use
+CHUNK_SHARE = 0.25
+SAMPLE_SHARE = 0.5
+
+MIN_CHUNK_ROWS = 1_000
+MIN_SAMPLE_ROWS = 10_000
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (None where /proc is not available)"""
+    return _proc_status_mb('VmRSS')
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = _proc_status_mb('VmHWM')
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1024 / 1024
+
+
+def _proc_status_mb(key):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(key):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def plan_memory(budget_mb, n_jobs=1, baseline_mb=None):
+    """Rows per read chunk and per tree batch sample expected to keep peak RSS under budget_mb (an estimate, not enforced)"""
+    baseline_mb = current_rss_mb() if baseline_mb is None else baseline_mb
+    available = (budget_mb - (baseline_mb or 0.0)) * 1024 * 1024
+    chunk_rows = int(available * CHUNK_SHARE / CHUNK_BYTES_PER_ROW)
+    sample_rows = int(available * SAMPLE_SHARE / (SAMPLE_BYTES_PER_ROW + effective_n_jobs(n_jobs) * TREE_BYTES_PER_ROW))
+
+    if chunk_rows < MIN_CHUNK_ROWS or sample_rows < MIN_SAMPLE_ROWS:
+        raise ValueError(f"A memory budget of {budget_mb} MB leaves too little room after start-up "
+                         f"({baseline_mb:.0f} MB in use), raise it")
+    return chunk_rows, sample_rows
+
+
+def iter_chunks(dataset_path, chunk_rows):
+    """Raw frames of at most chunk_rows rows, from the Parquet copy when it is up to date"""
+    parquet_path = columnar_path_for(dataset_path)
+    if columnar_is_fresh(parquet_path, dataset_path):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(parquet_path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+        return
+
+    yield from pd.read_csv(dataset_path, sep=';', chunksize=chunk_rows, dtype=RAW_CSV_DTYPES)
+
+
+def _split_masks(dataset_path, chunk_rows, test_size, random_state):
+    """(chunk, holdout mask) pairs; the same rows are held out on every pass"""
+    rng = np.random.default_rng(random_state)
+    for chunk in iter_chunks(dataset_path, chunk_rows):
+        yield chunk, rng.random(len(chunk)) < test_size
+
+
+def _fit_preprocessor(example, categories, encoder_params):
+    """ColumnTransformer fitted as on the full training set: every category seen in any chunk"""
+    n_rows = max(len(values) for values in categories.values())
+    frame = example.iloc[np.zeros(n_rows, dtype=np.intp)].reset_index(drop=True)
+    for column, values in categories.items():
+        frame[column] = np.resize(np.array(values, dtype=object), n_rows)
+    return build_preprocessor(encoder_params).fit(frame)
+
+
+def _append_rows(path, array):
+    with open(path, 'ab') as f:
+        np.ascontiguousarray(array).tofile(f)
+
+
+def _read_rows(path, n_features, dtype, start, count):
+    with open(path, 'rb') as f:
+        f.seek(start * n_features * np.dtype(dtype).itemsize)
+        return np.fromfile(f, dtype=dtype, count=count * n_features).reshape(count, n_features)
+
+
+def _bootstrap_sample(work, n_rows, n_features, sample_rows, chunk_rows, rng):
+    """sample_rows rows drawn with replacement from the on-disk design matrix, read block by block"""
+    index = np.sort(rng.integers(0, n_rows, sample_rows))
+    X = np.empty((sample_rows, n_features), dtype=np.float32)
+    y = np.empty(sample_rows, dtype=np.int8)
+    filled = 0
+    for start in range(0, n_rows, chunk_rows):
+        count = min(chunk_rows, n_rows - start)
+        stop = np.searchsorted(index, start + count, side='left')
+        if stop == filled:
+            continue
+        block = _read_rows(work['X_train'], n_features, np.float32, start, count)
+        labels = _read_rows(work['y_train'], 1, np.int8, start, count).ravel()
+        X[filled:stop] = block[index[filled:stop] - start]
+        y[filled:stop] = labels[index[filled:stop] - start]
+        filled = stop
+    return X, y
+
+
+def _scores_from_confusion(cm):
+    """Accuracy and support-weighted F1 from a confusion matrix (rows = true class)"""
+    tp = np.diag(cm).astype(np.float64)
+    support = cm.sum(axis=1)
+    denominator = support + cm.sum(axis=0)
+    f1 = np.divide(2 * tp, denominator, out=np.zeros_like(tp), where=denominator > 0)
+    return tp.sum() / max(cm.sum(), 1), float(f1 @ support / max(support.sum(), 1))
+
+
+def train_model_out_of_core(dataset_path, memory_budget_mb=1024, classifier_params=None, encoder_params=None,
+                            trees_per_batch=25, sample_rows=None, test_size=0.2, random_state=42, work_dir=None):
+    """Train the production pipeline on a dataset larger than RAM, sized to keep peak RSS under a budget.
+
+    The budget is best effort, not a hard limit: chunk and sample sizes are
+    planned from measured bytes per row (CHUNK_BYTES_PER_ROW and friends),
+    nothing stops the process if RSS goes over, and the peak is only
+    reported. Very wide design rows (many categories) need a larger budget or
+    an external limit (cgroup, ulimit).
+
+    The data is read in chunks four times: once to learn the normalization
+    statistics (SurveyNormalizer.partial_fit), the categories and the
+    classes; once to write the normalized, one-hot encoded training and
+    holdout rows to float32 files in work_dir; once per tree batch, to draw
+    a bootstrap sample of the training rows from disk and grow the forest by
+    trees_per_batch trees on it (warm_start); and once to score the holdout.
+    Chunk and sample sizes follow from the budget (see plan_memory); with
+    the full training set fitting in a sample, every batch sees as many rows
+    as train_model would. The holdout is a random test_size share of rows,
+    not train_model's train_test_split. Returns the same pipeline layout as
+    train_model (usable by the app, compile_pipeline and update_model) with
+    accuracy, F1, confusion matrix, normalization stats and a report of rows,
+    batches, peak RSS and the holdout (see evaluation.holdout_rows).
+    """
+    params = {**DEFAULT_CLASSIFIER_PARAMS, **(classifier_params or {})}
+    chunk_rows, budget_sample_rows = plan_memory(memory_budget_mb, params.get('n_jobs'))
+    sample_rows = min(sample_rows or budget_sample_rows, budget_sample_rows)
+
+    # Pass 1: normalization statistics, categories, classes
+    normalizer = SurveyNormalizer()
+    categories = {column: set() for column in MODEL_CATEGORICAL_FEATURES}
+    classes = set()
+    summary, example = None, None
+    n_train = n_test = 0
+    for chunk, test in _split_masks(dataset_path, chunk_rows, test_size, random_state):
+        chunk_summary = summarize_dataset(chunk)
+        summary = chunk_summary if summary is None else merge_dataset_summaries(summary, chunk_summary)
+        train = chunk[~test]
+        if len(train):
+            normalizer.partial_fit(train.drop('Label', axis=1))
+            example = train.drop('Label', axis=1).iloc[:1] if example is None else example
+        for column in MODEL_CATEGORICAL_FEATURES:
+            categories[column].update(train[column].dropna())
+        classes.update(train['Label'])
+        n_train += len(train)
+        n_test += int(test.sum())
+
+    if example is None:
+        raise ValueError(f"{dataset_path} has no training rows")
+    classes = np.array(sorted(classes), dtype=object)
+    preprocessor = _fit_preprocessor(example, {column: sorted(values) for column, values in categories.items()},
+                                     encoder_params)
+    n_features = len(preprocessor.get_feature_names_out())
+
+    with tempfile.TemporaryDirectory(prefix='oocore_', dir=work_dir) as directory:
+        work = {name: os.path.join(directory, f'{name}.bin') for name in ('X_train', 'y_train', 'X_test', 'y_test')}
+
+        # Pass 2: model-ready float32 rows on disk
+        for chunk, test in _split_masks(dataset_path, chunk_rows, test_size, random_state):
+            X = chunk.drop('Label', axis=1)
+            design = preprocessor.transform(normalizer.transform(X))
+            # Many categories make the one-hot block sparse; one chunk at a time is dense enough for RAM
+            if hasattr(design, 'toarray'):
+                design = design.toarray()
+            design = design.astype(np.float32)
+            labels = np.searchsorted(classes, chunk['Label'].to_numpy(dtype=object)).astype(np.int8)
+            _append_rows(work['X_train'], design[~test])
+            _append_rows(work['y_train'], labels[~test])
+            _append_rows(work['X_test'], design[test])
+            _append_rows(work['y_test'], labels[test])
+            del chunk, X, design
+
+        # Tree batches on bootstrap samples drawn from disk
+        forest = RandomForestClassifier(**{**params, 'warm_start': True})
+        rng = np.random.default_rng([random_state, 1])
+        batch_rows = min(sample_rows, n_train)
+        n_batches = 0
+        for grown in range(0, params['n_estimators'], trees_per_batch):
+            X, y = _bootstrap_sample(work, n_train, n_features, batch_rows, chunk_rows, rng)
+            if len(np.unique(y)) < len(classes):
+                raise ValueError(f"A bootstrap sample of {batch_rows:,} rows missed a class, raise the memory budget")
+            forest.set_params(n_estimators=min(grown + trees_per_batch, params['n_estimators']))
+            forest.fit(X, classes[y])
+            n_batches += 1
+            del X, y
+        forest.set_params(warm_start=False)
+
+        # Holdout metrics, block by block
+        cm = np.zeros((len(classes), len(classes)), dtype=np.int64)
+        for start in range(0, n_test, chunk_rows):
+            count = min(chunk_rows, n_test - start)
+            X = _read_rows(work['X_test'], n_features, np.float32, start, count)
+            y = _read_rows(work['y_test'], 1, np.int8, start, count).ravel()
+            predicted = np.searchsorted(classes, forest.predict(X))
+            np.add.at(cm, (y, predicted), 1)
+
+    model = Pipeline([
+        ('normalizer', normalizer),
+        ('preprocessor', preprocessor),
+        ('classifier', forest)
+    ])
+    accuracy, f1 = _scores_from_confusion(cm)
+    report = {
+        'rows': n_train + n_test,
+        'train_rows': n_train,
+        'test_rows': n_test,
+        'chunk_rows': chunk_rows,
+        'sample_rows': batch_rows,
+        'tree_batches': n_batches,
+        'memory_budget_mb': memory_budget_mb,
+        'peak_rss_mb': peak_rss_mb(),
+        'dataset': summary,
+        # Same rows as _split_masks: one uniform draw per row from a single seeded stream
+        'holdout': [holdout_segment(0, n_train + n_test, 'random', test_size, random_state)],
+    }
+    return model, accuracy, f1, cm, normalizer.get_stats(), report
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .prediction_service import FORM_CATEGORICAL_FIELDS, FORM_NUMERIC_FIELDS, PredictionResult
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_TTL_SECONDS = 3600.0
+
+def canonical_entry(entry):
+    """Hashable form of a prediction form entry: numbers as float (3 == 3.0), categories as str"""
+    return (tuple(float(entry[field]) for field in FORM_NUMERIC_FIELDS)
+            + tuple(str(entry[field]) for field in FORM_CATEGORICAL_FIELDS))
+
+class PredictionCache:
+    """Thread-safe LRU cache with a time-to-live, counting hits, misses, expirations and evictions"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                value, stored_at = item
+                if self.ttl is None or time.monotonic() - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses, 'expired': self.expired,
+                    'evictions': self.evictions, 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+class CachedPredictionService:
+    """Answer repeated profiles from a PredictionCache and score only the rest.
+
+    Keys are (model_version, canonical entry), so results of another model are
+    never returned even if the cache is shared; misses of one batch (duplicates
+    included) are scored with a single call to the wrapped service.
+    """
+
+    def __init__(self, service, cache, model_version):
+        self.service = service
+        self.cache = cache
+        self.model_version = model_version
+
+    def predict_batch(self, data_batch):
+        keys = [(self.model_version, canonical_entry(entry)) for entry in data_batch]
+        rows = [self.cache.get(key) for key in keys]
+
+        missing = {}
+        for index, row in enumerate(rows):
+            if row is None:
+                missing.setdefault(keys[index], index)
+        if missing:
+            scored = self.service.predict_batch([data_batch[index] for index in missing.values()])
+            computed = {}
+            for i, key in enumerate(missing):
+                computed[key] = (scored.labels[i], scored.proba_sehat[i], scored.proba_stres[i])
+                self.cache.put(key, computed[key])
+            rows = [row if row is not None else computed[key] for row, key in zip(rows, keys)]
+
+        labels, proba_sehat, proba_stres = zip(*rows)
+        return PredictionResult(labels=np.array(labels, dtype=object),
+                                proba_sehat=np.array(proba_sehat, dtype=np.float64),
+                                proba_stres=np.array(proba_stres, dtype=np.float64))
+
+    def __getattr__(self, name):
+        return getattr(self.service, name)
@@ -0,0 +1,137 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import INSTRUMENTS, shared, stage
+from .micro_batching import MicroBatcher
+
+# Prediction form fields the model sees (the entries built by app/pages/prediction.py also carry "Nama")
+FORM_NUMERIC_FIELDS = ('Umur', 'IPK', 'Jam Belajar', 'Jam Tidur', 'Jumlah Tugas')
+FORM_CATEGORICAL_FIELDS = ('Gender', 'Jurusan/Program Studi', 'Status Hubungan', 'Pemasukan Keluarga', 'Olahraga')
+
+
+@dataclass
+class PredictionResult:
+    """Struct-of-arrays prediction output, one entry per input row"""
+    labels: np.ndarray
+    proba_sehat: np.ndarray
+    proba_stres: np.ndarray
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, index):
+        """Rows of the result (e.g. one caller's slice of a shared batch)"""
+        return PredictionResult(self.labels[index], self.proba_sehat[index], self.proba_stres[index])
+
+
+def _normalizes_input(model):
+    """Whether the model cleans and normalizes raw rows itself"""
+    if hasattr(model, 'named_steps'):
+        return 'normalizer' in model.named_steps
+    return getattr(model, 'normalizes_input', False)
+
+
+class PredictionService:
+    """Score a whole batch of form entries with a single forest evaluation"""
+
+    def __init__(self, model):
+        if not _normalizes_input(model):
+            raise ValueError("Model expects pre-normalized input, retrain it with save_model.py")
+
+        self.model = model
+        self.classes = np.asarray(model.classes_, dtype=object)
+
+        # Resolve class positions once instead of per row
+        classes = list(self.classes)
+        self.sehat_idx = classes.index("Sehat")
+        self.stres_idx = classes.index("Risiko Stres")
+
+    def build_input_frame(self, data_batch):
+        """Convert prediction form entries into the raw survey frame the model expects"""
+        with stage("build_input_frame"):
+            return self._build_input_frame(data_batch)
+
+    def _build_input_frame(self, data_batch):
+        batch = pd.DataFrame(data_batch)
+
+        input_df = pd.DataFrame({
+            "Gender": batch["Gender"],
+            "Umur": batch["Umur"],
+            "Jurusan/Program Studi": batch["Jurusan/Program Studi"],
+            "Jam Belajar per Hari": batch["Jam Belajar"],
+            "Jam Tidur per Hari": batch["Jam Tidur"],
+            # Form/API IPK is a number on the 0-4 scale, never survey text to be rescaled
+            "IPK": pd.to_numeric(batch["IPK"], errors='coerce'),
+            "Jumlah Tugas Besar per Minggu": batch["Jumlah Tugas"],
+            "Frekuensi Olahraga": batch["Olahraga"],
+            "Pemasukan Keluarga": batch["Pemasukan Keluarga"],
+            "Status Hubungan": batch["Status Hubungan"]
+        })
+
+        return input_df
+
+    def _predict_proba(self, input_df):
+        """model.predict_proba, split into preprocessing and forest stages when instrumented"""
+        if not INSTRUMENTS.enabled:
+            return self.model.predict_proba(input_df)
+
+        if hasattr(self.model, 'named_steps'):
+            with stage("model.transform"):
+                matrix = self.model[:-1].transform(input_df)
+            with stage("model.forest"):
+                return self.model[-1].predict_proba(matrix)
+
+        if hasattr(self.model, 'predict_proba_codes'):
+            with stage("model.encode"):
+                codes = self.model.encode(input_df)
+            with stage("model.forest"):
+                return self.model.predict_proba_codes(codes)
+
+        if not hasattr(self.model, 'predict_proba_matrix'):
+            with stage("model.lookup"):
+                return self.model.predict_proba(input_df)
+
+        with stage("model.transform"):
+            matrix = self.model.transform(input_df)
+        with stage("model.forest"):
+            return self.model.predict_proba_matrix(matrix)
+
+    def predict_frame(self, input_df):
+        """Run the forest once over a model-ready frame"""
+        proba = self._predict_proba(input_df)
+        labels = self.classes.take(np.argmax(proba, axis=1))
+
+        return PredictionResult(
+            labels=labels,
+            proba_sehat=proba[:, self.sehat_idx],
+            proba_stres=proba[:, self.stres_idx],
+        )
+
+    def predict_batch(self, data_batch):
+        """Predict every entry of a prediction form batch in one call"""
+        return self.predict_frame(self.build_input_frame(data_batch))
+
+
+class QueuedPredictionService:
+    """PredictionService front shared by all sessions: concurrent predict_batch calls become one forest call"""
+
+    def __init__(self, service, max_batch_size=64, max_wait_ms=3.0):
+        self.service = service
+        self.batcher = MicroBatcher(self._predict_shared, max_batch_size, max_wait_ms)
+
+    def _predict_shared(self, traced_entries):
+        """Score the batch once; its stages go to the trace of every session that has entries in it
+        (the batch runs in the leading session's thread, so they would otherwise all land in its trace)"""
+        traces = [trace for trace, _ in traced_entries]
+        with shared(traces):
+            return self.service.predict_batch([entry for _, entry in traced_entries])
+
+    def predict_batch(self, data_batch):
+        """Same result as PredictionService.predict_batch, scored together with other sessions' entries"""
+        trace = INSTRUMENTS.current_trace()
+        return self.batcher.submit([(trace, entry) for entry in data_batch])
+
+    def __getattr__(self, name):
+        return getattr(self.service, name)
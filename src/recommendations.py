@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .data_preprocessing import clean_ipk_column
+
+RULE_NUMERIC_COLUMNS = ('Jam Belajar per Hari', 'Jam Tidur per Hari', 'IPK', 'Jumlah Tugas Besar per Minggu')
+
+# Separator of the codes in one row's code string (CSV output, API)
+CODE_SEPARATOR = '|'
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One recommendation: fires for rows predicted as `label` whose `column` satisfies `op value`.
+
+    `message` is a str.format template over the row's survey columns.
+    """
+    code: str
+    label: str
+    column: str
+    op: str
+    value: object
+    message: str
+
+
+# Personal recommendations for "Risiko Stres" rows, positive tips for "Sehat" rows (in display order)
+RULES = (
+    Rule('TIDUR_KURANG', 'Risiko Stres', 'Jam Tidur per Hari', '<', 6,
+         "⏰ **Tingkatkan jam tidur** dari {Jam Tidur per Hari:g} jam menjadi 7-9 jam per hari untuk pemulihan optimal"),
+    Rule('TIDUR_BERLEBIH', 'Risiko Stres', 'Jam Tidur per Hari', '>', 9,
+         "⏰ **Kurangi jam tidur** dari {Jam Tidur per Hari:g} jam menjadi 7-9 jam (tidur berlebihan bisa menurunkan produktivitas)"),
+    Rule('BELAJAR_BERLEBIH', 'Risiko Stres', 'Jam Belajar per Hari', '>', 6,
+         "📚 **Atur ulang waktu belajar** - {Jam Belajar per Hari:g} jam terlalu lama. Fokus pada kualitas, bukan kuantitas (4-5 jam efektif lebih baik)"),
+    Rule('BELAJAR_KURANG', 'Risiko Stres', 'Jam Belajar per Hari', '<', 2,
+         "📚 **Tambah waktu belajar** dari {Jam Belajar per Hari:g} jam menjadi minimal 3-4 jam per hari"),
+    Rule('OLAHRAGA_JARANG', 'Risiko Stres', 'Frekuensi Olahraga', '==', 'Jarang',
+         "🏃 **Mulai olahraga rutin** minimal 3x seminggu (30 menit) untuk mengurangi stres dan meningkatkan fokus"),
+    Rule('IPK_RENDAH', 'Risiko Stres', 'IPK', '<', 2.5,
+         "📈 **Tingkatkan strategi belajar** - IPK {IPK:.2f} perlu perhatian khusus. Pertimbangkan belajar kelompok atau konsultasi dosen"),
+    Rule('TUGAS_TINGGI', 'Risiko Stres', 'Jumlah Tugas Besar per Minggu', '>=', 4,
+         "📝 **Kelola beban tugas** - {Jumlah Tugas Besar per Minggu:g} tugas besar per minggu sangat tinggi. Buat prioritas dan deadline yang realistis"),
+    Rule('HUBUNGAN_SEIMBANG', 'Risiko Stres', 'Status Hubungan', '==', 'Dalam hubungan',
+         "💑 **Balance kehidupan pribadi** - Komunikasikan kebutuhan waktu belajar dengan pasangan"),
+    Rule('TIDUR_IDEAL', 'Sehat', 'Jam Tidur per Hari', 'between', (7, 9),
+         "✅ Pola tidur Anda ({Jam Tidur per Hari:g} jam) sudah ideal!"),
+    Rule('OLAHRAGA_AKTIF', 'Sehat', 'Frekuensi Olahraga', 'in', ('Kadang', 'Sering'),
+         "✅ Kebiasaan olahraga '{Frekuensi Olahraga}' sangat baik!"),
+    Rule('IPK_BAIK', 'Sehat', 'IPK', '>=', 3.0,
+         "✅ IPK {IPK:.2f} menunjukkan performa akademik yang baik!"),
+)
+
+_OPS = {
+    '<': lambda x, v: x < v,
+    '>': lambda x, v: x > v,
+    '>=': lambda x, v: x >= v,
+    '==': lambda x, v: x == v,
+    'in': lambda x, v: np.isin(x, v),
+    'between': lambda x, v: (x >= v[0]) & (x <= v[1]),
+}
+
+
+def _rule_columns(frame, rules):
+    """Column arrays the rules read: numbers as float, categories as (distinct values, codes)"""
+    columns = {}
+    for column in {rule.column for rule in rules}:
+        if column == 'IPK':
+            # Raw survey text ('03.13', '0,188...') is parsed like SurveyNormalizer does;
+            # numbers typed in the form or sent to the API are taken as given
+            columns[column] = clean_ipk_column(frame[column]).to_numpy()
+        elif column in RULE_NUMERIC_COLUMNS:
+            columns[column] = pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype=np.float64)
+        elif isinstance(frame[column].dtype, pd.CategoricalDtype):
+            columns[column] = (frame[column].cat.categories.to_numpy(dtype=str), frame[column].cat.codes.to_numpy())
+        else:
+            codes, uniques = pd.factorize(frame[column])
+            columns[column] = (uniques.to_numpy(dtype=str), codes)
+    return columns
+
+
+def _apply(rule, values):
+    if isinstance(values, tuple):
+        # Categories have few distinct values: test each once, then look the rows up (code -1 = missing)
+        uniques, codes = values
+        return np.append(_OPS[rule.op](uniques, rule.value), False)[codes]
+    return _OPS[rule.op](values, rule.value)
+
+
+def evaluate_rules(frame, labels, rules=RULES):
+    """Boolean matrix (n_rows, n_rules): which rules fire for each row of a raw survey frame.
+
+    Every rule is one NumPy comparison over the whole batch; rows with a
+    missing value simply do not fire the rules on that column.
+    """
+    columns = _rule_columns(frame, rules)
+    label_codes, label_values = pd.factorize(np.asarray(labels, dtype=object))
+    label_index = {label: i for i, label in enumerate(label_values)}
+    label_masks = {label: label_codes == label_index.get(label, -2) for label in {rule.label for rule in rules}}
+
+    fired = np.empty((len(frame), len(rules)), dtype=bool)
+    for j, rule in enumerate(rules):
+        fired[:, j] = _apply(rule, columns[rule.column]) & label_masks[rule.label]
+    return fired
+
+
+def recommendation_codes(fired, rules=RULES):
+    """Code string per row ('TIDUR_KURANG|IPK_RENDAH', '' when nothing fires)"""
+    # Rows share few distinct rule combinations: join each combination once
+    bits = fired.astype(np.int64) @ (np.int64(1) << np.arange(len(rules), dtype=np.int64))
+    combos, inverse = np.unique(bits, return_inverse=True)
+    names = np.array([CODE_SEPARATOR.join(rule.code for j, rule in enumerate(rules) if combo >> j & 1)
+                      for combo in combos.tolist()], dtype=object)
+    return names[inverse]
+
+
+def recommendation_messages(fired_row, values, rules=RULES):
+    """Display texts of the rules fired for one row; values maps survey columns to that row's inputs"""
+    return [rule.message.format_map(values) for rule, on in zip(rules, fired_row) if on]
@@ -0,0 +1,134 @@
+import math
+import os
+import pickle
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from .inference import CompiledForest, compile_pipeline
+from .micro_batching import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, AsyncMicroBatcher
+from .model_bundle import load_bundle
+from .prediction_service import FORM_CATEGORICAL_FIELDS, FORM_NUMERIC_FIELDS, PredictionService
+from .recommendations import RULES, evaluate_rules
+
+DEFAULT_MODEL_PATH = 'models/best_model.rfb'
+
+# Largest batch accepted in one request
+MAX_REQUEST_ROWS = 10_000
+
+
+def load_model(path):
+    """Memory-mapped bundle (.rfb, shared read-only by every worker) or a pickled pipeline compiled once"""
+    if path.endswith('.rfb'):
+        return load_bundle(path)
+    with open(path, 'rb') as f:
+        model = pickle.load(f)
+    return model if isinstance(model, CompiledForest) else compile_pipeline(model)
+
+
+def validate_entry(entry):
+    """Check one JSON entry and coerce its numeric fields; raises ValueError with a readable message"""
+    if not isinstance(entry, dict):
+        raise ValueError("each entry must be a JSON object")
+    missing = [field for field in FORM_NUMERIC_FIELDS + FORM_CATEGORICAL_FIELDS if field not in entry]
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(missing)}")
+
+    clean = {field: entry[field] for field in FORM_CATEGORICAL_FIELDS}
+    for field in FORM_CATEGORICAL_FIELDS:
+        if not isinstance(clean[field], str):
+            raise ValueError(f"'{field}' must be a string")
+    for field in FORM_NUMERIC_FIELDS:
+        value = entry[field]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"'{field}' must be a number")
+        clean[field] = value
+    return clean
+
+
+def score_entries(service, entries):
+    """One forest evaluation for a list of validated entries -> list of result dicts with recommendation codes"""
+    input_df = service.build_input_frame(entries)
+    result = service.predict_frame(input_df)
+    fired = evaluate_rules(input_df, result.labels)
+    return [{'label': str(label), 'proba_sehat': float(sehat), 'proba_stres': float(stres),
+             'recommendations': [rule.code for rule, on in zip(RULES, row) if on]}
+            for label, sehat, stres, row in zip(result.labels, result.proba_sehat, result.proba_stres, fired)]
+
+
+def _error(message, status_code=422):
+    return JSONResponse({'error': message}, status_code=status_code)
+
+
+async def _read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        raise ValueError("body is not valid JSON")
+
+
+def create_app(model_path=None, max_batch_size=None, max_wait_ms=None):
+    """ASGI app scoring prediction-form entries; settings default to the RESIKO_* environment variables.
+
+    Each worker process loads the model once at startup. Concurrent requests
+    are coalesced by an AsyncMicroBatcher into one forest evaluation.
+    """
+    model_path = model_path or os.environ.get('RESIKO_MODEL', DEFAULT_MODEL_PATH)
+    max_batch_size = max_batch_size or int(os.environ.get('RESIKO_MAX_BATCH', DEFAULT_MAX_BATCH_SIZE))
+    max_wait_ms = max_wait_ms if max_wait_ms is not None else float(os.environ.get('RESIKO_MAX_WAIT_MS', DEFAULT_MAX_WAIT_MS))
+
+    state = {}
+
+    @asynccontextmanager
+    async def lifespan(app):
+        model = load_model(model_path)
+        service = PredictionService(model)
+        state['model'] = model
+        state['batcher'] = AsyncMicroBatcher(lambda entries: score_entries(service, entries),
+                                             max_batch_size, max_wait_ms)
+        state['batcher'].start()
+        print(f"[INFO] Scoring service ready (pid {os.getpid()}, {model_path}, "
+              f"batch <= {max_batch_size}, wait <= {max_wait_ms} ms)")
+        yield
+        await state['batcher'].stop()
+
+    async def health(request):
+        model = state['model']
+        batcher = state['batcher']
+        return JSONResponse({
+            'status': 'ok',
+            'pid': os.getpid(),
+            'model': os.path.basename(model_path),
+            'metadata': getattr(model, 'metadata', {}),
+            'batches': batcher.batches,
+            'rows_scored': batcher.items,
+        })
+
+    async def predict(request):
+        try:
+            entry = validate_entry(await _read_json(request))
+        except ValueError as e:
+            return _error(str(e))
+        (prediction,) = await state['batcher'].submit([entry])
+        return JSONResponse(prediction)
+
+    async def predict_batch(request):
+        try:
+            body = await _read_json(request)
+            entries = body.get('instances') if isinstance(body, dict) else body
+            if not isinstance(entries, list) or not entries:
+                raise ValueError("expected a non-empty list of entries (or {\"instances\": [...]})")
+            if len(entries) > MAX_REQUEST_ROWS:
+                return _error(f"at most {MAX_REQUEST_ROWS} entries per request", 413)
+            entries = [validate_entry(entry) for entry in entries]
+        except ValueError as e:
+            return _error(str(e))
+        return JSONResponse({'predictions': await state['batcher'].submit(entries)})
+
+    return Starlette(routes=[
+        Route('/health', health),
+        Route('/predict', predict, methods=['POST']),
+        Route('/predict/batch', predict_batch, methods=['POST']),
+    ], lifespan=lifespan)
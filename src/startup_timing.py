@@ -0,0 +1,41 @@
+import time
+from contextlib import contextmanager
+
+class StartupTimer:
+    """Collect per-import and per-phase wall times (ms) for the boot report"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.records = []
+        self.reported = False
+
+    @contextmanager
+    def phase(self, name, kind='phase'):
+        """Time the enclosed block; a no-op once the report has been emitted"""
+        if self.reported:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append((kind, name, (time.perf_counter() - start) * 1000))
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def report(self):
+        """Plain-text timing table, one line per import/phase"""
+        lines = ["[TIMING] Startup report"]
+        for kind, name, ms in self.records:
+            lines.append(f"[TIMING] {kind:<6} {name:<40} {ms:9.1f} ms")
+        lines.append(f"[TIMING] {'total':<6} {'first script run':<40} {self.total_ms():9.1f} ms")
+        return "\n".join(lines)
+
+    def emit(self):
+        """Print the report once per process (Streamlit reruns the script on every interaction)"""
+        if self.reported:
+            return
+        self.reported = True
+        print(self.report())
@@ -1,80 +1,170 @@
 from PIL import Image, ImageDraw, ImageFont
 import io
+import threading
+from collections import OrderedDict
 from datetime import datetime
 
-def generate_certificate_image(name, result, proba_sehat, proba_stres, input_data):
-    # Chart colors
-    BG_COLOR = (240, 242, 246)
-    HEADER_COLOR = (102, 126, 234)
-    TEXT_COLOR = (38, 39, 48)
-    CARD_BG = (255, 255, 255)
-    SUCCESS_COLOR = (40, 167, 69)
-    DANGER_COLOR = (220, 53, 69)
-    
-    # Create canvas (1200x800)
-    img = Image.new('RGB', (1200, 800), color=BG_COLOR)
-    draw = ImageDraw.Draw(img)
-    
-    # Draw main card
-    draw.rounded_rectangle([50, 50, 1150, 750], fill=CARD_BG, outline=HEADER_COLOR, width=5, radius=30)
-    
-    # Draw Header box
-    draw.rounded_rectangle([50, 50, 1150, 150], fill=HEADER_COLOR, radius=30)
-    
-    # Try to load fonts
+from .instrumentation import stage, timed
+
+# Chart colors
+BG_COLOR = (240, 242, 246)
+HEADER_COLOR = (102, 126, 234)
+TEXT_COLOR = (38, 39, 48)
+CARD_BG = (255, 255, 255)
+SUCCESS_COLOR = (40, 167, 69)
+DANGER_COLOR = (220, 53, 69)
+FOOTER_COLOR = (150, 150, 150)
+
+CANVAS_SIZE = (1200, 800)
+
+# Output encodings: PIL format, MIME type, file extension and save options (normal, fast)
+ENCODINGS = {
+    'png': ('PNG', 'image/png', 'png', {}, {'compress_level': 1}),
+    'webp': ('WEBP', 'image/webp', 'webp', {'quality': 90}, {'quality': 80, 'method': 0}),
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg', {'quality': 92}, {'quality': 85}),
+}
+
+def _load_fonts():
+    """Certificate fonts, falling back to PIL's default font if DejaVu is not installed"""
     try:
-        title_font = ImageFont.truetype("DejaVuSans.ttf", 45)
-        name_font = ImageFont.truetype("DejaVuSans.ttf", 35)
-        label_font = ImageFont.truetype("DejaVuSans.ttf", 25)
-        result_font = ImageFont.truetype("DejaVuSans-Bold.ttf", 60)
-        footer_font = ImageFont.truetype("DejaVuSans.ttf", 20)
-    except:
-        title_font = ImageFont.load_default()
-        name_font = ImageFont.load_default()
-        label_font = ImageFont.load_default()
-        result_font = ImageFont.load_default()
-        footer_font = ImageFont.load_default()
-
-    # Draw Title
-    draw.text((600, 100), "HASIL PREDIKSI RISIKO STRES", fill=(255, 255, 255), font=title_font, anchor="mm")
-    
-    # Student Info
-    draw.text((100, 200), f"Nama Mahasiswa: {name.upper()}", fill=TEXT_COLOR, font=name_font)
-    draw.line([100, 240, 600, 240], fill=HEADER_COLOR, width=2)
-    
-    # Result Box
-    result_color = SUCCESS_COLOR if result == "Sehat" else DANGER_COLOR
-    draw.text((600, 350), result.upper(), fill=result_color, font=result_font, anchor="mm")
-    
-    # Probability
-    draw.text((300, 450), f"Probabilitas Sehat: {proba_sehat:.1f}%", fill=SUCCESS_COLOR, font=label_font, anchor="mm")
-    draw.text((900, 450), f"Probabilitas Risiko Stres: {proba_stres:.1f}%", fill=DANGER_COLOR, font=label_font, anchor="mm")
-    
-    # Data summary
-    draw.text((100, 520), "Ringkasan Data:", fill=TEXT_COLOR, font=label_font)
-    y_pos = 560
-    summary_text = [
-        f"• Umur: {input_data['Umur']} Tahun",
-        f"• IPK: {input_data['IPK']:.2f}",
-        f"• Belajar: {input_data['Jam Belajar']} Jam/Hari",
-        f"• Tidur: {input_data['Jam Tidur']} Jam/Hari",
-        f"• Tugas: {input_data['Jumlah Tugas']} per Minggu"
-    ]
-    
-    cols = [100, 400, 700]
-    for idx, text in enumerate(summary_text):
-        col_idx = idx % 3
-        row_idx = idx // 3
-        draw.text((cols[col_idx], y_pos + (row_idx * 40)), text, fill=TEXT_COLOR, font=label_font)
-
-    # Footer
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    draw.text((600, 720), f"Digenerate otomatis oleh Sistem AI Prediksi Stres | {timestamp}", fill=(150, 150, 150), font=footer_font, anchor="mm")
-    
-    # Save to bytes
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    byte_im = buf.getvalue()
-    
-    return byte_im
+        return {
+            'title': ImageFont.truetype("DejaVuSans.ttf", 45),
+            'name': ImageFont.truetype("DejaVuSans.ttf", 35),
+            'label': ImageFont.truetype("DejaVuSans.ttf", 25),
+            'result': ImageFont.truetype("DejaVuSans-Bold.ttf", 60),
+            'footer': ImageFont.truetype("DejaVuSans.ttf", 20),
+        }
+    except OSError:
+        default = ImageFont.load_default()
+        return {key: default for key in ('title', 'name', 'label', 'result', 'footer')}
+
+class CertificateRenderer:
+    """Renders result cards from a pre-drawn background, memoizing the encoded bytes (LRU)"""
+
+    def __init__(self, encoding='png', fast=False, cache_size=128):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown certificate encoding '{encoding}', expected one of {sorted(ENCODINGS)}")
+
+        self.format, self.mime, self.extension, normal_options, fast_options = ENCODINGS[encoding]
+        self.save_options = fast_options if fast else normal_options
+        self.cache_size = cache_size
+        self.fonts = _load_fonts()
+        self._background = self._draw_background()
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _draw_background(self):
+        """Canvas, card, header and title: everything that does not depend on the result"""
+        img = Image.new('RGB', CANVAS_SIZE, color=BG_COLOR)
+        draw = ImageDraw.Draw(img)
+
+        # Draw main card
+        draw.rounded_rectangle([50, 50, 1150, 750], fill=CARD_BG, outline=HEADER_COLOR, width=5, radius=30)
+
+        # Draw Header box
+        draw.rounded_rectangle([50, 50, 1150, 150], fill=HEADER_COLOR, radius=30)
+
+        # Draw Title
+        draw.text((600, 100), "HASIL PREDIKSI RISIKO STRES", fill=(255, 255, 255), font=self.fonts['title'], anchor="mm")
+        draw.line([100, 240, 600, 240], fill=HEADER_COLOR, width=2)
+        draw.text((100, 520), "Ringkasan Data:", fill=TEXT_COLOR, font=self.fonts['label'])
+
+        return img
+
+    @staticmethod
+    def card_text(name, result, proba_sehat, proba_stres, input_data, now=None):
+        """The dynamic strings drawn on a card (also the memo key, so the footer time is to the minute)"""
+        timestamp = (now or datetime.now()).strftime("%Y-%m-%d %H:%M")
+        return (
+            f"Nama Mahasiswa: {name.upper()}",
+            result.upper(),
+            result == "Sehat",
+            f"Probabilitas Sehat: {proba_sehat:.1f}%",
+            f"Probabilitas Risiko Stres: {proba_stres:.1f}%",
+            f"Digenerate otomatis oleh Sistem AI Prediksi Stres | {timestamp}",
+            f"• Umur: {input_data['Umur']} Tahun",
+            f"• IPK: {input_data['IPK']:.2f}",
+            f"• Belajar: {input_data['Jam Belajar']} Jam/Hari",
+            f"• Tidur: {input_data['Jam Tidur']} Jam/Hari",
+            f"• Tugas: {input_data['Jumlah Tugas']} per Minggu",
+        )
+
+    def _compose(self, text):
+        """Copy the background and draw the dynamic text on it"""
+        name_line, result_line, is_sehat, sehat_line, stres_line, footer_line, *summary_text = text
+        img = self._background.copy()
+        draw = ImageDraw.Draw(img)
 
+        # Student Info
+        draw.text((100, 200), name_line, fill=TEXT_COLOR, font=self.fonts['name'])
+
+        # Result Box
+        result_color = SUCCESS_COLOR if is_sehat else DANGER_COLOR
+        draw.text((600, 350), result_line, fill=result_color, font=self.fonts['result'], anchor="mm")
+
+        # Probability
+        draw.text((300, 450), sehat_line, fill=SUCCESS_COLOR, font=self.fonts['label'], anchor="mm")
+        draw.text((900, 450), stres_line, fill=DANGER_COLOR, font=self.fonts['label'], anchor="mm")
+
+        # Data summary
+        y_pos = 560
+        cols = [100, 400, 700]
+        for idx, line in enumerate(summary_text):
+            col_idx = idx % 3
+            row_idx = idx // 3
+            draw.text((cols[col_idx], y_pos + (row_idx * 40)), line, fill=TEXT_COLOR, font=self.fonts['label'])
+
+        # Footer
+        draw.text((600, 720), footer_line, fill=FOOTER_COLOR, font=self.fonts['footer'], anchor="mm")
+
+        return img
+
+    def encode(self, img):
+        buf = io.BytesIO()
+        img.save(buf, format=self.format, **self.save_options)
+        return buf.getvalue()
+
+    @timed("certificate.render")
+    def render(self, name, result, proba_sehat, proba_stres, input_data):
+        """Encoded card bytes; identical inputs within the same minute reuse the first rendering"""
+        key = self.card_text(name, result, proba_sehat, proba_stres, input_data)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        # PIL work runs outside the lock so sessions render in parallel; two threads
+        # racing on the same new card both render it and the first insert wins
+        with stage("certificate.compose"):
+            img = self._compose(key)
+        with stage("certificate.encode"):
+            img_bytes = self.encode(img)
+
+        with self._lock:
+            img_bytes = self._cache.setdefault(key, img_bytes)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return img_bytes
+
+_default_renderer = None
+_default_renderer_lock = threading.Lock()
+
+def get_certificate_renderer():
+    """Shared renderer (PNG, fast compression) used by the app and generate_certificate_image"""
+    global _default_renderer
+    if _default_renderer is None:
+        # Sessions may ask for it at the same time; only one of them builds it
+        with _default_renderer_lock:
+            if _default_renderer is None:
+                _default_renderer = CertificateRenderer(fast=True)
+    return _default_renderer
+
+def generate_certificate_image(name, result, proba_sehat, proba_stres, input_data):
+    return get_certificate_renderer().render(name, result, proba_sehat, proba_stres, input_data)
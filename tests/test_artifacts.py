@@ -0,0 +1,38 @@
+import os
+import shutil
+
+from src.data_preprocessing import load_data
+from src.dataset_summary import build_summary, load_summary, save_summary
+from src.evaluation import (EVALUATION_VERSION, dataset_fingerprint, dataset_stamp, load_evaluation,
+                            save_evaluation)
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw', 'dataset.csv')
+
+
+def test_load_evaluation_does_not_rewrite_the_artifact(tmp_path):
+    dataset = shutil.copy(DATASET_PATH, tmp_path / 'dataset.csv')
+    path = tmp_path / 'evaluation.json'
+    save_evaluation({'format_version': EVALUATION_VERSION, 'dataset': {'fingerprint': dataset_fingerprint(dataset)}},
+                    str(path))
+    saved = path.read_bytes()
+    os.utime(dataset, ns=(0, 0))
+
+    evaluation = load_evaluation(str(path), dataset)
+
+    assert evaluation['dataset']['stamp'] == dataset_stamp(dataset)
+    assert path.read_bytes() == saved
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_load_summary_does_not_rewrite_the_artifact(tmp_path):
+    dataset = shutil.copy(DATASET_PATH, tmp_path / 'dataset.csv')
+    path = tmp_path / 'dataset_summary.pkl'
+    save_summary(build_summary(load_data(dataset), dataset_fingerprint(dataset)), str(path))
+    saved = path.read_bytes()
+    os.utime(dataset, ns=(0, 0))
+
+    summary = load_summary(str(path), dataset)
+
+    assert summary['stamp'] == dataset_stamp(dataset)
+    assert path.read_bytes() == saved
+    assert not list(tmp_path.glob('*.tmp'))
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import src.certificate_export
+import src.utils
+from src.certificate_export import render_cards
+from src.utils import CertificateRenderer
+
+CARD = ("Budi", "Sehat", 57.8, 42.2, {'Umur': 21, 'IPK': 3.25, 'Jam Belajar': 4, 'Jam Tidur': 7, 'Jumlah Tugas': 2})
+
+
+class _Clock:
+    now_value = None
+
+    @classmethod
+    def now(cls):
+        return cls.now_value
+
+
+def test_memoized_card_carries_the_current_minute(monkeypatch):
+    monkeypatch.setattr(src.utils, 'datetime', _Clock)
+    _Clock.now_value = datetime(2026, 1, 1, 8, 0, 0)
+    renderer = CertificateRenderer(fast=True)
+
+    first = renderer.render(*CARD)
+    _Clock.now_value = datetime(2026, 1, 1, 8, 0, 59)
+    assert renderer.render(*CARD) == first
+    _Clock.now_value = datetime(2026, 1, 1, 9, 30, 0)
+    assert renderer.render(*CARD) != first
+    assert (renderer.hits, renderer.misses) == (1, 2)
+
+
+def test_in_process_exports_do_not_share_a_renderer():
+    png = render_cards([CARD] * 3, workers=1, encoding='png', batch_size=1)
+    jpeg = render_cards([CARD] * 3, workers=1, encoding='jpeg', batch_size=1)
+    # Interleaved like two sessions exporting at once
+    names = [name for pair in zip(png, jpeg) for name, _ in pair]
+
+    assert [name.rsplit('.', 1)[1] for name in names] == ['png', 'jpg'] * 3
+    assert src.certificate_export._renderer is None
@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preprocessing import clean_ipk, clean_ipk_column
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw', 'dataset.csv')
+
+# Odd inputs float() accepts or rejects in its own way
+EDGE_CASES = ['', ' ', '.', '3.', '.5', '03.13', '0,188194444', ' 3,25 ', '+2.5', '-0.5', '1e-3', '2E1',
+              '1_0', 'inf', '-inf', 'nan', 'NaN', 'abc', '3.2.1', '0x1', '٣', '1e400',
+              '0.12345678901234567891', '0000000000000000003.13', '1234567890123456', '4.000000000000001']
+
+
+def fuzz_ipk_strings(n_rows, seed=0):
+    """Survey-style IPK text: dotted/comma decimals, leading zeros, time fractions, junk"""
+    rng = np.random.default_rng(seed)
+    whole = rng.integers(0, 5, n_rows)
+    digits = rng.integers(0, 16, n_rows)
+    fractions = [str(f).zfill(d)[:d] for f, d in zip(rng.integers(0, 10 ** 15, n_rows).tolist(), digits.tolist())]
+    separators = rng.choice(['.', ','], n_rows)
+    leading = rng.choice(['', '0', '00'], n_rows, p=[0.7, 0.2, 0.1])
+
+    values = [f'{z}{w}{s}{f}' if f else f'{z}{w}'
+              for z, w, s, f in zip(leading.tolist(), whole.tolist(), separators.tolist(), fractions)]
+    odd = rng.random(n_rows) < 0.01
+    for i in np.flatnonzero(odd):
+        values[i] = EDGE_CASES[rng.integers(len(EDGE_CASES))]
+    series = pd.Series(values, dtype=object)
+    series[rng.random(n_rows) < 0.005] = None
+    return series
+
+
+def assert_same_as_apply(values):
+    expected = values.apply(clean_ipk).to_numpy(dtype=np.float64)
+    actual = clean_ipk_column(values).to_numpy(dtype=np.float64)
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_edge_cases_match_clean_ipk():
+    assert_same_as_apply(pd.Series(EDGE_CASES + [None, np.nan], dtype=object))
+
+
+@pytest.mark.skipif(not os.path.exists(DATASET_PATH), reason="dataset.csv is not deployed")
+def test_shipped_dataset_matches_clean_ipk():
+    ipk = pd.read_csv(DATASET_PATH, sep=';', usecols=['IPK'], dtype={'IPK': str})['IPK']
+    assert_same_as_apply(ipk)
+
+
+def test_million_row_fuzz_matches_clean_ipk():
+    assert_same_as_apply(fuzz_ipk_strings(1_000_000))
+
+
+def test_index_and_name_are_kept():
+    values = pd.Series(['3.5', '0,15'], index=[7, 9], name='IPK')
+    cleaned = clean_ipk_column(values)
+    assert list(cleaned.index) == [7, 9] and cleaned.name == 'IPK'
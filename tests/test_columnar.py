@@ -0,0 +1,45 @@
+import os
+import shutil
+from unittest import mock
+
+import pytest
+
+import src.evaluation as evaluation
+from src.data_preprocessing import columnar_is_fresh, ingest_dataset, load_data
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw', 'dataset.csv')
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'raw' / 'dataset.csv'
+    path.parent.mkdir()
+    shutil.copy(DATASET_PATH, path)
+    return str(path)
+
+
+def test_unchanged_csv_is_not_hashed(csv_path):
+    parquet_path = ingest_dataset(csv_path)
+    evaluation._fingerprints.clear()
+
+    with mock.patch.object(evaluation, 'dataset_fingerprint', side_effect=AssertionError("CSV was hashed")):
+        assert columnar_is_fresh(parquet_path, csv_path)
+        assert len(load_data(csv_path)) > 0
+
+
+def test_touched_csv_falls_back_to_the_hash(csv_path):
+    parquet_path = ingest_dataset(csv_path)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert columnar_is_fresh(parquet_path, csv_path)
+
+
+def test_edited_csv_is_stale(csv_path):
+    parquet_path = ingest_dataset(csv_path)
+    with open(csv_path, 'a') as f:
+        f.write('\n')
+
+    assert not columnar_is_fresh(parquet_path, csv_path)
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.data_preprocessing import load_data
+from src.discretization import DiscretizedForest, discretize
+from src.inference import CompiledForest, compile_pipeline
+from src.model_training import train_model
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw', 'dataset.csv')
+
+
+@pytest.fixture(scope='module')
+def df():
+    return load_data(DATASET_PATH)
+
+
+def fitted(df, **params):
+    model = train_model(df, {'n_estimators': 20, **params})[0]
+    # Trees are accumulated in estimator order only without joblib threads
+    model.set_params(classifier__n_jobs=1)
+    return model
+
+
+@pytest.mark.parametrize('params', [{'min_samples_split': 10 ** 6}, {'max_depth': 1}, {'max_depth': 5}],
+                         ids=['single-leaf trees', 'depth 1', 'depth 5'])
+def test_matches_predict_proba(df, params):
+    model = fitted(df, **params)
+    forest = DiscretizedForest(compile_pipeline(model))
+    X = df.drop('Label', axis=1)
+
+    assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+
+
+def test_deep_forest_falls_back_to_compiled(df):
+    model = fitted(df, max_depth=None)
+    compiled = compile_pipeline(model)
+
+    with pytest.raises(ValueError, match="Leaf tables"):
+        DiscretizedForest(compiled)
+    engine = discretize(compiled)
+    X = df.drop('Label', axis=1)
+    assert isinstance(engine, CompiledForest)
+    assert np.array_equal(engine.predict_proba(X), model.predict_proba(X))
+
+
+def test_table_budget_is_checked_before_building(df):
+    compiled = compile_pipeline(fitted(df))
+
+    assert isinstance(discretize(compiled, max_table_bytes=1024), CompiledForest)
+    assert isinstance(discretize(compiled), DiscretizedForest)
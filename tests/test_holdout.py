@@ -0,0 +1,46 @@
+import os
+
+import pytest
+from sklearn.metrics import accuracy_score
+
+from src.data_preprocessing import load_data
+from src.evaluation import holdout_rows, holdout_segment
+from src.incremental_training import update_model
+from src.model_training import train_model
+from src.out_of_core_training import train_model_out_of_core
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw', 'dataset.csv')
+
+SMALL_FOREST = {'n_estimators': 20}
+
+
+@pytest.fixture(scope='module')
+def df():
+    return load_data(DATASET_PATH)
+
+
+def holdout_accuracy(model, df, holdout):
+    test = df.iloc[holdout_rows(holdout)]
+    return accuracy_score(test['Label'], model.predict(test.drop('Label', axis=1)))
+
+
+def test_train_model_holdout(df):
+    model, accuracy, *_ = train_model(df, SMALL_FOREST)
+
+    assert holdout_accuracy(model, df, [holdout_segment(0, len(df))]) == accuracy
+
+
+def test_out_of_core_holdout_is_recorded(df):
+    model, accuracy, _, cm, _, report = train_model_out_of_core(
+        DATASET_PATH, memory_budget_mb=4096, classifier_params=SMALL_FOREST, trees_per_batch=10)
+
+    assert len(holdout_rows(report['holdout'])) == cm.sum() == report['test_rows']
+    assert holdout_accuracy(model, df, report['holdout']) == pytest.approx(accuracy)
+
+
+def test_update_holdout_covers_the_new_rows(df):
+    n_old = 2500
+    model, *_ = train_model(df.iloc[:n_old].reset_index(drop=True), SMALL_FOREST)
+    model, accuracy, *_ = update_model(model, df.iloc[n_old:].reset_index(drop=True), extra_trees=10)
+
+    assert holdout_accuracy(model, df, [holdout_segment(n_old, len(df))]) == accuracy
@@ -0,0 +1,18 @@
+import os
+
+import numpy as np
+
+from src.data_preprocessing import load_data
+from src.hyperparameter_search import HyperparameterSearch
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw', 'dataset.csv')
+
+
+def test_seed_does_not_move_the_holdout(tmp_path):
+    df = load_data(DATASET_PATH)
+    paths = [HyperparameterSearch(df, 'dataset', str(tmp_path / str(seed)), seed=seed)._design_path({})
+             for seed in (1, 42)]
+    designs = [(np.load(f"{path}_X.npy"), np.load(f"{path}_y.npy")) for path in paths]
+
+    np.testing.assert_array_equal(designs[0][0], designs[1][0])
+    np.testing.assert_array_equal(designs[0][1], designs[1][1])
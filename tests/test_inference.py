@@ -0,0 +1,51 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preprocessing import RAW_CSV_DTYPES, clean_ipk_column
+from src.inference import compile_pipeline
+from src.model_bundle import export_bundle, load_bundle
+from tests.test_clean_ipk import fuzz_ipk_strings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_PATH = os.path.join(ROOT, 'data', 'raw', 'dataset.csv')
+MODEL_PATH = os.path.join(ROOT, 'models', 'best_model.pkl')
+
+
+@pytest.fixture(scope='module')
+def model():
+    with open(MODEL_PATH, 'rb') as f:
+        model = pickle.load(f)
+    # Trees are accumulated in estimator order only without joblib threads
+    return model.set_params(classifier__n_jobs=1)
+
+
+@pytest.fixture(scope='module')
+def raw():
+    return pd.read_csv(DATASET_PATH, sep=';', dtype=RAW_CSV_DTYPES).drop('Label', axis=1)
+
+
+@pytest.fixture(scope='module', params=['compiled', 'bundle'])
+def engine(request, model, tmp_path_factory):
+    compiled = compile_pipeline(model)
+    if request.param == 'compiled':
+        return compiled
+    path = str(tmp_path_factory.mktemp('bundle') / 'best_model.rfb')
+    export_bundle(compiled, path)
+    return load_bundle(path)
+
+
+def test_shipped_dataset_matches_predict_proba(engine, model, raw):
+    assert np.array_equal(engine.predict_proba(raw), model.predict_proba(raw))
+
+
+def test_messy_ipk_strings_match_predict_proba(engine, model, raw):
+    X = raw.sample(20_000, replace=True, random_state=0).reset_index(drop=True)
+    X['IPK'] = fuzz_ipk_strings(len(X))
+    # sklearn refuses infinite inputs ('inf', '1e400'); missing ones follow the learned direction
+    X = X[~np.isinf(clean_ipk_column(X['IPK']))]
+
+    assert np.array_equal(engine.predict_proba(X), model.predict_proba(X))
@@ -0,0 +1,61 @@
+import os
+import pickle
+import threading
+
+import pytest
+
+from src.instrumentation import INSTRUMENTS, request
+from src.prediction_service import PredictionService, QueuedPredictionService
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'best_model.pkl')
+
+ENTRY = {
+    'Nama': 'Mahasiswa', 'Gender': 'Perempuan', 'Umur': 20, 'Jurusan/Program Studi': 'Teknik Informatika',
+    'IPK': 3.0, 'Jam Belajar': 4, 'Jam Tidur': 7, 'Jumlah Tugas': 2,
+    'Status Hubungan': 'Jomblo', 'Pemasukan Keluarga': 'Sedang', 'Olahraga': 'Kadang',
+}
+
+
+@pytest.fixture
+def instruments(tmp_path):
+    INSTRUMENTS.reset()
+    INSTRUMENTS.configure(enabled=True, export_dir=str(tmp_path))
+    yield INSTRUMENTS
+    INSTRUMENTS.configure(enabled=False)
+    INSTRUMENTS.reset()
+
+
+@pytest.fixture(scope='module')
+def service():
+    with open(MODEL_PATH, 'rb') as f:
+        return PredictionService(pickle.load(f))
+
+
+def test_batched_stages_are_attributed_to_every_session(instruments, service, tmp_path):
+    queued = QueuedPredictionService(service, max_batch_size=2, max_wait_ms=5_000)
+    # Make the first caller wait for the second one, as it does once sessions are busy
+    queued.batcher._last_requests = 2
+    traces = {}
+
+    def session(name):
+        with request(name) as trace:
+            queued.predict_batch([ENTRY])
+        traces[name] = trace
+
+    threads = [threading.Thread(target=session, args=(f"session {i}",)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert queued.batcher.batches == 1
+    for trace in traces.values():
+        assert 'model.forest' in [name for name, _ in trace['stages']]
+        assert trace['batch']['requests'] == 2
+    # The batch's stages are observed once, not once per session
+    assert instruments.histograms['model.forest'].count == 1
+
+    with open(tmp_path / 'traces.jsonl', encoding='utf-8') as f:
+        assert len(f.readlines()) == 2
+    with open(tmp_path / 'metrics.prom', encoding='utf-8') as f:
+        assert 'resiko_stage_duration_seconds_count{stage="model.forest"} 1' in f.read()
@@ -0,0 +1,58 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.inference import compile_pipeline
+from src.lookup_table import GridLookupModel, build_lookup_table, random_form_inputs
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'best_model.pkl')
+
+# A slice of the form grid, small enough to build in a test
+SMALL_GRID = {
+    'Umur': np.array([18, 21, 25]),
+    'Jam Belajar per Hari': np.array([1, 4, 7]),
+    'Jam Tidur per Hari': np.array([3, 6, 9]),
+    'IPK': np.array([0.0, 0.5, 0.99, 2.0, 3.0, 3.5, 4.0]),
+    'Jumlah Tugas Besar per Minggu': np.array([0, 2, 5]),
+}
+
+
+@pytest.fixture(scope='module')
+def compiled():
+    with open(MODEL_PATH, 'rb') as f:
+        return compile_pipeline(pickle.load(f))
+
+
+@pytest.fixture(scope='module')
+def lookup(compiled):
+    header, cells = build_lookup_table(compiled, SMALL_GRID)
+    return GridLookupModel(header, cells, compiled)
+
+
+def test_every_cell_is_checked(lookup):
+    verification = lookup.header['verification']
+
+    assert verification['cells'] == len(lookup.cells)
+    assert verification['max_abs_diff'] <= np.finfo(np.float32).eps
+
+
+def test_grid_inputs_match_the_forest(lookup, compiled):
+    X = random_form_inputs(lookup.header, 20_000, grid=SMALL_GRID)
+    expected = compiled.predict_proba(X)
+    actual = lookup.predict_proba(X)
+
+    assert lookup.misses == 0
+    np.testing.assert_array_equal(np.argmax(actual, axis=1), np.argmax(expected, axis=1))
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=np.finfo(np.float32).eps)
+
+
+def test_low_form_ipk_is_not_rescaled(lookup, compiled):
+    X = random_form_inputs(lookup.header, 1, grid=SMALL_GRID)
+    X = pd.concat([X.assign(IPK=0.5), X.assign(IPK=4.0)], ignore_index=True)
+
+    np.testing.assert_allclose(lookup.predict_proba(X), compiled.predict_proba(X), rtol=0,
+                               atol=np.finfo(np.float32).eps)
+    assert lookup.cell_index(X)[0][0] != lookup.cell_index(X)[0][1]
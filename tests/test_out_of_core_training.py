@@ -0,0 +1,25 @@
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+
+from src.evaluation import holdout_rows
+from src.out_of_core_training import train_model_out_of_core
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw', 'dataset.csv')
+
+
+def test_many_categories_make_a_sparse_design(tmp_path):
+    # A multi-year archive easily reaches dozens of programmes, and the one-hot block turns sparse
+    df = pd.read_csv(DATASET_PATH, sep=';', dtype={'IPK': str})
+    df['Jurusan/Program Studi'] = [f'Prodi {i}' for i in np.random.default_rng(0).integers(0, 40, len(df))]
+    path = tmp_path / 'raw' / 'dataset.csv'
+    path.parent.mkdir()
+    df.to_csv(path, sep=';', index=False)
+
+    model, accuracy, *_, report = train_model_out_of_core(
+        str(path), memory_budget_mb=4096, classifier_params={'n_estimators': 20}, trees_per_batch=10)
+
+    test = df.iloc[holdout_rows(report['holdout'])]
+    assert accuracy_score(test['Label'], model.predict(test.drop('Label', axis=1))) == accuracy
@@ -0,0 +1,43 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from src.inference import compile_pipeline
+from src.prediction_service import PredictionService
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'best_model.pkl')
+
+ENTRY = {
+    'Nama': 'Mahasiswa', 'Gender': 'Perempuan', 'Umur': 20, 'Jurusan/Program Studi': 'Teknik Informatika',
+    'IPK': 3.0, 'Jam Belajar': 4, 'Jam Tidur': 7, 'Jumlah Tugas': 2,
+    'Status Hubungan': 'Jomblo', 'Pemasukan Keluarga': 'Sedang', 'Olahraga': 'Kadang',
+}
+
+
+@pytest.fixture(scope='module')
+def model():
+    if not os.path.exists(MODEL_PATH):
+        pytest.skip("models/best_model.pkl is not deployed")
+    with open(MODEL_PATH, 'rb') as f:
+        return pickle.load(f)
+
+
+def form_batch(ipk_values):
+    return [dict(ENTRY, IPK=ipk) for ipk in ipk_values]
+
+
+@pytest.mark.parametrize('engine', ['sklearn', 'compiled'])
+def test_low_form_ipk_is_not_rescaled(model, engine):
+    service = PredictionService(model if engine == 'sklearn' else compile_pipeline(model))
+    result = service.predict_batch(form_batch([0.5, 4.0]))
+    assert result.proba_stres[0] != result.proba_stres[1]
+
+
+def test_form_ipk_is_normalized_as_typed(model):
+    service = PredictionService(model)
+    input_df = service.build_input_frame(form_batch([0.5, 0.9, 4.0]))
+    normalizer = model.named_steps['normalizer']
+    expected = (np.array([0.5, 0.9, 4.0]) - normalizer.mean_['IPK']) / normalizer.std_['IPK']
+    np.testing.assert_allclose(normalizer.transform(input_df)['IPK'].to_numpy(), expected)
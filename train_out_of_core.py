@@ -0,0 +1,74 @@
+import argparse
+import pickle
+import time
+
+from src.evaluation import build_evaluation, save_evaluation
+from src.incremental_training import data_watermark
+from src.inference import compile_pipeline
+from src.model_bundle import export_bundle
+from src.out_of_core_training import train_model_out_of_core
+
+DATASET_PATH = 'data/raw/dataset.csv'
+MODEL_PATH = 'models/best_model.pkl'
+STATS_PATH = 'models/preprocessing_stats.pkl'
+BUNDLE_PATH = 'models/best_model.rfb'
+EVALUATION_PATH = 'models/evaluation.json'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the model on a dataset larger than RAM, sized for a memory budget")
+    parser.add_argument('--data', default=DATASET_PATH, help=f"Raw ';'-separated dataset (default: {DATASET_PATH})")
+    parser.add_argument('--memory-budget-mb', type=int, default=1024, help="Peak RSS budget in MB, best effort: sizes are planned from it, not enforced (default: 1024)")
+    parser.add_argument('--trees-per-batch', type=int, default=25, help="Trees grown per bootstrap sample (default: 25)")
+    parser.add_argument('--sample-rows', type=int, default=None,
+                        help="Rows per bootstrap sample (default: as many as the budget allows)")
+    parser.add_argument('--work-dir', default=None, help="Where the temporary design matrix is written (default: system temp)")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("OUT-OF-CORE TRAINING")
+    print("=" * 80)
+
+    print(f"\n🚀 Training on {args.data} within {args.memory_budget_mb:,} MB...")
+    start = time.perf_counter()
+    model, accuracy, f1, cm, stats, report = train_model_out_of_core(
+        args.data, memory_budget_mb=args.memory_budget_mb, trees_per_batch=args.trees_per_batch,
+        sample_rows=args.sample_rows, work_dir=args.work_dir)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {report['rows']:,} rows ({report['train_rows']:,} train / {report['test_rows']:,} holdout) in {elapsed:.1f}s")
+    print(f"  • Chunk: {report['chunk_rows']:,} rows | Bootstrap sample: {report['sample_rows']:,} rows "
+          f"| Tree batches: {report['tree_batches']}")
+    if report['peak_rss_mb'] is not None:
+        print(f"  • Peak RSS: {report['peak_rss_mb']:,.0f} MB of {args.memory_budget_mb:,} MB")
+        if report['peak_rss_mb'] > args.memory_budget_mb:
+            print("⚠️  Peak RSS exceeded the budget (it is only planned for, not enforced): raise it or set an external limit")
+
+    print(f"\n📊 Holdout:")
+    print(f"  • Accuracy: {accuracy*100:.2f}%")
+    print(f"  • F1-Score: {f1*100:.2f}%")
+
+    print("\n💾 Saving model, stats, evaluation and bundle...")
+    with open(MODEL_PATH, 'wb') as f:
+        pickle.dump(model, f)
+    with open(STATS_PATH, 'wb') as f:
+        pickle.dump(stats, f)
+
+    evaluation = build_evaluation(model, accuracy, f1, cm, None, args.data, summary=report['dataset'],
+                                  holdout=report['holdout'])
+    save_evaluation(evaluation, EVALUATION_PATH)
+
+    export_bundle(compile_pipeline(model), BUNDLE_PATH, metadata={
+        'created_at': evaluation['created_at'],
+        'dataset_fingerprint': evaluation['dataset']['fingerprint'],
+        'accuracy': evaluation['accuracy'],
+        'f1': evaluation['f1'],
+        'data_watermark': data_watermark(args.data),
+        'peak_rss_mb': report['peak_rss_mb']
+    })
+    print("✅ Saved to: models/")
+    print("ℹ️  The dataset summary and lookup table are not rebuilt here (build_lookup_table.py refreshes the latter)")
+
+
+if __name__ == "__main__":
+    main()
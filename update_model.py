@@ -0,0 +1,105 @@
+import argparse
+import pickle
+import time
+
+from src.evaluation import (build_evaluation, holdout_segment, load_evaluation, merge_dataset_summaries, save_evaluation,
+                            summarize_dataset)
+from src.incremental_training import data_watermark, read_new_rows, update_model
+from src.inference import compile_pipeline
+from src.model_bundle import export_bundle, read_bundle_header
+
+DATASET_PATH = 'data/raw/dataset.csv'
+MODEL_PATH = 'models/best_model.pkl'
+STATS_PATH = 'models/preprocessing_stats.pkl'
+BUNDLE_PATH = 'models/best_model.rfb'
+EVALUATION_PATH = 'models/evaluation.json'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the saved model with rows appended to the dataset since it was trained")
+    parser.add_argument('--trees', type=int, default=50, help="Trees fitted on the new rows (default: 50)")
+    parser.add_argument('--max-trees', type=int, default=None, help="Drop the oldest trees beyond this many (default: keep all)")
+    parser.add_argument('--min-rows', type=int, default=50, help="Skip the update below this many new rows (default: 50)")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("INCREMENTAL MODEL UPDATE")
+    print("=" * 80)
+
+    header, _ = read_bundle_header(BUNDLE_PATH)
+    watermark = header['metadata'].get('data_watermark')
+    if watermark is None:
+        raise SystemExit("❌ Model bundle has no data watermark, run save_model.py once first")
+
+    start = time.perf_counter()
+
+    print(f"\n📂 Reading rows after row {watermark['rows']:,} of {DATASET_PATH}...")
+    new_df = read_new_rows(DATASET_PATH, watermark)
+    print(f"✅ New rows: {len(new_df):,}")
+    if len(new_df) < args.min_rows:
+        print(f"\nℹ️  Fewer than {args.min_rows} new rows, nothing to do")
+        return
+
+    with open(MODEL_PATH, 'rb') as f:
+        model = pickle.load(f)
+
+    print(f"\n🚀 Growing forest by {args.trees} trees...")
+    model, accuracy, f1, cm, stats, unseen = update_model(model, new_df, args.trees, args.max_trees)
+    n_trees = len(model.named_steps['classifier'].estimators_)
+    print(f"✅ Forest now has {n_trees} trees")
+    for column, values in unseen.items():
+        print(f"⚠️  New categories in '{column}' are ignored until a full retrain: {', '.join(values)}")
+
+    print(f"\n📊 Holdout of the new rows:")
+    print(f"  • Accuracy: {accuracy*100:.2f}%")
+    print(f"  • F1-Score: {f1*100:.2f}%")
+
+    print("\n💾 Saving model, stats, evaluation and bundle...")
+    with open(MODEL_PATH, 'wb') as f:
+        pickle.dump(model, f)
+    with open(STATS_PATH, 'wb') as f:
+        pickle.dump(stats, f)
+
+    # Dataset summary = previous summary + appended rows. The new-rows holdout only covers the
+    # appended data, so it goes under 'update' and the last full-training metrics stay in place
+    previous = load_evaluation(EVALUATION_PATH)
+    update = build_evaluation(model, accuracy, f1, cm, new_df, DATASET_PATH)
+    evaluation = update
+    if previous is not None:
+        evaluation = dict(previous, dataset=dict(merge_dataset_summaries(previous['dataset'], summarize_dataset(new_df)),
+                                                 fingerprint=update['dataset']['fingerprint'],
+                                                 stamp=update['dataset']['stamp']))
+    else:
+        print("⚠️  No previous evaluation.json, the new-rows holdout is saved as the model's metrics")
+    # No tree has seen the earlier holdout rows or the new ones (permutation importance scores on both)
+    evaluation['holdout'] = (previous or {}).get('holdout', []) + [
+        holdout_segment(watermark['rows'], watermark['rows'] + len(new_df))]
+    evaluation['update'] = {
+        'updated_at': update['created_at'],
+        'rows': len(new_df),
+        'trees': n_trees,
+        'accuracy': update['accuracy'],
+        'f1': update['f1'],
+        'confusion_matrix': update['confusion_matrix']
+    }
+    save_evaluation(evaluation, EVALUATION_PATH)
+
+    new_watermark = data_watermark(DATASET_PATH)
+    export_bundle(compile_pipeline(model), BUNDLE_PATH, metadata={
+        **header['metadata'],
+        'updated_at': update['created_at'],
+        'dataset_fingerprint': evaluation['dataset']['fingerprint'],
+        'accuracy': evaluation['accuracy'],
+        'f1': evaluation['f1'],
+        'update_accuracy': update['accuracy'],
+        'update_f1': update['f1'],
+        'data_watermark': new_watermark
+    })
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Trained through row {new_watermark['rows']:,} in {elapsed:.2f}s")
+    print("ℹ️  Run ingest_data.py to refresh data/processed/dataset.parquet")
+
+
+if __name__ == "__main__":
+    main()